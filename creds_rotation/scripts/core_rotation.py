@@ -1,6 +1,6 @@
 from typing import Optional, Dict, List, Any
-from models import PayloadEntry, RotationResult, ParameterReference, CredMap
-from utils.search_utils import get_ns_content, get_app_content, resolve_param, search_yaml_files
+from models import PayloadEntry, RotationResult, ParameterReference, CredMap, EntityMaps
+from utils.search_utils import CredReferences, get_ns_content, get_app_content, resolve_param, search_yaml_files
 from utils.cred_utils import extract_credential
 from utils.error_constants import  *
 import envgenehelper.logger as logger
@@ -13,7 +13,9 @@ def process_entry_in_payload(
     shared_cred_content: Dict[str, Any],
     env_cred_content: Dict[str, Any],
     entity_files_map: Dict[str, Dict[str, Any]],
-    processed_cred_and_files: Dict[str, List[CredMap]]
+    processed_cred_and_files: Dict[str, List[CredMap]],
+    cred_references: Optional[CredReferences] = None,
+    entity_maps: Optional[EntityMaps] = None
 ) -> Optional[RotationResult]:
 
     if entry.application and entry.context == "pipeline":
@@ -23,9 +25,9 @@ def process_entry_in_payload(
     logger.info(f"Processing namespace={entry.namespace}, application={entry.application}, param_key={entry.parameter_key}, context={entry.context}")
     #Get target application or namespace file
     if entry.application:
-        target = get_app_content(entity_files_map, entry.namespace, entry.application, env)
+        target = get_app_content(entity_files_map, entry.namespace, entry.application, env, entity_maps)
     else:
-        target = get_ns_content(entity_files_map, entry.namespace, env)
+        target = get_ns_content(entity_files_map, entry.namespace, env, entity_maps)
 
     if not target:
         raise ReferenceError(ErrorMessages.ENTITY_FILE_NOT_FOUND.format(param_key=entry.parameter_key), error_code=ErrorCodes.FILE_NOT_FOUND_CODE)
@@ -70,7 +72,9 @@ def process_entry_in_payload(
         env_cred_files,
         entry.parameter_key,
         param_type,
-        target_file
+        target_file,
+        cred_references,
+        entity_maps
     )
     logger.info(f"✅ Processed param {entry.parameter_key}, affected count = {len(affected)}")
     if affected:
@@ -18,6 +18,7 @@
 )
 from utils.error_constants import *
 from utils.file_utils import scan_and_get_yaml_files, write_cred_file_path
+from utils.search_utils import build_cred_references
 from utils.yaml_utils import convert_json_to_yaml, write_yaml_to_file
 
 def validate_env_vars(is_encrypted: bool, encrypt_type: str):
@@ -135,7 +136,7 @@ def cred_rotation():
    
     fileread = time.time()
     # Scan and read all required files
-    entity_files_map, env_files_map, env_creds_files = scan_and_get_yaml_files(
+    entity_files_map, env_files_map, env_creds_files, entity_maps = scan_and_get_yaml_files(
         cluster_path
     )
     shared_creds = collect_shared_credentials(env_files_map)
@@ -147,6 +148,11 @@ def cred_rotation():
     )
     logger.info(f"✅ Fileread Completed in {round(time.time() - fileread, 2)} seconds.")
 
+    indexing = time.time()
+    cred_references = build_cred_references(entity_files_map)
+    logger.info(f"✅ Credential references of {len(cred_references)} credentials indexed in "
+                f"{round(time.time() - indexing, 2)} seconds.")
+
     payload_raw = config.payload_data.get("rotation_items", [])
     payload_objects: List[PayloadEntry] = [
         PayloadEntry.from_dict(entry) for entry in payload_raw
@@ -165,6 +171,8 @@ def cred_rotation():
                 env_cred_map,
                 entity_files_map,
                 processed_cred_and_files,
+                cred_references,
+                entity_maps,
             )
             if result:
                 final_result.append(result)
@@ -1,5 +1,5 @@
-from dataclasses import dataclass, asdict
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, asdict, field
+from typing import Optional, List, Dict, Any, Tuple
 import json
 
 @dataclass
@@ -76,4 +76,14 @@ class EnvConfig:
     creds_rotation_enabled: bool = False
     payload_data: Dict[str, Any] = None
     cluster_name: str = ""
-    work_dir: str = ""
\ No newline at end of file
+    work_dir: str = ""
+
+
+@dataclass
+class EntityMaps:
+    # (environment, namespace name) -> (file, content) of the namespace file
+    namespaces: Dict[Tuple[str, str], Tuple[str, Dict[str, Any]]] = field(default_factory=dict)
+    # (environment, namespace name, application name) -> (file, content) of the application file
+    applications: Dict[Tuple[str, str, str], Tuple[str, Dict[str, Any]]] = field(default_factory=dict)
+    # application file -> name of the owning namespace, None if its namespace file is missing
+    app_namespaces: Dict[str, Optional[str]] = field(default_factory=dict)
@@ -0,0 +1,34 @@
+import pytest
+from envgenehelper.errors import ValidationError
+
+from utils import file_utils
+
+
+@pytest.fixture
+def yaml_files(tmp_path):
+    paths = []
+    for ns in range(3):
+        for app in range(4):
+            path = tmp_path / f"ns-{ns}" / "Applications" / f"app-{app}.yml"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"name: app-{app}\ndeployParameters:\n  NS: ns-{ns}\n")
+            paths.append(str(path))
+    (tmp_path / "empty.yml").write_text("")
+    return paths + [str(tmp_path / "empty.yml")]
+
+
+def test_parallel_parse_matches_serial_parse(yaml_files, monkeypatch):
+    monkeypatch.setattr(file_utils, "YAML_PARSE_CHUNK_SIZE", 4)
+    assert [len(chunk) for chunk in file_utils.chunk_by_directory(yaml_files, 4)] == [5, 4, 4]
+    serial = file_utils.load_yaml_files_parallel(yaml_files, workers=1)
+    parallel = file_utils.load_yaml_files_parallel(set(yaml_files), workers=2)
+    assert parallel == serial
+    assert len(serial) == 12
+    assert serial[yaml_files[5]] == {"name": "app-1", "deployParameters": {"NS": "ns-1"}}
+
+
+def test_invalid_yaml_is_reported_from_worker(yaml_files, tmp_path, monkeypatch):
+    monkeypatch.setattr(file_utils, "YAML_PARSE_CHUNK_SIZE", 4)
+    (tmp_path / "ns-2" / "Applications" / "app-0.yml").write_text("name: [unclosed")
+    with pytest.raises(ValidationError, match="app-0.yml"):
+        file_utils.load_yaml_files_parallel(yaml_files, workers=2)
@@ -0,0 +1,69 @@
+import pytest
+from envgenehelper.errors import ReferenceError
+
+from utils.search_utils import build_cred_references, build_entity_maps, find_in_yaml, get_app_and_ns, \
+    get_app_content, get_ns_content, resolve_context, search_yaml_files
+
+ENV_DIR = "/work/environments/cluster-01/env-01/Namespaces"
+NS_FILE = f"{ENV_DIR}/bss/namespace.yml"
+APP_FILE = f"{ENV_DIR}/bss/Applications/crm.yml"
+REFERENCE = "${creds.get('db-cred').password}"
+
+ENTITY_FILES_MAP = {
+    NS_FILE: {
+        "name": "bss",
+        "deployParameters": {
+            "DB_PASSWORD": REFERENCE,
+            "DB_USERNAME": "${creds.get('db-cred').username}",
+            "URLS": ["plain", f"jdbc://{REFERENCE}@host"],
+        },
+        "technicalConfigurationParameters": {"NESTED": {"DB": REFERENCE, "OTHER": "${creds.get('other').password}"}},
+    },
+    APP_FILE: {
+        "name": "crm",
+        "deployParameters": {"CRM_DB_PASSWORD": f"{REFERENCE}:{REFERENCE}", "UNRELATED": 1},
+    },
+}
+
+
+def test_cred_references_point_to_referencing_parameters():
+    cred_references = build_cred_references(ENTITY_FILES_MAP)
+    assert sorted(cred_references) == ["db-cred", "other"]
+    assert [(file, context, key) for file, context, key, _ in cred_references["db-cred"]] == [
+        (NS_FILE, "deployParameters", "DB_PASSWORD"),
+        (NS_FILE, "deployParameters", "DB_USERNAME"),
+        (NS_FILE, "deployParameters", "URLS[1]"),
+        (NS_FILE, "technicalConfigurationParameters", "NESTED.DB"),
+        (APP_FILE, "deployParameters", "CRM_DB_PASSWORD"),
+    ]
+
+
+def test_search_finds_same_parameters_as_file_scan():
+    affected = search_yaml_files(REFERENCE, ENTITY_FILES_MAP, "db-cred", "cluster-01", [], [], "DB_PASSWORD",
+                                 "deployParameters", NS_FILE, build_cred_references(ENTITY_FILES_MAP))
+    expected = []
+    for filename, content in ENTITY_FILES_MAP.items():
+        for context, keys in find_in_yaml(content, REFERENCE, filename == NS_FILE, "DB_PASSWORD",
+                                          "deployParameters").items():
+            expected.extend((resolve_context(context), key) for key in keys)
+    assert [(a.context, a.parameter_key) for a in affected] == [
+        ("deployment", "URLS[1]"), ("runtime", "NESTED.DB"), ("deployment", "CRM_DB_PASSWORD")]
+    assert [(a.context, a.parameter_key) for a in affected] == expected
+    assert [a.application for a in affected] == ["", "", "crm"]
+
+
+def test_entity_maps_answer_like_file_scan():
+    entity_files_map = dict(ENTITY_FILES_MAP)
+    entity_files_map["/work/environments/cluster-01/env-02/Namespaces/bss/namespace.yml"] = {"name": "bss-02"}
+    entity_files_map["/work/environments/cluster-01/env-01/Namespaces/oss/Applications/crm.yml"] = {"name": "crm"}
+    entity_maps = build_entity_maps(entity_files_map)
+
+    for namespace, env_name in [("bss", "env-01"), ("bss-02", "env-02"), ("bss", "env-02"), ("oss", "env-01")]:
+        assert get_ns_content(entity_files_map, namespace, env_name, entity_maps) == \
+               get_ns_content(entity_files_map, namespace, env_name)
+    assert get_app_content(entity_files_map, "bss", "crm", "env-01", entity_maps) == (APP_FILE,
+                                                                                      ENTITY_FILES_MAP[APP_FILE])
+    assert get_app_content(entity_files_map, "bss", "cms", "env-01", entity_maps) is None
+    with pytest.raises(ReferenceError, match="Failed to find namespace YAML file"):
+        get_app_content(entity_files_map, "oss", "crm", "env-01", entity_maps)
+    assert get_app_and_ns(APP_FILE, ENTITY_FILES_MAP[APP_FILE], entity_files_map, entity_maps) == ("crm", "bss")
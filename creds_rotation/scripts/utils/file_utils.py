@@ -1,11 +1,11 @@
 import os, time
-import asyncio
+from multiprocessing import Pool
 from pathlib import Path
-import aiofiles
 import yaml, json
 from typing import Any, Dict, List, Tuple, Set
+from models import EntityMaps
 from utils.error_constants import  *
-from utils.search_utils import trim_path_from_environments
+from utils.search_utils import build_entity_maps, trim_path_from_environments
 import envgenehelper.logger as logger
 from envgenehelper.errors import  ValidationError
 try:
@@ -14,22 +14,49 @@
 except ImportError:
     from yaml import Loader
 
-
-async def read_yaml_file(path: str) -> tuple[str, dict]:
-    try:
-        async with aiofiles.open(path, mode='r') as f:
-            content = await f.read()
-        data = yaml.load(content, Loader=Loader)
-        #data = yaml.safe_load(content)
-        return path, data
-    except Exception as e:
-         raise ValidationError(ErrorMessages.INVALID_YAML_FILE.format(file=path, e=str(e)), ErrorCodes.INVALID_CONFIG_CODE)
-
-
-async def load_yaml_files_parallel(paths: List[str]) -> Dict[str, dict]:
-    tasks = [read_yaml_file(path) for path in paths]
-    results = await asyncio.gather(*tasks)
-    return {path: content for path, content in results if content is not None}
+# worker processes parsing yaml files of the cluster, 1 parses them in the current process
+YAML_PARSE_WORKERS = int(os.getenv("CRED_ROTATION_PARSE_WORKERS") or os.cpu_count() or 1)
+# files parsed by a worker per task, smaller scans are parsed in the current process
+YAML_PARSE_CHUNK_SIZE = 200
+
+
+def read_yaml_files(paths: List[str]) -> List[Tuple[str, Any]]:
+    results = []
+    for path in paths:
+        try:
+            with open(path, mode='r') as f:
+                data = yaml.load(f, Loader=Loader)
+        except Exception as e:
+             raise ValidationError(ErrorMessages.INVALID_YAML_FILE.format(file=path, e=str(e)), ErrorCodes.INVALID_CONFIG_CODE)
+        if data is not None:
+            results.append((path, data))
+    return results
+
+
+def chunk_by_directory(paths, chunk_size: int) -> List[List[str]]:
+    # files of a directory stay in one chunk, so that a worker reads neighbouring files
+    dirs: Dict[str, List[str]] = {}
+    for path in sorted(paths):
+        dirs.setdefault(os.path.dirname(path), []).append(path)
+    chunks, chunk = [], []
+    for dir_paths in dirs.values():
+        chunk.extend(dir_paths)
+        if len(chunk) >= chunk_size:
+            chunks.append(chunk)
+            chunk = []
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def load_yaml_files_parallel(paths, workers: int = YAML_PARSE_WORKERS) -> Dict[str, dict]:
+    chunks = chunk_by_directory(paths, YAML_PARSE_CHUNK_SIZE)
+    if workers <= 1 or len(chunks) <= 1:
+        return dict(read_yaml_files([path for chunk in chunks for path in chunk]))
+
+    logger.info(f"Parsing {sum(map(len, chunks))} yaml files in {min(workers, len(chunks))} processes")
+    with Pool(min(workers, len(chunks))) as pool:
+        return {path: content for results in pool.imap(read_yaml_files, chunks) for path, content in results}
 
 
 def scandir_recursive_optimized(
@@ -94,15 +121,15 @@ def scandir_recursive(
 
 def scan_and_get_yaml_files(
     env_dir: str
-) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+) -> Tuple[Dict[str, Any], Dict[str, Any], Set[str], EntityMaps]:
 
     entity_files = set()
     env_def_files = set()
     env_creds_files = set()
     scandir_recursive(env_dir,  entity_files, env_def_files, env_creds_files)
-    entity_files_map = asyncio.run(load_yaml_files_parallel(entity_files))
-    env_files_map = asyncio.run(load_yaml_files_parallel(env_def_files))
-    return  entity_files_map, env_files_map, env_creds_files
+    entity_files_map = load_yaml_files_parallel(entity_files)
+    env_files_map = load_yaml_files_parallel(env_def_files)
+    return  entity_files_map, env_files_map, env_creds_files, build_entity_maps(entity_files_map)
 
 
 def openJson(path: str) -> dict:
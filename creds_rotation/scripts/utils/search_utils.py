@@ -1,8 +1,8 @@
 
 from typing import Any, Dict, List, Optional, Tuple
 from functools import lru_cache
-from models import AffectedParameter
-from pathlib import Path, PurePath
+from models import AffectedParameter, EntityMaps
+from pathlib import PurePath
 import envgenehelper.logger as logger
 from utils.error_constants import  *
 from envgenehelper.errors import  ReferenceError
@@ -28,32 +28,62 @@ def resolve_context(context: str) -> str:
     return REVERSE_CONTEXT_MAP.get(context.lower(), "")
 
 
-def find_matching_keys(data: dict, search_pattern: str, is_target: bool,
-                       context: str, target_key: str, target_context: str) -> list[str]:
-    results: List[str] = []
+CRED_REFERENCE_PATTERN = re.compile(r"(?=creds\.get\(\s*[\"']([^\"']+)[\"'])")
+
+CredReferences = Dict[str, List[Tuple[str, str, str, str]]]
+
 
+def iter_string_params(data: Any):
+    # yields (dotted key path, value) of every string value, list items are addressed as key[idx]
     def recurse(obj, path):
         if isinstance(obj, dict):
             for k, v in obj.items():
-                recurse(v, path + [k])
+                yield from recurse(v, path + [k])
         elif isinstance(obj, list):
             for idx, item in enumerate(obj):
                if path:
                     base_path = path[:-1]
                     last_key_with_index = f"{path[-1]}[{idx}]"
-                    recurse(item, base_path + [last_key_with_index])
+                    yield from recurse(item, base_path + [last_key_with_index])
                else:
-                    recurse(item, [f"[{idx}]"])
-        elif isinstance(obj, str) and search_pattern in obj:
-            final_key = ".".join(path)
+                    yield from recurse(item, [f"[{idx}]"])
+        elif isinstance(obj, str):
+            yield ".".join(path), obj
+    return recurse(data, [])
+
+
+def find_matching_keys(data: dict, search_pattern: str, is_target: bool,
+                       context: str, target_key: str, target_context: str) -> list[str]:
+    results: List[str] = []
+    for final_key, value in iter_string_params(data):
+        if search_pattern in value:
             if  is_target and context == target_context and final_key == target_key:
                 logger.debug("skipping target param")
             else:
                 results.append(final_key)
-    recurse(data, [])
     return results
 
 
+def build_cred_references(entity_files_map: Dict[str, Dict[str, Any]]) -> CredReferences:
+    """
+    Maps credential IDs to (file, context, parameter key, value) of every parameter referencing them via creds.get,
+    in the order search_yaml_files scans the files. Built once per rotation, so that each payload entry looks up
+    its credential instead of scanning all namespace and application files
+    """
+    cred_references: CredReferences = {}
+    for filename, content in entity_files_map.items():
+        for context in CONTEXT_MAP.values():
+            params = content.get(context, {})
+            if not params:
+                continue
+            for key, value in iter_string_params(params):
+                if "creds.get(" not in value:
+                    continue
+                for cred_id in dict.fromkeys(CRED_REFERENCE_PATTERN.findall(value)):
+                    cred_references.setdefault(cred_id, []).append((filename, context, key, value))
+    return cred_references
+
+
 def find_in_yaml(data: dict, search_pattern: str, is_target: bool, target_key: str, target_context: str) -> Dict[str, List[str]]:
     matches = {}
     for context in CONTEXT_MAP.values():
@@ -65,15 +95,60 @@ def find_in_yaml(data: dict, search_pattern: str, is_target: bool, target_key: s
     return matches
 
 
+def get_env_names(file_path: str) -> List[str]:
+    # environments whose "/{env_name}/Namespaces" the path contains
+    return re.findall(r"/([^/]*)(?=/Namespaces)", file_path.replace("\\", "/"))
+
+
+def is_ns_file(file_path: str) -> bool:
+    return file_path.endswith(("namespace.yml", "namespace.yaml"))
+
+
+def get_ns_files(file_path: str) -> List[PurePath]:
+    parent_dir = PurePath(file_path).parent.parent
+    return [parent_dir / "namespace.yaml", parent_dir / "namespace.yml"]
+
+
+def ns_file_not_found(ns_files: List[PurePath]) -> ReferenceError:
+    return ReferenceError(ErrorMessages.NS_FILE_NOT_FOUND.format(file=str(ns_files[0]).removesuffix("namespace.yaml")), error_code=ErrorCodes.FILE_NOT_FOUND_CODE)
+
+
+def build_entity_maps(entity_files_map: Dict[str, Dict[str, Any]]) -> EntityMaps:
+    """
+    Namespace and application files of every environment by name, and the owning namespace of every application
+    file, so that get_ns_content, get_app_content and get_app_and_ns do not scan all files on each call
+    """
+    entity_maps = EntityMaps()
+    for file_path, content in entity_files_map.items():
+        if not content or not is_ns_file(file_path):
+            continue
+        for env_name in get_env_names(file_path):
+            entity_maps.namespaces.setdefault((env_name, content.get("name")), (file_path, content))
+
+    for file_path, content in entity_files_map.items():
+        if content is None or is_ns_file(file_path):
+            continue
+        ns_content = find_namespace(entity_files_map, get_ns_files(file_path))
+        namespace = None if ns_content is None else ns_content.get("name", "")
+        entity_maps.app_namespaces[file_path] = namespace
+        if ns_content:
+            for env_name in get_env_names(file_path):
+                entity_maps.applications.setdefault((env_name, namespace, content.get("name")), (file_path, content))
+    return entity_maps
+
+
 def get_ns_content(
     yaml_content_map: Dict[str, Dict[str, Any]],
     namespace: str,
-    env_name: str
+    env_name: str,
+    entity_maps: Optional[EntityMaps] = None
 ) -> Optional[Tuple[str, Dict[str, Any]]]:
+    if entity_maps is not None:
+        return entity_maps.namespaces.get((env_name, namespace))
     for file_path, content in yaml_content_map.items():
         if f"/{env_name}/Namespaces" not in file_path.replace("\\", "/"):
             continue
-        if file_path.endswith(("namespace.yml", "namespace.yaml")) and content:
+        if is_ns_file(file_path) and content:
             if namespace == content.get("name"):
                 return file_path, content
     return None
@@ -83,21 +158,31 @@ def get_app_content(
     yaml_content_map: Dict[str, Dict[str, Any]],
     namespace: str,
     app: str,
-    env_name: str
+    env_name: str,
+    entity_maps: Optional[EntityMaps] = None
 ) -> Optional[Tuple[str, Dict[str, Any]]]:
+    if entity_maps is not None:
+        target = entity_maps.applications.get((env_name, namespace, app))
+        if target is None:
+            # an application of that name without namespace file might have been the one looked for
+            for file_path, owner in entity_maps.app_namespaces.items():
+                if owner is None and env_name in get_env_names(file_path) and \
+                        yaml_content_map[file_path].get("name") == app:
+                    raise ns_file_not_found(get_ns_files(file_path))
+        return target
+
     for file_path, content in yaml_content_map.items():
-        if file_path.endswith(("namespace.yml", "namespace.yaml")) or content is None or f"/{env_name}/Namespaces" not in file_path.replace("\\", "/"):
+        if is_ns_file(file_path) or content is None or f"/{env_name}/Namespaces" not in file_path.replace("\\", "/"):
             continue
 
         if app != content.get("name"):
             continue
 
-        parent_dir = Path(file_path).parent.parent
-        ns_files = [parent_dir / "namespace.yaml", parent_dir / "namespace.yml"]
+        ns_files = get_ns_files(file_path)
         ns_content = find_namespace(yaml_content_map, ns_files)
 
         if ns_content is None:
-            raise ReferenceError(ErrorMessages.NS_FILE_NOT_FOUND.format(file=str(ns_files[0]).removesuffix("namespace.yaml")), error_code=ErrorCodes.FILE_NOT_FOUND_CODE)
+            raise ns_file_not_found(ns_files)
 
         if ns_content and ns_content.get("name") == namespace:
             return file_path, content
@@ -105,17 +190,22 @@ def get_app_content(
     return None
 
 
-def get_app_and_ns(filename: str, content: dict, entity_files_map: Dict[str, Dict[str, Any]]) -> Tuple[str, Optional[str]]:
-    if filename.endswith(("namespace.yml", "namespace.yaml")):
+def get_app_and_ns(filename: str, content: dict, entity_files_map: Dict[str, Dict[str, Any]],
+                   entity_maps: Optional[EntityMaps] = None) -> Tuple[str, Optional[str]]:
+    if is_ns_file(filename):
         return '', content.get('name', '')
-    
-    filepath = PurePath(filename)
-    parent_dir = filepath.parent.parent
-    ns_files = [parent_dir / "namespace.yaml", parent_dir / "namespace.yml"]
+
+    ns_files = get_ns_files(filename)
+    if entity_maps is not None and filename in entity_maps.app_namespaces:
+        namespace = entity_maps.app_namespaces[filename]
+        if namespace is None:
+            raise ns_file_not_found(ns_files)
+        return content.get("name", ""), namespace
+
     ns_content = find_namespace(entity_files_map, ns_files)
 
     if ns_content is None:
-        raise ReferenceError(ErrorMessages.NS_FILE_NOT_FOUND.format(file=str(ns_files[0]).removesuffix("namespace.yaml")), error_code=ErrorCodes.FILE_NOT_FOUND_CODE)
+        raise ns_file_not_found(ns_files)
 
     return content.get("name", ""), ns_content.get("name", "")
 
@@ -150,10 +240,11 @@ def get_affected_param_map(
     filename: str,
     content: dict,
     matches: dict,
-    entity_files_map: Dict[str, Dict[str, Any]]
+    entity_files_map: Dict[str, Dict[str, Any]],
+    entity_maps: Optional[EntityMaps] = None
 ) -> list[AffectedParameter]:
     result = []
-    app, namespace = get_app_and_ns(filename, content, entity_files_map)
+    app, namespace = get_app_and_ns(filename, content, entity_files_map, entity_maps)
     env_name = extract_env_name(filename, cluster_name)
 
 
@@ -175,14 +266,25 @@ def get_affected_param_map(
 
 
 def search_yaml_files(search_string: str, entity_files_map: Dict[str, Dict[str, Any]], cred_id: str, cluster_name: str, shared_cred_files: List[str], env_cred_files : List[str], target_key: str,
- target_context: str, target_file: str) -> List[AffectedParameter]:
+ target_context: str, target_file: str, cred_references: Optional[CredReferences] = None,
+ entity_maps: Optional[EntityMaps] = None) -> List[AffectedParameter]:
     affected: List[AffectedParameter] = []
+    if cred_references is None:
+        cred_references = build_cred_references(entity_files_map)
 
-    for filename, content in entity_files_map.items():
-        is_target = filename == target_file
-        matches = find_in_yaml(content, search_string, is_target, target_key, target_context)
-        if matches:
-            affected.extend(get_affected_param_map(
-            cred_id, cluster_name, shared_cred_files, env_cred_files, filename, content, matches, entity_files_map
-            ))
+    # search_string is a creds.get reference of cred_id, so only parameters referencing cred_id can contain it
+    matches_by_file: Dict[str, Dict[str, List[str]]] = {}
+    for filename, context, key, value in cred_references.get(cred_id, []):
+        if search_string not in value:
+            continue
+        if filename == target_file and context == target_context and key == target_key:
+            logger.debug("skipping target param")
+            continue
+        matches_by_file.setdefault(filename, {}).setdefault(context, []).append(key)
+
+    for filename, matches in matches_by_file.items():
+        affected.extend(get_affected_param_map(
+        cred_id, cluster_name, shared_cred_files, env_cred_files, filename, entity_files_map[filename], matches, entity_files_map,
+        entity_maps
+        ))
     return affected
@@ -0,0 +1,73 @@
+"""
+Times Fernet re-encryption of a generated credentials file with envgenehelper.crypt_backends.fernet_handler:
+the value pass alone and the whole crypt_Fernet call with minimize_diff, which also reads and writes yaml.
+Each cred holds two secrets, a username and a password. The password of every 20th cred, that is 1 in 40
+secrets, changes between the old and the new version of the file.
+
+Usage: python devtools/benchmarks/fernet_crypt.py [secrets] [repeats] [workers]
+"""
+import copy
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from cryptography.fernet import Fernet
+
+from envgenehelper import logger
+from envgenehelper.crypt_backends.fernet_handler import crypt_Fernet, crypt_Fernet_data, get_fernet
+from envgenehelper.yaml_helper import writeYamlToFile
+
+
+def generate_creds(secrets_count, version):
+    return {f"cred-{i}": {"type": "usernamePassword",
+                          "data": {"username": f"user-{i}",
+                                   "password": f"pass-{i}-{version if i % 20 == 0 else 1}"}}
+            for i in range(secrets_count // 2)}
+
+
+def measure(func, repeats):
+    elapsed = 0.0
+    for _ in range(repeats):
+        elapsed += func()
+    return elapsed / repeats
+
+
+def main():
+    secrets_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    logger.setLevel(logging.WARNING)
+
+    secret_key = Fernet.generate_key().decode()
+    fernet = get_fernet(secret_key)
+    old_data = crypt_Fernet_data([generate_creds(secrets_count, 1)], fernet, "encrypt")[0]
+    new_data = generate_creds(secrets_count, 2)
+
+    def values_pass(old=None):
+        data = copy.deepcopy(new_data)
+        start = time.perf_counter()
+        crypt_Fernet_data([data], fernet, "encrypt", [old], workers)
+        return time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path, old_file_path = os.path.join(tmp_dir, "creds.yml"), os.path.join(tmp_dir, "old-creds.yml")
+        writeYamlToFile(old_file_path, old_data)
+
+        def file_pass():
+            writeYamlToFile(file_path, new_data)
+            start = time.perf_counter()
+            crypt_Fernet(file_path, secret_key, True, "encrypt", minimize_diff=True, old_file_path=old_file_path)
+            return time.perf_counter() - start
+
+        for name, func in (("encrypt values", values_pass),
+                           ("re-encrypt values", lambda: values_pass(old_data)),
+                           ("re-encrypt file", file_pass)):
+            elapsed = measure(func, repeats)
+            print(f"{secrets_count:6} secrets {name:18} {elapsed * 1000:9.3f} ms  "
+                  f"{elapsed * 1e6 / secrets_count:7.2f} us/secret")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Times the SD merges of envgenehelper.sd_merge_helper on generated SDs of growing size. Delta SDs update every
+third application and add new ones, so the time per application should stay flat as the SDs grow.
+
+Usage: python devtools/benchmarks/sd_merge.py [max apps] [repeats]
+"""
+import copy
+import logging
+import sys
+import time
+
+from envgenehelper import logger
+from envgenehelper.sd_merge_helper import basic_exclusion_merge, basic_merge, extended_merge
+
+
+def generate_sds(apps_count):
+    def sd(apps):
+        return {
+            "applications": [{"version": f"app-{i}:{version}", "deployPostfix": f"postfix-{i % 7}"}
+                             for i, version in apps],
+            "deployGraph": [{"chunkName": f"chunk-{chunk}",
+                             "apps": [f"app-{i}:postfix-{i % 7}" for i, _ in apps if i % 5 == chunk]}
+                            for chunk in range(5)],
+        }
+
+    full_sd = sd([(i, "1.0") for i in range(apps_count)])
+    delta_sd = sd([(i, "2.0") for i in range(0, apps_count, 3)] + [(i, "1.0") for i in range(apps_count,
+                                                                                             apps_count + 10)])
+    return full_sd, delta_sd
+
+
+def measure(merge, full_sd, delta_sd, repeats):
+    elapsed = 0.0
+    for _ in range(repeats):
+        full_copy, delta_copy = copy.deepcopy(full_sd), copy.deepcopy(delta_sd)
+        start = time.perf_counter()
+        merge(full_copy, delta_copy)
+        elapsed += time.perf_counter() - start
+    return elapsed / repeats
+
+
+def main():
+    max_apps = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    # merges log whole SDs at info level
+    logger.setLevel(logging.WARNING)
+
+    apps_count = 500
+    while apps_count <= max_apps:
+        full_sd, delta_sd = generate_sds(apps_count)
+        for name, merge in (("basic-merge", basic_merge),
+                            ("basic-exclusion-merge", basic_exclusion_merge),
+                            ("extended-merge", extended_merge)):
+            elapsed = measure(merge, full_sd, delta_sd, repeats)
+            print(f"{apps_count:6} apps {name:22} {elapsed * 1000:8.3f} ms  "
+                  f"{elapsed * 1e6 / apps_count:6.2f} us/app")
+        apps_count *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Compares per-file parse time of the yaml loaders from envgenehelper.yaml_helper on the yaml files of a directory.
+
+Usage: python devtools/benchmarks/yaml_loaders.py [dir] [repeats]
+"""
+import sys
+import time
+
+from envgenehelper.yaml_helper import findAllYamlsInDir, load_yaml_without_comments, safe_yaml, yaml
+
+
+def measure(loader, texts, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            loader(text)
+    return (time.perf_counter() - start) / (repeats * len(texts))
+
+
+def main():
+    test_dir = sys.argv[1] if len(sys.argv) > 1 else "test_data"
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    texts = []
+    for file_path in findAllYamlsInDir(test_dir):
+        with open(file_path) as f:
+            text = f.read()
+        try:
+            safe_yaml.load(text)
+        except Exception:
+            continue
+        texts.append(text)
+
+    print(f"{len(texts)} files, {sum(map(len, texts))} bytes, {repeats} repeats")
+    baseline = None
+    for name, loader in (("ruyaml round-trip", yaml.load),
+                         ("ruyaml safe", safe_yaml.load),
+                         ("libyaml safe (FastSafeLoader)", load_yaml_without_comments)):
+        per_file = measure(loader, texts, repeats)
+        baseline = baseline or per_file
+        print(f"{name:32} {per_file * 1000:8.3f} ms/file  x{baseline / per_file:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 import asyncio
+import hashlib
+import json
 import os
 import re
 import shutil
 import tempfile
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Any, Optional
 from urllib.parse import urljoin, urlparse, urlunparse
@@ -12,7 +13,12 @@
 import aiohttp
 import requests
 from aiohttp import BasicAuth
-from artifact_searcher.utils.constants import DEFAULT_REQUEST_TIMEOUT, TCP_CONNECTION_LIMIT, METADATA_XML
+from artifact_searcher.cache import ArtifactKey, artifact_cache
+from artifact_searcher.maven_metadata import MavenMetadata, metadata_cache
+from artifact_searcher.probe_index import probe_index, DEFAULT_DOMAIN, NEXUS_INDEX_VIEW_DOMAIN
+from artifact_searcher.utils.constants import DEFAULT_REQUEST_TIMEOUT, METADATA_XML, ARTIFACT_CONCURRENCY_LIMIT, \
+    DOWNLOAD_CHUNK_SIZE, VERIFY_CHECKSUMS, CHECKSUM_ALGORITHMS
+from artifact_searcher.utils.http_client import async_client, get_session
 from artifact_searcher.utils.models import Registry, Application, FileExtension, Credentials, ArtifactInfo
 from envgenehelper import logger
 from requests.auth import HTTPBasicAuth
@@ -69,46 +75,40 @@ async def resolve_snapshot_version_async(
     if stop_artifact_event.is_set() or stop_snapshot_event_for_others.is_set():
         return None
     try:
-        async with session.get(metadata_url) as response:
-            if response.status != 200:
-                logger.warning(
-                    f"[Task {task_id}] [Application: {app.name}: {version}] - Failed to fetch maven-metadata.xml: {metadata_url}, status: {response.status}")
-                return None
+        metadata = await metadata_cache.get_async(session, metadata_url)
+        if metadata.status != 200:
+            logger.warning(
+                f"[Task {task_id}] [Application: {app.name}: {version}] - Failed to fetch maven-metadata.xml: {metadata_url}, status: {metadata.status}")
+            return None
 
-            content = await response.text()
-            resolved_version = _parse_snapshot_version(content, app, task_id, extension, version, classifier)
-            if resolved_version:
-                stop_snapshot_event_for_others.set()
-                logger.info(
-                    f"[Task {task_id}] [Application: {app.name}: {version}] - Successfully fetched maven-metadata.xml: {metadata_url}")
-            return resolved_version, task_id
+        resolved_version = _parse_snapshot_version(metadata, app, task_id, extension, version, classifier)
+        if resolved_version:
+            stop_snapshot_event_for_others.set()
+            logger.info(
+                f"[Task {task_id}] [Application: {app.name}: {version}] - Successfully fetched maven-metadata.xml: {metadata_url}")
+        return resolved_version, task_id
     except Exception as e:
         logger.warning(
             f"[Task {task_id}] [Application: {app.name}: {version}] - Error resolving snapshot version from {metadata_url}: {e}")
 
 
 def _parse_snapshot_version(
-        content: str,
+        metadata: MavenMetadata,
         app: Application,
         task_id: int,
         extension: FileExtension,
         version: str,
         classifier: str = ""
 ) -> str | None:
-    root = ET.fromstring(content)
-    snapshot_versions = root.findall(".//snapshotVersions/snapshotVersion")
-    if not snapshot_versions:
+    if not metadata.snapshot_versions:
         logger.warning(f"[Application: {app.name}: {version}] - No <snapshotVersions> found")
         return
 
-    for node in snapshot_versions:
-        node_classifier = node.findtext("classifier", default="")
-        node_extension = node.findtext("extension", default="")
-        value = node.findtext("value")
-        if node_classifier == classifier and node_extension == extension:
-            logger.info(
-                f"[Task {task_id}] [Application: {app.name}: {version}] - Resolved snapshot version '{value}'")
-            return value
+    value = metadata.resolve(extension, classifier)
+    if value:
+        logger.info(
+            f"[Task {task_id}] [Application: {app.name}: {version}] - Resolved snapshot version '{value}'")
+        return value
 
     logger.warning(f"[Task {task_id}] [Application: {app.name}: {version}] - No matching snapshotVersion found")
 
@@ -134,11 +134,100 @@ def clean_temp_dir():
     os.makedirs(WORKSPACE, exist_ok=True)
 
 
+class PartialDownload:
+    """
+    Artifact content streamed chunk by chunk to a temporary file next to its target path.
+
+    The target is replaced atomically only after the whole content was received and matched the published checksum,
+    so an interrupted or corrupted download never leaves a truncated artifact behind
+    """
+
+    def __init__(self, target_path: str):
+        self.target_path = target_path
+        self.digests = {algorithm: hashlib.new(algorithm, usedforsecurity=False) for algorithm in CHECKSUM_ALGORITHMS}
+        target_dir = os.path.dirname(target_path) or "."
+        os.makedirs(target_dir, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target_path)}.", suffix=".part",
+                                             dir=target_dir)
+        self.file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        self.file.write(chunk)
+        for digest in self.digests.values():
+            digest.update(chunk)
+
+    def commit(self, url: str, checksum: tuple[str, str] | None = None):
+        self.file.close()
+        if checksum:
+            algorithm, expected = checksum
+            actual = self.digests[algorithm].hexdigest()
+            if actual != expected:
+                raise ValueError(f"Checksum mismatch for {url}: expected {algorithm} {expected}, got {actual}")
+        os.replace(self.tmp_path, self.target_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def _parse_checksum(algorithm: str, content: str) -> tuple[str, str] | None:
+    # sidecar files contain either the bare hex digest or "<digest>  <file name>"
+    parts = content.split()
+    return (algorithm, parts[0].lower()) if parts else None
+
+
+def fetch_checksum(url: str, auth=None) -> tuple[str, str] | None:
+    """Returns (algorithm, hex digest) published in the first available .sha1/.md5 sidecar of the artifact"""
+    if not VERIFY_CHECKSUMS:
+        return None
+    for algorithm in CHECKSUM_ALGORITHMS:
+        try:
+            response = get_session().get(f"{url}.{algorithm}", auth=auth, timeout=DEFAULT_REQUEST_TIMEOUT)
+            if response.status_code == 200 and (checksum := _parse_checksum(algorithm, response.text)):
+                return checksum
+        except requests.RequestException as e:
+            logger.debug(f"Error fetching {algorithm} checksum of {url}: {e}")
+    logger.debug(f"No checksum published for {url}, skipping verification")
+    return None
+
+
+async def fetch_checksum_async(session, url: str) -> tuple[str, str] | None:
+    if not VERIFY_CHECKSUMS:
+        return None
+    for algorithm in CHECKSUM_ALGORITHMS:
+        try:
+            async with session.get(f"{url}.{algorithm}") as response:
+                if response.status == 200 and (checksum := _parse_checksum(algorithm, await response.text())):
+                    return checksum
+        except aiohttp.ClientError as e:
+            logger.debug(f"Error fetching {algorithm} checksum of {url}: {e}")
+    logger.debug(f"No checksum published for {url}, skipping verification")
+    return None
+
+
+def copy_cached_artifact(url: str, target_path: str) -> bool:
+    cached_path = artifact_cache.get_file(url)
+    if not cached_path:
+        return False
+    with PartialDownload(target_path) as partial, open(cached_path, "rb") as f:
+        shutil.copyfileobj(f, partial.file)
+        partial.commit(url)
+    logger.info(f"Copied from cache: {target_path}")
+    return True
+
+
+def ensure_online(url: str):
+    if artifact_cache.offline:
+        raise ValueError(f"Artifact {url} is not cached, it can not be downloaded in offline mode")
+
+
 async def download_all_async(artifacts_info: list[ArtifactInfo], cred: Credentials | None = None):
     auth = BasicAuth(login=cred.username, password=cred.password) if cred else None
-    connector = aiohttp.TCPConnector(limit=TCP_CONNECTION_LIMIT)
-    timeout = aiohttp.ClientTimeout(total=DEFAULT_REQUEST_TIMEOUT)
-    async with aiohttp.ClientSession(connector=connector, timeout=timeout, auth=auth) as session:
+    async with async_client(auth) as session:
         async with asyncio.TaskGroup() as tg:
             tasks = [tg.create_task(download_async(session, artifact_info)) for artifact_info in artifacts_info]
         results = []
@@ -157,6 +246,61 @@ async def download_all_async(artifacts_info: list[ArtifactInfo], cred: Credentia
         return results
 
 
+async def resolve_many_async(apps_versions: list[tuple[Application, str]], artifact_extension: FileExtension,
+                             cred: Credentials | None = None,
+                             classifier: str = "") -> list[Optional[tuple[str, tuple[str, str]]]]:
+    """
+    Resolves artifacts of several applications concurrently, sharing one session, with at most
+    ARTIFACT_CONCURRENCY_LIMIT lookups at once. Results are in the order of apps_versions, None for not found ones
+    """
+    semaphore = asyncio.Semaphore(ARTIFACT_CONCURRENCY_LIMIT)
+
+    async def resolve(app: Application, version: str):
+        async with semaphore:
+            # lookup may switch registry domain of the application, so concurrent lookups must not share it
+            return await check_artifact_async(app.model_copy(deep=True), artifact_extension, version, cred,
+                                              classifier)
+
+    async with async_client():
+        return list(await asyncio.gather(*(resolve(app, version) for app, version in apps_versions)))
+
+
+async def download_many_async(apps_versions: list[tuple[Application, str]], artifact_extension: FileExtension,
+                              cred: Credentials | None = None,
+                              classifier: str = "") -> list[ArtifactInfo | None]:
+    """
+    Resolves and downloads artifacts of several applications concurrently, like resolve_many_async.
+    Each artifact is downloaded as soon as it is resolved, to <workspace_dir>/<app_name>/<app_version>/.
+    Results are in the order of apps_versions, None for not found or not downloaded ones
+    """
+    semaphore = asyncio.Semaphore(ARTIFACT_CONCURRENCY_LIMIT)
+    auth = BasicAuth(login=cred.username, password=cred.password) if cred else None
+
+    async def fetch(session, app: Application, version: str):
+        async with semaphore:
+            result = await check_artifact_async(app.model_copy(deep=True), artifact_extension, version, cred,
+                                                classifier)
+            if not result:
+                return None
+            url, repo = result
+            artifact_info = ArtifactInfo(url=url, app_name=app.name, app_version=version, repo=repo[0] if repo else "")
+            return await download_async(session, artifact_info)
+
+    async with async_client(auth) as session:
+        return list(await asyncio.gather(*(fetch(session, app, version) for app, version in apps_versions)))
+
+
+def resolve_many(apps_versions: list[tuple[Application, str]], artifact_extension: FileExtension,
+                 cred: Credentials | None = None,
+                 classifier: str = "") -> list[Optional[tuple[str, tuple[str, str]]]]:
+    return asyncio.run(resolve_many_async(apps_versions, artifact_extension, cred, classifier))
+
+
+def download_many(apps_versions: list[tuple[Application, str]], artifact_extension: FileExtension,
+                  cred: Credentials | None = None, classifier: str = "") -> list[ArtifactInfo | None]:
+    return asyncio.run(download_many_async(apps_versions, artifact_extension, cred, classifier))
+
+
 def create_app_artifacts_local_path(app_name, app_version):
     return f"{WORKSPACE}/{app_name}/{app_version}"
 
@@ -171,12 +315,21 @@ async def download_async(session, artifact_info: ArtifactInfo) -> ArtifactInfo:
     url = artifact_info.url
     app_local_path = create_app_artifacts_local_path(artifact_info.app_name, artifact_info.app_version)
     artifact_local_path = os.path.join(app_local_path, os.path.basename(url))
-    os.makedirs(os.path.dirname(artifact_local_path), exist_ok=True)
+    if copy_cached_artifact(url, artifact_local_path):
+        artifact_info.local_path = artifact_local_path
+        return artifact_info
+    if artifact_cache.offline:
+        logger.error(f"Artifact {url} is not cached, it can not be downloaded in offline mode")
+        return None
     try:
         async with session.get(url) as response:
             if response.status == 200:
-                with open(artifact_local_path, "wb") as f:
-                    f.write(await response.read())
+                checksum = await fetch_checksum_async(session, url)
+                with PartialDownload(artifact_local_path) as partial:
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        partial.write(chunk)
+                    partial.commit(url, checksum)
+                artifact_cache.put_file(url, artifact_local_path)
                 logger.info(f"Downloaded: {artifact_local_path}")
                 artifact_info.local_path = artifact_local_path
                 return artifact_info
@@ -253,17 +406,18 @@ async def _attempt_check(
         artifact_extension: FileExtension,
         registry_url: str | None = None,
         cred: Credentials | None = None,
-        classifier: str = ""
+        classifier: str = "",
+        repos_dict: dict[str, str] | None = None
 ) -> Optional[tuple[str, tuple[str, str]]]:
-    repos_dict = get_repo_value_pointer_dict(app.registry)
+    if repos_dict is None:
+        repos_dict = get_repo_value_pointer_dict(app.registry)
     if registry_url:
         app.registry.maven_config.repository_domain_name = registry_url
 
     auth = BasicAuth(login=cred.username, password=cred.password) if cred else None
-    timeout = aiohttp.ClientTimeout(total=DEFAULT_REQUEST_TIMEOUT)
     stop_snapshot_event_for_others = asyncio.Event()
     stop_artifact_event = asyncio.Event()
-    async with aiohttp.ClientSession(timeout=timeout, auth=auth) as session:
+    async with async_client(auth) as session:
         async with asyncio.TaskGroup() as tg:
             tasks = [
                 tg.create_task(
@@ -294,6 +448,7 @@ async def check_artifact_async(
     """
     Resolves the full artifact URL and the first repository where it was found.
     Supports both release and snapshot versions.
+    Cached releases and, in offline mode, all cached artifacts are resolved without requests to the registry.
 
     Returns:
         Optional[tuple[str, tuple[str, str]]]: A tuple containing:
@@ -301,9 +456,33 @@ async def check_artifact_async(
             - tuple[str, str]: A pair of (repository name, repository pointer/alias in CMDB).
             Returns None if the artifact could not be resolved
     """
+    key = ArtifactKey(app.group_id, app.artifact_id, version, classifier, artifact_extension.value)
+    cached = artifact_cache.get_resolution(key)
+    if cached or artifact_cache.offline:
+        if not cached:
+            logger.warning(f"Artifact {key} is not cached, it can not be resolved in offline mode")
+        return cached
+
+    async with async_client():
+        result = await _resolve_artifact_async(app, artifact_extension, version, cred, classifier)
+    if result is not None:
+        artifact_cache.remember(key, *result)
+    return result
+
+
+async def _resolve_artifact_async(
+        app: Application, artifact_extension: FileExtension, version: str, cred: Credentials | None = None,
+        classifier: str = "") -> Optional[tuple[str, tuple[str, str]]] | None:
+    learned = probe_index.lookup(app, version)
+    if learned:
+        result = await _check_learned_repo(app, artifact_extension, version, learned, cred, classifier)
+        if result is not None:
+            return result
 
-    result = await _attempt_check(app, version, artifact_extension, None, cred)
+    result = await _attempt_check(app, version, artifact_extension, None, cred,
+                                  repos_dict=_get_repos_not_checked(app, learned, DEFAULT_DOMAIN))
     if result is not None:
+        probe_index.record(app, version, DEFAULT_DOMAIN, result[1][1])
         return result
 
     if not app.registry.maven_config.is_nexus:
@@ -314,8 +493,10 @@ async def check_artifact_async(
     fixed_domain = convert_nexus_repo_url_to_index_view(original_domain)
     if fixed_domain != original_domain:
         logger.info(f"Retrying artifact check with edited domain: {fixed_domain}")
-        result = await _attempt_check(app, version, artifact_extension, fixed_domain, cred, classifier)
+        result = await _attempt_check(app, version, artifact_extension, fixed_domain, cred, classifier,
+                                      _get_repos_not_checked(app, learned, NEXUS_INDEX_VIEW_DOMAIN))
         if result is not None:
+            probe_index.record(app, version, NEXUS_INDEX_VIEW_DOMAIN, result[1][1])
             return result
     else:
         logger.debug("Domain is same after editing, skipping retry")
@@ -323,6 +504,40 @@ async def check_artifact_async(
     logger.warning("Artifact not found")
 
 
+def _get_repos_not_checked(app: Application, learned: dict[str, str] | None, domain: str) -> dict[str, str]:
+    """Repositories of the registry without the learned one, when it was already checked in the same domain variant"""
+    repos_dict = get_repo_value_pointer_dict(app.registry)
+    if not learned or learned["domain"] != domain:
+        return repos_dict
+    return {value: pointer for value, pointer in repos_dict.items() if pointer != learned["repo"]}
+
+
+async def _check_learned_repo(
+        app: Application, artifact_extension: FileExtension, version: str, learned: dict[str, str],
+        cred: Credentials | None = None,
+        classifier: str = "") -> Optional[tuple[str, tuple[str, str]]] | None:
+    """Checks only the repository and domain variant which served artifacts of the same group before"""
+    repo_values = {pointer: value for value, pointer in get_repo_value_pointer_dict(app.registry).items() if value}
+    repo_value = repo_values.get(learned["repo"])
+    original_domain = app.registry.maven_config.repository_domain_name
+    if learned["domain"] == NEXUS_INDEX_VIEW_DOMAIN:
+        domain = convert_nexus_repo_url_to_index_view(original_domain) if app.registry.maven_config.is_nexus else None
+    else:
+        domain = original_domain
+    if not repo_value or not domain:
+        return None
+
+    logger.info(f"[Application: {app.name}: {version}] - Checking {learned['repo']} first, it served this group before")
+    try:
+        result = await _attempt_check(app, version, artifact_extension, domain, cred, classifier,
+                                      {repo_value: learned["repo"]})
+    finally:
+        app.registry.maven_config.repository_domain_name = original_domain
+    if result is None:
+        logger.info(f"[Application: {app.name}: {version}] - Not found in {learned['repo']}, checking all repositories")
+    return result
+
+
 def unzip_file(artifact_id: str, app_name: str, app_version: str, zip_url: str):
     extracted = False
     app_artifacts_dir = f"{artifact_id}/"
@@ -359,7 +574,7 @@ def create_aql_artifact(app: Application, artifact_extension: FileExtension, ver
 
 def check_artifacts_by_aql(aql: str, cred: Credentials, url: str) -> list[ArtifactInfo]:
     artifacts = []
-    response = requests.post(f"{url}/api/search/aql", data=aql, auth=HTTPBasicAuth(cred.username, cred.password))
+    response = get_session().post(f"{url}/api/search/aql", data=aql, auth=HTTPBasicAuth(cred.username, cred.password))
     results = response.json()
     for result in results.get("results"):
         repo = result.get("repo")
@@ -376,8 +591,13 @@ def check_artifacts_by_aql(aql: str, cred: Credentials, url: str) -> list[Artifa
 # --------------------------------------------------------------------------------------
 
 def download_json_content(url: str, cred: Credentials | None = None) -> dict[str, Any]:
+    cached_path = artifact_cache.get_file(url)
+    if cached_path:
+        with open(cached_path, "rb") as f:
+            return json.load(f)
+    ensure_online(url)
     auth = HTTPBasicAuth(cred.username, cred.password) if cred else None
-    response = requests.get(
+    response = get_session().get(
         url,
         auth=auth,
         timeout=DEFAULT_REQUEST_TIMEOUT
@@ -385,16 +605,23 @@ def download_json_content(url: str, cred: Credentials | None = None) -> dict[str
     response.raise_for_status()
     json_data = response.json()
     logger.info(f"Got json data by url {url}")
+    artifact_cache.put_content(url, response.content)
     return json_data
 
 
 def download(url: str, target_path: str, cred: Credentials | None = None) -> str:
+    if copy_cached_artifact(url, target_path):
+        return target_path
+    ensure_online(url)
     auth = HTTPBasicAuth(cred.username, cred.password) if cred else None
-    os.makedirs(os.path.dirname(target_path), exist_ok=True)
-    response = requests.get(url, auth=auth, timeout=DEFAULT_REQUEST_TIMEOUT)
-    response.raise_for_status()
-    with open(target_path, "wb") as f:
-        f.write(response.content)
+    with get_session().get(url, auth=auth, timeout=DEFAULT_REQUEST_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        checksum = fetch_checksum(url, auth)
+        with PartialDownload(target_path) as partial:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                partial.write(chunk)
+            partial.commit(url, checksum)
+    artifact_cache.put_file(url, target_path)
     logger.info(f"Downloaded: {target_path}")
     return target_path
 
@@ -403,6 +630,23 @@ def check_artifact(repo_url: str, group_id: str, artifact_id: str, version: str,
                    artifact_extension: FileExtension,
                    cred: Credentials | None = None,
                    classifier: str = "") -> str | None:
+    key = ArtifactKey(group_id, artifact_id, version, classifier, artifact_extension.value)
+    cached = artifact_cache.get_resolution(key)
+    if cached or artifact_cache.offline:
+        if not cached:
+            logger.warning(f"Artifact {key} is not cached, it can not be resolved in offline mode")
+        return cached[0] if cached else None
+
+    full_url = _resolve_artifact(repo_url, group_id, artifact_id, version, artifact_extension, cred, classifier)
+    if full_url:
+        artifact_cache.remember(key, full_url)
+    return full_url
+
+
+def _resolve_artifact(repo_url: str, group_id: str, artifact_id: str, version: str,
+                      artifact_extension: FileExtension,
+                      cred: Credentials | None = None,
+                      classifier: str = "") -> str | None:
     base = repo_url.rstrip("/") + "/"
     group_id = group_id.replace(".", "/")
 
@@ -418,7 +662,7 @@ def check_artifact(repo_url: str, group_id: str, artifact_id: str, version: str,
     full_url = urljoin(base, f"{group_id}/{artifact_id}/{folder}/{filename}")
 
     try:
-        response = requests.head(full_url, timeout=DEFAULT_REQUEST_TIMEOUT)
+        response = get_session().head(full_url, timeout=DEFAULT_REQUEST_TIMEOUT)
         if response.status_code == 200:
             logger.info(
                 f"[Repository: {repo_url}] [Artifact: {group_id}:{artifact_id}:{version}] - Artifact found: {full_url}"
@@ -441,28 +685,18 @@ def resolve_snapshot_version(base_path, extension: FileExtension, cred: Credenti
     auth = HTTPBasicAuth(cred.username, cred.password) if cred else None
 
     try:
-        response = requests.get(
-            metadata_url,
-            auth=auth,
-            timeout=DEFAULT_REQUEST_TIMEOUT,
-        )
-        if response.status_code != 200:
-            logger.warning(f"Failed to fetch {metadata_url}, status={response.status_code}")
+        metadata = metadata_cache.get(metadata_url, auth)
+        if metadata.status != 200:
+            logger.warning(f"Failed to fetch {metadata_url}, status={metadata.status}")
             return None
-        content = response.text
-        root = ET.fromstring(content)
-        snapshot_versions = root.findall(".//snapshotVersions/snapshotVersion")
-        if not snapshot_versions:
+        if not metadata.snapshot_versions:
             logger.warning(f"No <snapshotVersions> found")
             return
 
-        for node in snapshot_versions:
-            node_classifier = node.findtext("classifier", default="")
-            node_extension = node.findtext("extension", default="")
-            value = node.findtext("value")
-            if node_classifier == classifier and node_extension == extension:
-                logger.info(f"Resolved snapshot version '{value}'")
-                return value
+        value = metadata.resolve(extension, classifier)
+        if value:
+            logger.info(f"Resolved snapshot version '{value}'")
+            return value
 
         logger.warning(f"No matching snapshotVersion found")
 
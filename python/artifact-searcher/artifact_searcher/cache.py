@@ -0,0 +1,265 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from artifact_searcher.utils.constants import ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_MAX_BYTES, OFFLINE_MODE
+from envgenehelper import logger
+
+
+@dataclass(frozen=True)
+class ArtifactKey:
+    """Maven coordinates of a single artifact file"""
+    group_id: str
+    artifact_id: str
+    version: str
+    classifier: str = ""
+    extension: str = ""
+
+    def __str__(self):
+        return f"{self.group_id}:{self.artifact_id}:{self.version}:{self.classifier}:{self.extension}"
+
+    @property
+    def is_snapshot(self) -> bool:
+        return self.version.endswith("-SNAPSHOT")
+
+
+def _write_part_file(target_path: str, write) -> str:
+    # part files start with a dot, so that eviction skips them
+    target_dir = os.path.dirname(target_path)
+    os.makedirs(target_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target_path)}.", suffix=".part", dir=target_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path
+
+
+def _replace_atomically(target_path: str, write):
+    tmp_path = _write_part_file(target_path, write)
+    try:
+        os.replace(tmp_path, target_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _hash_file(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """
+    Persistent on-disk cache of artifacts downloaded from maven registries.
+
+    Entries are keyed by maven coordinates and refer to content stored by its sha256, so the same file published
+    under several coordinates is stored once. Release entries never expire. A SNAPSHOT entry is used only while
+    maven-metadata.xml still resolves the snapshot to the same timestamped artifact, except in offline mode, where
+    the last resolved one is served. Total size of content is kept in the cache index, least recently used entries
+    are evicted when a write makes it exceed max_bytes. Processes sharing the cache dir store content and evict
+    under a file lock.
+
+    Downloads address artifacts by URL, so URLs are mapped to coordinates when artifacts are resolved
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = ARTIFACT_CACHE_MAX_BYTES, offline: bool = False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._url_keys: dict[str, ArtifactKey] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.cache_dir)
+
+    def _entry_path(self, key: ArtifactKey) -> str:
+        return os.path.join(self.cache_dir, "entries", hashlib.sha256(str(key).encode()).hexdigest() + ".json")
+
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, "index.json")
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_used_bytes(self) -> int | None:
+        try:
+            with open(self._index_path()) as f:
+                return int(json.load(f)["used_bytes"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_used_bytes(self, used_bytes: int):
+        _replace_atomically(self._index_path(), lambda f: f.write(json.dumps({"used_bytes": used_bytes}).encode()))
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.cache_dir, "blobs", sha256[:2], sha256)
+
+    def _read_entry(self, key: ArtifactKey) -> dict | None:
+        try:
+            with open(self._entry_path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("key") == str(key) else None
+
+    def _write_entry(self, key: ArtifactKey, entry: dict):
+        entry["key"] = str(key)
+        _replace_atomically(self._entry_path(key), lambda f: f.write(json.dumps(entry).encode()))
+
+    def _get_blob(self, key: ArtifactKey, entry: dict) -> str | None:
+        blob_path = self._blob_path(entry["sha256"]) if entry.get("sha256") else None
+        if not blob_path or not os.path.isfile(blob_path):
+            return None
+        # entry modification time is the last use time for eviction
+        os.utime(self._entry_path(key))
+        return blob_path
+
+    def get_resolution(self, key: ArtifactKey) -> tuple[str, tuple[str, str] | None] | None:
+        """
+        Returns (url, repository) the artifact was resolved to by a previous lookup, when it can be used without
+        asking the registry: for cached releases, and for anything previously resolved in offline mode
+        """
+        if not self.enabled:
+            return None
+        entry = self._read_entry(key)
+        if not entry:
+            return None
+        if not self.offline and (key.is_snapshot or not self._get_blob(key, entry)):
+            return None
+        logger.info(f"[Cache] Artifact {key} resolved from cache: {entry['url']}")
+        self._url_keys[entry["url"]] = key
+        repo = entry.get("repo")
+        return entry["url"], tuple(repo) if repo else None
+
+    def remember(self, key: ArtifactKey, url: str, repo: tuple[str, str] | None = None):
+        """Records the URL the artifact was resolved to, so that downloads by this URL are cached under the key"""
+        if not self.enabled:
+            return
+        self._url_keys[url] = key
+        entry = self._read_entry(key) or {}
+        if entry.get("url") != url and key.is_snapshot:
+            # the snapshot was resolved to another timestamped build, cached content is stale
+            entry = {}
+        entry["url"] = url
+        if repo:
+            entry["repo"] = list(repo)
+        self._write_entry(key, entry)
+
+    def get_file(self, url: str) -> str | None:
+        """Returns path of cached content downloaded before by the URL"""
+        key = self._url_keys.get(url)
+        if key is None:
+            return None
+        entry = self._read_entry(key)
+        blob_path = self._get_blob(key, entry) if entry and entry.get("url") == url else None
+        if blob_path:
+            logger.info(f"[Cache] Using cached content of {key}")
+        return blob_path
+
+    def put_file(self, url: str, file_path: str):
+        """Stores downloaded content of the URL, if the URL was resolved from maven coordinates"""
+        if url not in self._url_keys:
+            return
+
+        def copy(target):
+            with open(file_path, "rb") as source:
+                shutil.copyfileobj(source, target)
+
+        self._store(url, lambda: _hash_file(file_path), copy)
+
+    def put_content(self, url: str, content: bytes):
+        if url in self._url_keys:
+            self._store(url, lambda: hashlib.sha256(content).hexdigest(), lambda target: target.write(content))
+
+    def _store(self, url: str, get_sha256, write):
+        # caching is best-effort, the downloaded artifact is usable anyway
+        try:
+            self._store_blob(url, get_sha256(), write)
+        except OSError as e:
+            logger.warning(f"[Cache] Content of {self._url_keys[url]} was not cached: {e}")
+
+    def _store_blob(self, url: str, sha256: str, write):
+        key = self._url_keys[url]
+        blob_path = self._blob_path(sha256)
+        # content is written outside of the lock, the blob appears together with its entry
+        part_path = None if os.path.isfile(blob_path) else _write_part_file(blob_path, write)
+        try:
+            with self._locked():
+                if part_path is None and not os.path.isfile(blob_path):
+                    # the blob was evicted by another process after the check above
+                    part_path = _write_part_file(blob_path, write)
+                new_blob = part_path is not None and not os.path.isfile(blob_path)
+                if part_path:
+                    os.replace(part_path, blob_path)
+                entry = self._read_entry(key) or {"url": url}
+                entry.update(sha256=sha256, size=os.path.getsize(blob_path))
+                self._write_entry(key, entry)
+                used_bytes = self._read_used_bytes()
+                if used_bytes is None or (new_blob and used_bytes + entry["size"] > self.max_bytes):
+                    # the index is missing in caches written by previous versions
+                    self._evict()
+                elif new_blob:
+                    self._write_used_bytes(used_bytes + entry["size"])
+        finally:
+            if part_path and os.path.exists(part_path):
+                os.remove(part_path)
+        logger.info(f"[Cache] Stored content of {key}")
+
+    def evict(self):
+        with self._locked():
+            self._evict()
+
+    def _evict(self):
+        entries_dir = os.path.join(self.cache_dir, "entries")
+        entries = []
+        for file_name in os.listdir(entries_dir):
+            entry_path = os.path.join(entries_dir, file_name)
+            try:
+                with open(entry_path) as f:
+                    entries.append((os.path.getmtime(entry_path), entry_path, json.load(f).get("sha256")))
+            except (OSError, ValueError):
+                continue
+        blob_sizes = {}
+        for root, _, files in os.walk(os.path.join(self.cache_dir, "blobs")):
+            for file_name in files:
+                if not file_name.startswith("."):
+                    blob_sizes[file_name] = os.path.getsize(os.path.join(root, file_name))
+        references = {}
+        for _, _, sha256 in entries:
+            references[sha256] = references.get(sha256, 0) + 1
+        for sha256 in blob_sizes.keys() - references.keys():
+            os.remove(self._blob_path(sha256))
+            del blob_sizes[sha256]
+
+        used_bytes = sum(blob_sizes.values())
+        for _, entry_path, sha256 in sorted(entries):
+            if used_bytes <= self.max_bytes:
+                break
+            os.remove(entry_path)
+            references[sha256] -= 1
+            if sha256 in blob_sizes and not references[sha256]:
+                os.remove(self._blob_path(sha256))
+                used_bytes -= blob_sizes.pop(sha256)
+                logger.info(f"[Cache] Evicted {sha256}")
+        self._write_used_bytes(used_bytes)
+
+
+artifact_cache = ArtifactCache(ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_MAX_BYTES, OFFLINE_MODE)
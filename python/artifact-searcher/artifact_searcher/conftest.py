@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def probe_index(tmp_path, monkeypatch):
+    # imported here, so that test modules can configure artifact_searcher through environment before import
+    from artifact_searcher import artifact
+    from artifact_searcher.probe_index import ProbeIndex
+
+    # lookups must not learn from repositories of other tests
+    index = ProbeIndex(str(tmp_path / "probe_index.json"))
+    monkeypatch.setattr(artifact, "probe_index", index)
+    return index
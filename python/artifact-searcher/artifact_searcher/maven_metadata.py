@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+
+from artifact_searcher.utils.constants import DEFAULT_REQUEST_TIMEOUT, METADATA_CACHE_TTL
+from artifact_searcher.utils.http_client import get_session
+
+# other failures are transient and are not cached
+CACHED_STATUSES = (200, 304, 404)
+
+
+@dataclass
+class MavenMetadata:
+    status: int
+    # (classifier, extension) -> timestamped version
+    snapshot_versions: dict[tuple[str, str], str] = field(default_factory=dict)
+    etag: str = ""
+    last_modified: str = ""
+    fetched_at: float = 0.0
+
+    def resolve(self, extension: str, classifier: str = "") -> str | None:
+        # FileExtension members compare equal to their values but hash differently
+        return self.snapshot_versions.get((classifier, getattr(extension, "value", extension)))
+
+
+def parse_snapshot_versions(content: str) -> dict[tuple[str, str], str]:
+    root = ET.fromstring(content)
+    snapshot_versions = {}
+    for node in root.findall(".//snapshotVersions/snapshotVersion"):
+        key = (node.findtext("classifier", default=""), node.findtext("extension", default=""))
+        # the first entry wins, as in a sequential scan of the document
+        snapshot_versions.setdefault(key, node.findtext("value"))
+    return snapshot_versions
+
+
+class MavenMetadataCache:
+    """
+    maven-metadata.xml documents of snapshots by URL, that is by registry, repository, group, artifact and base
+    version. One parsed document answers lookups of all extensions and classifiers of the snapshot. It is used for
+    ttl seconds, then revalidated with a conditional request. Missing documents are cached as well, so that other
+    lookups in the same repository do not repeat them
+    """
+
+    def __init__(self, ttl: float = METADATA_CACHE_TTL):
+        self.ttl = ttl
+        self._documents: dict[str, MavenMetadata] = {}
+        self._pending: dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+    def _get_cached(self, url: str) -> tuple[MavenMetadata | None, bool]:
+        with self._lock:
+            document = self._documents.get(url)
+        return document, document is not None and time.monotonic() - document.fetched_at < self.ttl
+
+    @staticmethod
+    def _conditional_headers(document: MavenMetadata | None) -> dict[str, str]:
+        headers = {}
+        if document and document.status == 200:
+            if document.etag:
+                headers["If-None-Match"] = document.etag
+            if document.last_modified:
+                headers["If-Modified-Since"] = document.last_modified
+        return headers
+
+    def _store(self, url: str, previous: MavenMetadata | None, status: int, headers, content: str) -> MavenMetadata:
+        if status == 304 and previous:
+            document = previous
+        else:
+            document = MavenMetadata(status)
+            if status == 200:
+                document.snapshot_versions = parse_snapshot_versions(content)
+                document.etag = headers.get("ETag", "")
+                document.last_modified = headers.get("Last-Modified", "")
+        document.fetched_at = time.monotonic()
+        if status in CACHED_STATUSES:
+            with self._lock:
+                self._documents[url] = document
+        return document
+
+    def get(self, url: str, auth=None) -> MavenMetadata:
+        document, fresh = self._get_cached(url)
+        if fresh:
+            return document
+        response = get_session().get(url, auth=auth, timeout=DEFAULT_REQUEST_TIMEOUT,
+                                     headers=self._conditional_headers(document))
+        content = response.text if response.status_code == 200 else ""
+        return self._store(url, document, response.status_code, response.headers, content)
+
+    async def get_async(self, session, url: str) -> MavenMetadata:
+        document, fresh = self._get_cached(url)
+        if fresh:
+            return document
+        # concurrent lookups of the same snapshot wait for a single request
+        loop = asyncio.get_running_loop()
+        task = self._pending.get(url)
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._fetch_async(session, url, document))
+            self._pending[url] = task
+            task.add_done_callback(lambda done: self._pending.pop(url, None) if self._pending.get(url) is done
+                                   else None)
+        return await asyncio.shield(task)
+
+    async def _fetch_async(self, session, url: str, previous: MavenMetadata | None) -> MavenMetadata:
+        async with session.get(url, headers=self._conditional_headers(previous)) as response:
+            content = await response.text() if response.status == 200 else ""
+            return self._store(url, previous, response.status, response.headers, content)
+
+
+metadata_cache = MavenMetadataCache()
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+
+from artifact_searcher.utils.constants import PROBE_INDEX_FILE
+from artifact_searcher.utils.models import Application
+from envgenehelper import logger
+
+DEFAULT_DOMAIN = "default"
+NEXUS_INDEX_VIEW_DOMAIN = "nexusIndexView"
+
+
+class ProbeIndex:
+    """
+    Repository pointer and registry domain variant which served artifacts of each group and group/artifact prefix,
+    separately for release and SNAPSHOT versions. Lookups probe the learned repository first and check all of them
+    only when the artifact is not there. The index is a small json file shared by subsequent runs
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._entries: dict[str, dict[str, str]] | None = None
+
+    def _load(self) -> dict[str, dict[str, str]]:
+        if self._entries is None:
+            try:
+                with open(self.index_path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    @staticmethod
+    def _keys(app: Application, version: str) -> list[str]:
+        kind = "snapshot" if version.endswith("-SNAPSHOT") else "release"
+        group_key = f"{app.registry.name}|{kind}|{app.group_id}"
+        return [f"{group_key}:{app.artifact_id}", group_key]
+
+    def lookup(self, app: Application, version: str) -> dict[str, str] | None:
+        entries = self._load()
+        return next((entries[key] for key in self._keys(app, version) if key in entries), None)
+
+    def record(self, app: Application, version: str, domain: str, repo_pointer: str):
+        entries = self._load()
+        entry = {"domain": domain, "repo": repo_pointer}
+        keys = self._keys(app, version)
+        if all(entries.get(key) == entry for key in keys):
+            return
+        for key in keys:
+            entries[key] = entry
+        try:
+            os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.index_path) or ".", suffix=".part")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.debug(f"Probe index {self.index_path} was not saved: {e}")
+
+
+probe_index = ProbeIndex(PROBE_INDEX_FILE)
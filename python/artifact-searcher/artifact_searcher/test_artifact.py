@@ -1,11 +1,20 @@
+import asyncio
+import hashlib
+import json
 import os
+import time
+from types import SimpleNamespace
 
 import pytest
+import responses
 from aiohttp import web
 
 os.environ["DEFAULT_REQUEST_TIMEOUT"] = "0.2"  # for test cases to run quicker
+os.environ["HTTP_RETRY_BACKOFF"] = "0.01"
 from artifact_searcher.utils import models
+from artifact_searcher import artifact
 from artifact_searcher.artifact import check_artifact_async
+from artifact_searcher.probe_index import ProbeIndex
 
 
 class MockResponse:
@@ -65,7 +74,7 @@ def mock_get(url, *args, **kwargs):
             if url == status_url:
                 return MockResponse(200)
 
-        monkeypatch.setattr("artifact_searcher.utils.models.requests.get", mock_get)
+        monkeypatch.setattr("artifact_searcher.utils.models.get_session", lambda: SimpleNamespace(get=mock_get))
 
     mvn_cfg = models.MavenConfig(
         target_snapshot="repo",
@@ -93,3 +102,173 @@ def mock_get(url, *args, **kwargs):
 
     sample_url = f"{base_url.rstrip('/repository/')}{index_path}repo/com/example/app/1.0.0-SNAPSHOT/app-1.0.0-20240702.123456-1.json"
     assert full_url == sample_url, f"expected: {sample_url}, received: {full_url}"
+
+
+ARTIFACT_CONTENT = os.urandom(10 * 1024 + 7)
+
+
+@responses.activate
+@pytest.mark.parametrize(
+    "sidecars, downloaded",
+    [
+        ({"sha1": hashlib.sha1(ARTIFACT_CONTENT).hexdigest()}, True),
+        ({"md5": hashlib.md5(ARTIFACT_CONTENT).hexdigest() + "  app-1.0.zip"}, True),
+        ({}, True),
+        ({"sha1": "0" * 40}, False),
+    ],
+)
+def test_download_is_streamed_and_verified(tmp_path, monkeypatch, sidecars, downloaded):
+    monkeypatch.setattr(artifact, "DOWNLOAD_CHUNK_SIZE", 1024)
+    written = []
+    write = artifact.PartialDownload.write
+    monkeypatch.setattr(artifact.PartialDownload, "write",
+                        lambda self, chunk: written.append(len(chunk)) or write(self, chunk))
+    url = "https://registry.example.com/repo/app-1.0.zip"
+    responses.get(url, body=ARTIFACT_CONTENT)
+    for algorithm in ("sha1", "md5"):
+        if algorithm in sidecars:
+            responses.get(f"{url}.{algorithm}", body=sidecars[algorithm])
+        else:
+            responses.get(f"{url}.{algorithm}", status=404)
+    target_path = str(tmp_path / "app" / "app-1.0.zip")
+
+    if downloaded:
+        assert artifact.download(url, target_path) == target_path
+        with open(target_path, "rb") as f:
+            assert f.read() == ARTIFACT_CONTENT
+        assert max(written) <= 1024
+    else:
+        with pytest.raises(ValueError, match="Checksum mismatch"):
+            artifact.download(url, target_path)
+    assert os.listdir(tmp_path / "app") == (["app-1.0.zip"] if downloaded else [])
+
+
+async def test_download_async_is_streamed_and_verified(aiohttp_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact, "DOWNLOAD_CHUNK_SIZE", 1024)
+    monkeypatch.setattr(artifact, "WORKSPACE", tmp_path)
+    checksums = {"good": hashlib.sha1(ARTIFACT_CONTENT).hexdigest(), "bad": "0" * 40}
+
+    async def artifact_handler(request):
+        return web.Response(body=ARTIFACT_CONTENT)
+
+    async def sha1_handler(request):
+        return web.Response(text=checksums[request.match_info["name"]])
+
+    app_web = web.Application()
+    app_web.router.add_get("/{name}/app-1.0.zip", artifact_handler)
+    app_web.router.add_get("/{name}/app-1.0.zip.sha1", sha1_handler)
+    server = await aiohttp_server(app_web)
+
+    good = models.ArtifactInfo(url=str(server.make_url("/good/app-1.0.zip")), app_name="good", app_version="1.0")
+    bad = models.ArtifactInfo(url=str(server.make_url("/bad/app-1.0.zip")), app_name="bad", app_version="1.0")
+    with pytest.raises(ValueError, match="Some tasks failed"):
+        await artifact.download_all_async([good, bad])
+
+    with open(good.local_path, "rb") as f:
+        assert f.read() == ARTIFACT_CONTENT
+    assert os.listdir(tmp_path / "bad" / "1.0") == []
+
+
+async def test_batch_lookup_is_concurrent_and_ordered(aiohttp_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact, "WORKSPACE", tmp_path)
+
+    async def artifact_handler(request):
+        await asyncio.sleep(0.1)
+        if request.match_info["name"] == "missing" or not request.match_info["file"].endswith(".json"):
+            return web.Response(status=404)
+        return web.json_response({"name": request.match_info["name"]})
+
+    app_web = web.Application()
+    app_web.router.add_route("*", "/maven/repo/com/example/{name}/1.0/{file}", artifact_handler)
+    server = await aiohttp_server(app_web)
+
+    reg = models.Registry(
+        name="registry",
+        maven_config=models.MavenConfig(target_snapshot="repo", target_staging="repo", target_release="repo",
+                                        repository_domain_name=str(server.make_url("/maven/"))),
+        docker_config=models.DockerConfig(),
+    )
+    names = [f"app-{i}" for i in range(10)] + ["missing"]
+    apps_versions = [(models.Application(name=name, artifact_id=name, group_id="com.example", registry=reg,
+                                         solution_descriptor=False), "1.0") for name in names]
+
+    start = time.perf_counter()
+    resolved = await artifact.resolve_many_async(apps_versions, models.FileExtension.JSON)
+    downloaded = await artifact.download_many_async(apps_versions, models.FileExtension.JSON)
+    assert time.perf_counter() - start < 1
+
+    assert [result[0].rsplit("/", 1)[1] if result else None for result in resolved] == \
+           [f"{name}-1.0.json" for name in names[:-1]] + [None]
+    assert downloaded[-1] is None
+    for name, artifact_info in zip(names, downloaded[:-1]):
+        with open(artifact_info.local_path) as f:
+            assert json.load(f) == {"name": name}
+
+
+async def test_learned_repository_is_checked_first(aiohttp_server, probe_index):
+    published = {"app-a": "releases", "app-b": "releases", "app-c": "staging"}
+    checked = []
+
+    async def artifact_handler(request):
+        repo, name = request.match_info["repo"], request.match_info["name"]
+        checked.append((name, repo))
+        return web.Response(status=200 if published[name] == repo else 404)
+
+    app_web = web.Application()
+    app_web.router.add_route("HEAD", "/maven/{repo}/com/example/{name}/1.0/{file}", artifact_handler)
+    server = await aiohttp_server(app_web)
+    reg = models.Registry(
+        name="registry",
+        maven_config=models.MavenConfig(target_snapshot="snapshots", target_staging="staging",
+                                        target_release="releases",
+                                        repository_domain_name=str(server.make_url("/maven/"))),
+        docker_config=models.DockerConfig(),
+    )
+
+    def application(name):
+        return models.Application(name=name, artifact_id=name, group_id="com.example", registry=reg,
+                                  solution_descriptor=False)
+
+    def lookup(name):
+        checked.clear()
+        return check_artifact_async(application(name), models.FileExtension.JSON, "1.0")
+
+    _, repo = await lookup("app-a")
+    assert repo == ("releases", "targetRelease")
+    assert len(checked) == 3
+    learned = {"domain": "default", "repo": "targetRelease"}
+    assert ProbeIndex(probe_index.index_path).lookup(application("app-b"), "1.0") == learned
+
+    _, repo = await lookup("app-b")
+    assert repo == ("releases", "targetRelease")
+    assert checked == [("app-b", "releases")]
+
+    _, repo = await lookup("app-c")
+    assert repo == ("staging", "targetStaging")
+    # the learned repository is not checked again by the fallback
+    assert checked[0] == ("app-c", "releases") and sorted(checked[1:]) == [("app-c", "snapshots"),
+                                                                          ("app-c", "staging")]
+    assert probe_index.lookup(application("app-d"), "1.0") == {"domain": "default", "repo": "targetStaging"}
+
+
+async def test_learned_check_restores_domain_on_error(monkeypatch):
+    reg = models.Registry(
+        name="registry",
+        maven_config=models.MavenConfig(target_snapshot="snapshots", target_staging="staging",
+                                        target_release="releases",
+                                        repository_domain_name="https://nexus.example.com/repository/"),
+        docker_config=models.DockerConfig(),
+    )
+    reg.maven_config.is_nexus = True
+    app = models.Application(name="app", artifact_id="app", group_id="com.example", registry=reg,
+                             solution_descriptor=False)
+
+    async def failing_check(app, version, artifact_extension, registry_url=None, *args):
+        app.registry.maven_config.repository_domain_name = registry_url
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(artifact, "_attempt_check", failing_check)
+    with pytest.raises(RuntimeError):
+        await artifact._check_learned_repo(app, models.FileExtension.JSON, "1.0",
+                                           {"domain": "nexusIndexView", "repo": "targetRelease"})
+    assert reg.maven_config.repository_domain_name == "https://nexus.example.com/repository/"
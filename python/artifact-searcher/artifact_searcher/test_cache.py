@@ -0,0 +1,174 @@
+import os
+
+import pytest
+import responses
+
+os.environ["DEFAULT_REQUEST_TIMEOUT"] = "0.2"  # for test cases to run quicker
+os.environ["HTTP_RETRY_BACKOFF"] = "0.01"
+from artifact_searcher import artifact
+from artifact_searcher.cache import ArtifactCache, ArtifactKey
+from artifact_searcher.utils import models
+from artifact_searcher.utils.models import FileExtension
+
+REPO_URL = "https://registry.example.com/repo"
+RELEASE_URL = f"{REPO_URL}/com/example/app/1.0/app-1.0.zip"
+CONTENT = b"template archive"
+
+
+@pytest.fixture
+def use_cache(tmp_path, monkeypatch):
+    def use(offline=False, max_bytes=1024):
+        cache = ArtifactCache(str(tmp_path / "cache"), max_bytes, offline)
+        monkeypatch.setattr(artifact, "artifact_cache", cache)
+        return cache
+
+    return use
+
+
+def resolve_and_download(target_path):
+    url = artifact.check_artifact(REPO_URL, "com.example", "app", "1.0", FileExtension.ZIP)
+    return artifact.download(url, target_path) if url else None
+
+
+@responses.activate
+def test_release_is_served_from_cache(use_cache, tmp_path):
+    responses.head(RELEASE_URL)
+    responses.get(RELEASE_URL, body=CONTENT)
+    use_cache()
+    resolve_and_download(str(tmp_path / "first.zip"))
+    assert len(responses.calls) == 4  # lookup, download and both checksums
+
+    use_cache()
+    target_path = resolve_and_download(str(tmp_path / "second.zip"))
+    assert len(responses.calls) == 4
+    with open(target_path, "rb") as f:
+        assert f.read() == CONTENT
+
+    use_cache(offline=True)
+    assert resolve_and_download(str(tmp_path / "third.zip"))
+    assert len(responses.calls) == 4
+
+
+@responses.activate
+def test_failing_cache_does_not_fail_download(use_cache, tmp_path, monkeypatch):
+    responses.head(RELEASE_URL)
+    responses.get(RELEASE_URL, body=CONTENT)
+    cache = use_cache()
+
+    def read_only_cache(*args):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(cache, "_store_blob", read_only_cache)
+    target_path = resolve_and_download(str(tmp_path / "app.zip"))
+    with open(target_path, "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_offline_mode_does_not_request_registry(use_cache, tmp_path):
+    use_cache(offline=True)
+    assert resolve_and_download(str(tmp_path / "app.zip")) is None
+    with pytest.raises(ValueError, match="offline mode"):
+        artifact.download(RELEASE_URL, str(tmp_path / "app.zip"))
+
+
+def test_snapshot_content_is_reused_only_for_same_build(use_cache, tmp_path):
+    cache = use_cache()
+    key = ArtifactKey("com.example", "app", "1.0-SNAPSHOT", "", "json")
+    first_build = f"{REPO_URL}/com/example/app/1.0-SNAPSHOT/app-1.0-20240702.123456-1.json"
+    cache.remember(key, first_build)
+    cache.put_content(first_build, b"{}")
+    assert cache.get_resolution(key) is None
+
+    cache.remember(key, first_build)
+    assert cache.get_file(first_build)
+
+    second_build = first_build.replace("-1.json", "-2.json")
+    cache.remember(key, second_build)
+    assert cache.get_file(second_build) is None
+    assert use_cache(offline=True).get_resolution(key) == (second_build, None)
+
+
+def test_least_recently_used_content_is_evicted(use_cache):
+    cache = use_cache(max_bytes=10)
+    urls = {}
+    for name in ["a", "b", "c"]:
+        urls[name] = f"{REPO_URL}/{name}.json"
+        cache.remember(ArtifactKey("com.example", name, "1.0"), urls[name])
+    cache.put_content(urls["a"], b"aaaa")
+    cache.put_content(urls["b"], b"bbbb")
+    os.utime(cache._entry_path(ArtifactKey("com.example", "b", "1.0")), (0, 0))
+    cache.put_content(urls["c"], b"cccc")
+
+    assert cache.get_file(urls["a"]) and cache.get_file(urls["c"])
+    assert cache.get_file(urls["b"]) is None
+
+
+def test_cache_dir_is_scanned_only_over_limit(use_cache, monkeypatch):
+    cache = use_cache(max_bytes=10)
+    scans = []
+    evict = cache._evict
+    monkeypatch.setattr(cache, "_evict", lambda: scans.append(cache._read_used_bytes()) or evict())
+    urls = {}
+    for name in ["a", "b", "c"]:
+        urls[name] = f"{REPO_URL}/{name}.json"
+        cache.remember(ArtifactKey("com.example", name, "1.0"), urls[name])
+    cache.put_content(urls["a"], b"aaaa")
+    # content written by another process, which is not stored with its entry yet
+    pending_path = cache._blob_path("f" * 64).replace("f" * 64, ".pending.part")
+    os.makedirs(os.path.dirname(pending_path))
+    with open(pending_path, "wb") as f:
+        f.write(b"pending content")
+    cache.put_content(urls["b"], b"bbbb")
+    cache.put_content(urls["b"], b"bbbb")
+    assert scans == [None] and cache._read_used_bytes() == 8
+
+    cache.put_content(urls["c"], b"cccc")
+    assert scans == [None, 8] and cache._read_used_bytes() == 8
+    assert cache.get_file(urls["a"]) is None and cache.get_file(urls["c"])
+    assert os.path.isfile(pending_path)
+
+
+def test_blob_evicted_by_another_process_is_written_again(use_cache, monkeypatch):
+    cache = use_cache()
+    url = f"{REPO_URL}/a.json"
+    key = ArtifactKey("com.example", "a", "1.0")
+    cache.remember(key, url)
+    cache.put_content(url, b"aaaa")
+    blob_path = cache.get_file(url)
+    locked = cache._locked
+
+    def evicted_before_lock():
+        os.remove(blob_path)
+        return locked()
+
+    monkeypatch.setattr(cache, "_locked", evicted_before_lock)
+    cache.put_content(url, b"aaaa")
+    assert cache.get_file(url) == blob_path
+    with open(blob_path, "rb") as f:
+        assert f.read() == b"aaaa"
+
+
+async def test_async_paths_use_cache(use_cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact, "WORKSPACE", tmp_path / "workspace")
+    cache = use_cache()
+    app = models.Application(
+        name="app",
+        artifact_id="app",
+        group_id="com.example",
+        registry=models.Registry(
+            name="registry",
+            maven_config=models.MavenConfig(target_snapshot="repo", target_staging="repo", target_release="repo",
+                                            repository_domain_name="https://registry.example.com/"),
+            docker_config=models.DockerConfig(),
+        ),
+        solution_descriptor=False,
+    )
+    cache.remember(ArtifactKey("com.example", "app", "1.0", "", "zip"), RELEASE_URL, ("repo", "targetRelease"))
+    cache.put_content(RELEASE_URL, CONTENT)
+
+    use_cache(offline=True)
+    url, repo = await artifact.check_artifact_async(app, FileExtension.ZIP, "1.0")
+    assert (url, repo) == (RELEASE_URL, ("repo", "targetRelease"))
+    [result] = await artifact.download_all_async([models.ArtifactInfo(url=url, app_name="app", app_version="1.0")])
+    with open(result.local_path, "rb") as f:
+        assert f.read() == CONTENT
@@ -0,0 +1,58 @@
+import os
+
+import responses
+from aiohttp import web
+from responses.registries import OrderedRegistry
+
+os.environ["DEFAULT_REQUEST_TIMEOUT"] = "0.2"  # for test cases to run quicker
+os.environ["HTTP_RETRY_BACKOFF"] = "0.01"
+from artifact_searcher.utils.http_client import async_client, get_session
+
+URL = "https://registry.example.com/repo/app.json"
+
+
+@responses.activate(registry=OrderedRegistry)
+def test_session_retries_transient_errors():
+    responses.get(URL, status=503)
+    responses.get(URL, status=502)
+    responses.get(URL, json={"name": "app"})
+    assert get_session().get(URL).json() == {"name": "app"}
+    assert len(responses.calls) == 3
+    assert get_session() is get_session()
+
+
+async def test_async_client_retries_transient_errors(aiohttp_server):
+    statuses = [503, 429, 200]
+
+    async def handler(request):
+        return web.Response(status=statuses.pop(0), text="app")
+
+    app_web = web.Application()
+    app_web.router.add_get("/app.json", handler)
+    server = await aiohttp_server(app_web)
+
+    async with async_client() as client:
+        async with client.get(str(server.make_url("/app.json"))) as response:
+            assert response.status == 200
+            assert await response.text() == "app"
+        async with async_client() as nested_client:
+            assert nested_client.session is client.session
+    assert statuses == []
+
+
+async def test_async_client_returns_last_response_when_retries_are_exhausted(aiohttp_server):
+    requests_count = 0
+
+    async def handler(request):
+        nonlocal requests_count
+        requests_count += 1
+        return web.Response(status=500)
+
+    app_web = web.Application()
+    app_web.router.add_get("/app.json", handler)
+    server = await aiohttp_server(app_web)
+
+    async with async_client() as client:
+        async with client.get(str(server.make_url("/app.json"))) as response:
+            assert response.status == 500
+    assert requests_count == 4
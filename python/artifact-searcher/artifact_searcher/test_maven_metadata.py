@@ -0,0 +1,84 @@
+import asyncio
+import os
+
+import responses
+from aiohttp import web
+from responses.registries import OrderedRegistry
+
+os.environ["DEFAULT_REQUEST_TIMEOUT"] = "0.2"  # for test cases to run quicker
+os.environ["HTTP_RETRY_BACKOFF"] = "0.01"
+from artifact_searcher.artifact import resolve_snapshot_version
+from artifact_searcher.maven_metadata import MavenMetadataCache
+from artifact_searcher.utils import models
+from artifact_searcher.utils.http_client import async_client
+
+BASE_PATH = "https://registry.example.com/repo/com/example/app/1.0-SNAPSHOT/"
+METADATA_URL = f"{BASE_PATH}maven-metadata.xml"
+METADATA = """
+<metadata>
+  <versioning>
+    <snapshotVersions>
+      <snapshotVersion>
+        <extension>json</extension>
+        <value>1.0-20240702.123456-1</value>
+      </snapshotVersion>
+      <snapshotVersion>
+        <classifier>graph</classifier>
+        <extension>json</extension>
+        <value>1.0-20240702.123456-2</value>
+      </snapshotVersion>
+      <snapshotVersion>
+        <extension>zip</extension>
+        <value>1.0-20240702.123456-3</value>
+      </snapshotVersion>
+    </snapshotVersions>
+  </versioning>
+</metadata>
+"""
+
+
+@responses.activate
+def test_one_document_answers_all_lookups(monkeypatch):
+    monkeypatch.setattr("artifact_searcher.artifact.metadata_cache", MavenMetadataCache())
+    responses.get(METADATA_URL, body=METADATA)
+    assert resolve_snapshot_version(BASE_PATH, models.FileExtension.JSON) == "1.0-20240702.123456-1"
+    assert resolve_snapshot_version(BASE_PATH, models.FileExtension.JSON, classifier="graph") == \
+           "1.0-20240702.123456-2"
+    assert resolve_snapshot_version(BASE_PATH, models.FileExtension.ZIP) == "1.0-20240702.123456-3"
+    assert resolve_snapshot_version(BASE_PATH, models.FileExtension.ZIP, classifier="graph") is None
+    assert len(responses.calls) == 1
+
+
+@responses.activate(registry=OrderedRegistry)
+def test_expired_document_is_revalidated():
+    cache = MavenMetadataCache(ttl=0)
+    responses.get(METADATA_URL, body=METADATA, headers={"ETag": '"v1"', "Last-Modified": "Tue, 02 Jul 2024"})
+    responses.get(METADATA_URL, status=304)
+    responses.get(METADATA_URL, status=404)
+    first = cache.get(METADATA_URL)
+    assert cache.get(METADATA_URL) is first
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+    assert responses.calls[1].request.headers["If-Modified-Since"] == "Tue, 02 Jul 2024"
+    assert cache.get(METADATA_URL).status == 404
+
+
+async def test_concurrent_lookups_share_one_request(aiohttp_server):
+    requests_count = 0
+
+    async def metadata_handler(request):
+        nonlocal requests_count
+        requests_count += 1
+        await asyncio.sleep(0.05)
+        return web.Response(text=METADATA, content_type="application/xml")
+
+    app_web = web.Application()
+    app_web.router.add_get("/maven-metadata.xml", metadata_handler)
+    server = await aiohttp_server(app_web)
+    cache = MavenMetadataCache()
+
+    async with async_client() as client:
+        documents = await asyncio.gather(
+            *(cache.get_async(client, str(server.make_url("/maven-metadata.xml"))) for _ in range(5)))
+    assert requests_count == 1
+    assert all(document is documents[0] for document in documents)
+    assert documents[0].resolve(models.FileExtension.ZIP) == "1.0-20240702.123456-3"
@@ -1,7 +1,43 @@
-from os import getenv
+import tempfile
+from os import getenv, path
 
 DEFAULT_REQUEST_TIMEOUT = float(getenv("DEFAULT_REQUEST_TIMEOUT", 30))
 
 TCP_CONNECTION_LIMIT = int(getenv("TCP_CONNECTION_LIMIT", 100))
 
+TCP_CONNECTION_LIMIT_PER_HOST = int(getenv("TCP_CONNECTION_LIMIT_PER_HOST", 20))
+
+# maximum number of artifacts resolved and downloaded at once by batch lookups
+ARTIFACT_CONCURRENCY_LIMIT = int(getenv("ARTIFACT_CONCURRENCY_LIMIT", 20))
+
+# transient registry errors (connection failures, 429 and 5xx responses) are retried with exponential backoff
+HTTP_RETRIES = int(getenv("HTTP_RETRIES", 3))
+
+HTTP_RETRY_BACKOFF = float(getenv("HTTP_RETRY_BACKOFF", 0.5))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# maximum number of bytes of an artifact held in memory at once while it is downloaded
+DOWNLOAD_CHUNK_SIZE = int(getenv("DOWNLOAD_CHUNK_SIZE", 1024 * 1024))
+
+VERIFY_CHECKSUMS = getenv("VERIFY_CHECKSUMS", "true").lower() != "false"
+
+# checksum sidecar files published by maven registries next to artifacts, in order of preference
+CHECKSUM_ALGORITHMS = ("sha1", "md5")
+
+# persistent artifact cache is used only when a directory is configured
+ARTIFACT_CACHE_DIR = getenv("ARTIFACT_CACHE_DIR", "")
+
+ARTIFACT_CACHE_MAX_BYTES = int(getenv("ARTIFACT_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+# repositories which served artifacts before, they are probed first by subsequent lookups
+PROBE_INDEX_FILE = getenv("PROBE_INDEX_FILE") or path.join(
+    ARTIFACT_CACHE_DIR or path.join(tempfile.gettempdir(), "artifact_searcher"), "probe_index.json")
+
+# serve artifacts only from the cache, without any request to registries
+OFFLINE_MODE = getenv("ARTIFACT_SEARCHER_OFFLINE", "false").lower() == "true"
+
 METADATA_XML = "maven-metadata.xml"
+
+# seconds a fetched maven-metadata.xml is used before it is revalidated with a conditional request
+METADATA_CACHE_TTL = float(getenv("METADATA_CACHE_TTL", 60))
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import random
+import threading
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+import aiohttp
+import requests
+from aiohttp import BasicAuth
+from envgenehelper import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from artifact_searcher.utils.constants import DEFAULT_REQUEST_TIMEOUT, TCP_CONNECTION_LIMIT, \
+    TCP_CONNECTION_LIMIT_PER_HOST, HTTP_RETRIES, HTTP_RETRY_BACKOFF, RETRY_STATUSES
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+
+_shared_async_session: ContextVar[aiohttp.ClientSession | None] = ContextVar("shared_async_session", default=None)
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide requests session: keep-alive connections are pooled per registry host, and transient
+    errors are retried with exponential backoff and jitter. Forked processes get their own session
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            retry = Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=HTTP_RETRY_BACKOFF,
+                backoff_jitter=HTTP_RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=None,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=TCP_CONNECTION_LIMIT, pool_maxsize=TCP_CONNECTION_LIMIT_PER_HOST,
+                                  max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+def retry_delay(attempt: int, response: aiohttp.ClientResponse | None = None) -> float:
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return float(retry_after)
+    delay = HTTP_RETRY_BACKOFF * 2 ** attempt
+    return delay + random.uniform(0, HTTP_RETRY_BACKOFF)
+
+
+class AsyncHttpClient:
+    """aiohttp session wrapper which retries transient errors and sends credentials of its caller"""
+
+    def __init__(self, session: aiohttp.ClientSession, auth: BasicAuth | None = None):
+        self.session = session
+        self.auth = auth
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs):
+        kwargs.setdefault("auth", self.auth)
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = await self.session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= HTTP_RETRIES:
+                    raise
+                logger.debug(f"{method} {url} failed with {e!r}, retrying")
+            else:
+                if response.status not in RETRY_STATUSES or attempt >= HTTP_RETRIES:
+                    break
+                response.release()
+                logger.debug(f"{method} {url} returned {response.status}, retrying")
+            await asyncio.sleep(retry_delay(attempt, response))
+            attempt += 1
+        try:
+            yield response
+        finally:
+            response.release()
+
+
+@asynccontextmanager
+async def async_client(auth: BasicAuth | None = None):
+    """
+    Yields a client over the aiohttp session shared by everything running within this context, so that nested
+    lookups reuse connections of the outermost one; a new session is opened when there is none yet
+    """
+    session = _shared_async_session.get()
+    if session is not None and not session.closed:
+        yield AsyncHttpClient(session, auth)
+        return
+    connector = aiohttp.TCPConnector(limit=TCP_CONNECTION_LIMIT, limit_per_host=TCP_CONNECTION_LIMIT_PER_HOST)
+    timeout = aiohttp.ClientTimeout(total=DEFAULT_REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        token = _shared_async_session.set(session)
+        try:
+            yield AsyncHttpClient(session, auth)
+        finally:
+            _shared_async_session.reset(token)
@@ -3,9 +3,9 @@
 
 from pydantic import BaseModel, ConfigDict, field_validator, Field, model_validator
 from pydantic.alias_generators import to_camel
-import requests
 
 from artifact_searcher.utils.constants import DEFAULT_REQUEST_TIMEOUT
+from artifact_searcher.utils.http_client import get_session
 
 
 class BaseSchema(BaseModel):
@@ -45,7 +45,7 @@ def detect_nexus(self):
         base = self.repository_domain_name[: -len("repository/")]
         status_url = f"{base}service/rest/v1/status"
         try:
-            resp = requests.get(status_url, timeout=DEFAULT_REQUEST_TIMEOUT)
+            resp = get_session().get(status_url, timeout=DEFAULT_REQUEST_TIMEOUT)
             self.is_nexus = resp.status_code == 200
         except Exception:
             self.is_nexus = False
@@ -9,5 +9,6 @@
 from .creds_helper import *
 from .sd_merge_helper import *
 from .yaml_validator import checkByWhiteList, checkByBlackList, checkSchemaValidationFailed, getSchemaValidationErrorMessage
-from .crypt import decrypt_file, encrypt_file, decrypt_all_cred_files_for_env, encrypt_all_cred_files_for_env, is_encrypted
+from .crypt import decrypt_file, encrypt_file, decrypt_all_cred_files_for_env, encrypt_all_cred_files_for_env, is_encrypted, \
+    open_secrets_view, close_secrets_view, is_secrets_view_open, read_cred_file
 from .constants import cleanup_targets
\ No newline at end of file
@@ -376,7 +376,7 @@ class NamespaceFile:
 
     def __post_init__(self):
         self.definition_path = self.path.joinpath('namespace.yml')
-        self.name = openYaml(self.definition_path)['name']
+        self.name = openYaml(self.definition_path, safe_load=True)['name']
 
 
 def get_namespaces_path(env_dir: Path | None = None) -> Path:
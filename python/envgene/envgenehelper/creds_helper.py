@@ -218,7 +218,10 @@ def fetch_cred_value(val, cred_config) -> str:
 
 def get_cred_config():
     base_dir = getenv_with_error('CI_PROJECT_DIR')
-    cred_config = crypt.decrypt_file(Path(f"{base_dir}/configuration/credentials/credentials.yml"))
+    cred_path = Path(f"{base_dir}/configuration/credentials/credentials.yml")
+    if crypt.is_secrets_view_open():
+        return crypt.read_cred_file(cred_path)
+    cred_config = crypt.decrypt_file(cred_path)
     return cred_config
 
 
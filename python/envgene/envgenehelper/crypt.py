@@ -1,15 +1,24 @@
+import copy
+import hashlib
+import multiprocessing
 import os
 import re
+import tempfile
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from os import getenv, path
 from typing import Callable
 
 from .config_helper import get_envgene_config_yaml
-from .yaml_helper import openYaml, get_empty_yaml
-from .file_helper import check_file_exists, get_files_with_filter
+from .yaml_helper import openYaml, get_empty_yaml, dumpYamlToStr
+from .file_helper import check_file_exists, get_files_with_filter, writeToFile
 from .logger import logger
 from .collections_helper import split_multi_value_param
 
-from .crypt_backends.fernet_handler import crypt_Fernet, extract_value_Fernet, is_encrypted_Fernet
+from .crypt_backends.fernet_handler import crypt_Fernet, crypt_Fernet_files, extract_value_Fernet, \
+    is_encrypted_Fernet
 from .crypt_backends.sops_handler import crypt_SOPS, extract_value_SOPS, is_encrypted_SOPS
 
 BASE_DIR = getenv('CI_PROJECT_DIR', os.getcwd())
@@ -17,6 +26,10 @@
 TARGET_REGEX = re.compile(r'(^credentials$|creds$)')
 TARGET_DIR_REGEX = re.compile(r'/[Cc]redentials(/|$)')
 TARGET_PARENT_DIRS = re.compile(r'/(configuration|environments)(/|$)')
+# worker processes de/encrypting cred files, which also bounds the number of concurrent sops processes
+CRYPT_WORKERS = int(getenv('ENVGENE_CRYPT_WORKERS') or os.cpu_count() or 1)
+# smaller batches of cred files are processed in the current process
+CRYPT_PARALLEL_THRESHOLD = 8
 
 CRYPT_FUNCTIONS = {
     'SOPS': crypt_SOPS,
@@ -154,14 +167,75 @@ def check_for_encrypted_files(files):
             raise ValueError(err_msg.format(f))
 
 
+def _crypt_file_timed(crypt_func, file_path, kwargs):
+    start = time.perf_counter()
+    crypt_func(file_path, **kwargs)
+    return file_path, time.perf_counter() - start
+
+
+def _crypt_Fernet_batch_timed(crypt_func, mode, files, kwargs):
+    start = time.perf_counter()
+    existing = [f for f in files if check_file_exists(f)]
+    crypt_Fernet_files(existing, kwargs.get('secret_key'), in_place=True, mode=mode)
+    # files of a batch share its time
+    seconds = (time.perf_counter() - start) / max(len(existing), 1)
+    timings = [(f, seconds) for f in existing]
+    # missing files are reported or defaulted by crypt_func
+    return timings + [_crypt_file_timed(crypt_func, f, kwargs) for f in files if f not in existing]
+
+
+def _get_Fernet_batch_mode(crypt_func, kwargs):
+    # old versions of minimize_diff are per file, such calls and in_place=False are left to crypt_func
+    if kwargs['crypt_backend'] != 'Fernet' or kwargs.get('minimize_diff') or not kwargs.get('in_place', True):
+        return None
+    if not kwargs['is_crypt'] and not kwargs.get('ignore_is_crypt'):
+        return None
+    return {decrypt_file: 'decrypt', encrypt_file: 'encrypt'}.get(crypt_func)
+
+
+def crypt_files(crypt_func, files, workers=None, **kwargs) -> dict[str, float]:
+    """
+    Applies decrypt_file or encrypt_file with kwargs to every file and returns seconds spent on each of them.
+    Crypt backend and 'crypt' config are resolved once for the batch. Batches of CRYPT_PARALLEL_THRESHOLD files and
+    more are processed by forked worker processes, each file is parsed once in its worker. Fernet cred files are
+    de/encrypted with crypt_Fernet_files, all values of the files of a worker in one pass
+    """
+    files = sorted(files)
+    workers = min(CRYPT_WORKERS if workers is None else workers, len(files))
+    kwargs.setdefault('crypt_backend', get_crypt_backend())
+    kwargs.setdefault('is_crypt', get_crypt())
+    start = time.perf_counter()
+    parallel = workers > 1 and len(files) >= CRYPT_PARALLEL_THRESHOLD and \
+        "fork" in multiprocessing.get_all_start_methods()
+    fernet_mode = _get_Fernet_batch_mode(crypt_func, kwargs)
+    if fernet_mode:
+        chunk_size = max(-(-len(files) // workers) if parallel else len(files), 1)
+        chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+        task, args = _crypt_Fernet_batch_timed, (repeat(crypt_func), repeat(fernet_mode), chunks, repeat(kwargs))
+    else:
+        task, args = _crypt_file_timed, (repeat(crypt_func), files, repeat(kwargs))
+    if not parallel:
+        results = list(map(task, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as executor:
+            results = list(executor.map(task, *args))
+    timings = dict(pair for result in results for pair in result) if fernet_mode else dict(results)
+    for f, seconds in timings.items():
+        logger.debug(f"{crypt_func.__name__} {f}: {seconds:.3f}s")
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:5]
+    logger.info(f"{crypt_func.__name__} of {len(files)} cred files with {max(workers, 1)} workers took "
+                f"{time.perf_counter() - start:.2f}s, slowest: "
+                + ", ".join(f"{f} {seconds:.2f}s" for f, seconds in slowest))
+    return timings
+
+
 def decrypt_all_cred_files_for_env(**kwargs):
     IS_CRYPT = get_crypt()
     files = get_all_necessary_cred_files()
     if not IS_CRYPT:
         check_for_encrypted_files(files)
     else:
-        for f in files:
-            decrypt_file(f, **kwargs)
+        crypt_files(decrypt_file, files, **kwargs)
         logger.debug("Decrypted next cred files:")
         logger.debug(files)
 
@@ -170,8 +244,134 @@ def encrypt_all_cred_files_for_env(**kwargs):
     files = get_all_necessary_cred_files()
     logger.debug("Attempting to encrypt(if crypt is true) next files:")
     logger.debug(files)
-    for f in files:
-        encrypt_file(f, **kwargs)
+    crypt_files(encrypt_file, files, **kwargs)
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.sha1(text.encode()).digest()
+
+
+class SecretsView(Mapping):
+    """
+    Decrypted content of cred files, keyed by absolute file path, while the files stay encrypted on disk.
+    A file is decrypted in memory when it is read for the first time, copies of an encrypted file share its
+    decrypted content. close() encrypts and writes only the cred files whose plaintext changed, files written
+    with the same plaintext get their original encrypted text back
+    """
+
+    def __init__(self, files, crypt_backend, **kwargs):
+        self.crypt_backend = crypt_backend
+        self.crypt_kwargs = kwargs
+        # encrypted text at open of every cred file which was encrypted then
+        self._originals: dict[str, str] = {}
+        # digest of encrypted text -> decrypted content
+        self._decrypted: dict[bytes, object] = {}
+        for f in files:
+            if self._is_encrypted(f):
+                with open(f) as file:
+                    self._originals[os.path.abspath(f)] = file.read()
+
+    def __getitem__(self, file_path):
+        if os.path.abspath(file_path) not in self._originals:
+            raise KeyError(file_path)
+        return self.read(file_path)
+
+    def __iter__(self):
+        return iter(self._originals)
+
+    def __len__(self):
+        return len(self._originals)
+
+    def _is_encrypted(self, file_path) -> bool:
+        content = openYaml(file_path)
+        return isinstance(content, dict) and bool(content) and is_encrypted(file_path, self.crypt_backend)
+
+    def _decrypt(self, file_path, text):
+        digest = _digest(text)
+        if digest not in self._decrypted:
+            self._decrypted[digest] = decrypt_file(file_path, in_place=False, ignore_is_crypt=True,
+                                                   crypt_backend=self.crypt_backend, **self.crypt_kwargs)
+        return self._decrypted[digest]
+
+    def _decrypt_text(self, text):
+        if _digest(text) in self._decrypted:
+            return self._decrypted[_digest(text)]
+        with tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False) as tmp:
+            tmp.write(text)
+        try:
+            return self._decrypt(tmp.name, text)
+        finally:
+            os.remove(tmp.name)
+
+    def read(self, file_path):
+        """Decrypted content of any cred file, including copies of the files of the view"""
+        if not self._is_encrypted(file_path):
+            return openYaml(file_path)
+        with open(file_path) as f:
+            text = f.read()
+        return copy.deepcopy(self._decrypt(file_path, text))
+
+    def close(self) -> dict[str, float]:
+        files = {os.path.abspath(f) for f in get_all_necessary_cred_files()} | set(self._originals)
+        changed = []
+        restored = 0
+        for f in sorted(files):
+            if not check_file_exists(f):
+                continue
+            with open(f) as file:
+                text = file.read()
+            original = self._originals.get(f)
+            if text == original or self._is_encrypted(f):
+                continue
+            if original is not None and dumpYamlToStr(openYaml(f)) == dumpYamlToStr(self._decrypt_text(original)):
+                writeToFile(f, original)
+                restored += 1
+            else:
+                changed.append(f)
+        logger.info(f"Cred files of secrets view: {len(changed)} changed, {restored} restored to their original "
+                    f"encrypted text, others are untouched")
+        return crypt_files(encrypt_file, changed, crypt_backend=self.crypt_backend, is_crypt=True,
+                           **self.crypt_kwargs)
+
+
+secrets_view: SecretsView | None = None
+
+
+def open_secrets_view(**kwargs) -> SecretsView | None:
+    """
+    Alternative to decrypt_all_cred_files_for_env, cred files are left encrypted and consumers read them with
+    read_cred_file. close_secrets_view replaces encrypt_all_cred_files_for_env
+    """
+    global secrets_view
+    files = get_all_necessary_cred_files()
+    if not get_crypt():
+        check_for_encrypted_files(files)
+        return None
+    secrets_view = SecretsView(files, get_crypt_backend(), **kwargs)
+    logger.info(f"Secrets view is opened for {len(secrets_view)} encrypted cred files")
+    return secrets_view
+
+
+def close_secrets_view() -> dict[str, float]:
+    global secrets_view
+    if secrets_view is None:
+        return {}
+    view, secrets_view = secrets_view, None
+    return view.close()
+
+
+def is_secrets_view_open() -> bool:
+    return secrets_view is not None
+
+
+def read_cred_file(file_path):
+    """
+    Decrypted content of a cred file, from the secrets view when it is open.
+    Otherwise cred files are decrypted on disk by decrypt_all_cred_files_for_env
+    """
+    if secrets_view is not None:
+        return secrets_view.read(file_path)
+    return openYaml(file_path)
 
 
 def get_crypt():
@@ -1,4 +1,6 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any
 from cryptography.fernet import Fernet
 
@@ -8,13 +10,24 @@
 
 from .constants import *
 
-def _apply_Fernet_to_dict(data: dict, fernet:Fernet, fernet_func) -> dict:
+# threads de/encrypting values of a batch, smaller batches are processed in the current thread
+FERNET_WORKERS = int(os.getenv('ENVGENE_FERNET_WORKERS') or 1)
+FERNET_PARALLEL_THRESHOLD = 1000
+
+@lru_cache(maxsize=8)
+def get_fernet(secret_key) -> Fernet:
+    return Fernet(secret_key)
+
+def _collect_Fernet_leaves(data: dict, leaves: list, old_data=None) -> list:
+    # (container, key, old value) of every value to de/encrypt, that is of non-empty values except the
+    # unencrypted keys. Old value is the one at the same path of old_data or None
     for key, value in data.items():
+        old_value = old_data.get(key) if isinstance(old_data, dict) else None
         if isinstance(value, dict):
-            _apply_Fernet_to_dict(value, fernet, fernet_func)
+            _collect_Fernet_leaves(value, leaves, old_value)
         elif value != '' and not UNENCRYPTED_REGEX.match(key):
-            data[key] = fernet_func(value, fernet)
-    return data
+            leaves.append((data, key, None if isinstance(old_value, dict) else old_value))
+    return leaves
 
 def _encrypt_Fernet(text, fernet: Fernet) -> str:
     text = str(text)
@@ -28,24 +41,54 @@ def _decrypt_Fernet(text, fernet: Fernet):
         return text
     return fernet.decrypt(text.replace(FERNET_STR, '').encode('utf-8')).decode('utf-8')
 
-def _remove_unnecessary_changes(data: dict, old_data_path: str, fernet: Fernet) -> None:
-    if not os.path.exists(old_data_path):
-        return
-    old_data = openYaml(old_data_path)
-    _reuse_old_fernet_tokens(data, dict(old_data), fernet)
-
-def _reuse_old_fernet_tokens(data: dict, old_data: dict, fernet: Fernet) -> None:
-    for k, v in data.items():
-        if not k in old_data.keys():
-            continue
-        if isinstance(v, dict) and isinstance(old_data[k], dict):
-            _reuse_old_fernet_tokens(v, old_data[k], fernet)
-            continue
-        decoded_old_v = _decrypt_Fernet(old_data[k], fernet)
-        if old_data[k] == decoded_old_v:
-            continue
-        elif decoded_old_v == _decrypt_Fernet(v, fernet):
-            data[k] = old_data[k]
+def crypt_Fernet_values(values: list, fernet: Fernet, mode, workers=None) -> list[str]:
+    fernet_func = _decrypt_Fernet if mode == "decrypt" else _encrypt_Fernet
+    workers = workers or FERNET_WORKERS
+    if workers <= 1 or len(values) < FERNET_PARALLEL_THRESHOLD:
+        return [fernet_func(value, fernet) for value in values]
+    # one contiguous chunk per thread keeps the results in order of values
+    chunk_size = -(-len(values) // workers)
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda chunk: [fernet_func(value, fernet) for value in chunk], chunks)
+        return [value for chunk in results for value in chunk]
+
+def _reuse_old_fernet_tokens(leaves: list, fernet: Fernet) -> list:
+    # keeps tokens of old values whose plaintext is unchanged, only the rest has to be encrypted.
+    # Each old token is decrypted once and compared with the plaintext the new token would hold
+    old_indexes = [i for i, (_, _, old_value) in enumerate(leaves)
+                   if isinstance(old_value, str) and FERNET_STR in old_value]
+    old_plaintexts = crypt_Fernet_values([leaves[i][2] for i in old_indexes], fernet, "decrypt")
+    reused = set()
+    for i, old_plaintext in zip(old_indexes, old_plaintexts):
+        container, key, old_value = leaves[i]
+        if old_plaintext == str(container[key]):
+            container[key] = old_value
+            reused.add(i)
+    return [leaf for i, leaf in enumerate(leaves) if i not in reused]
+
+def _load_old_data(old_data_path: str):
+    if not old_data_path or not os.path.exists(old_data_path):
+        return None
+    # only values of the old file are compared, comments are not needed
+    return openYaml(old_data_path, safe_load=True)
+
+def crypt_Fernet_data(items: list, fernet: Fernet, mode, old_items=None, workers=None) -> list:
+    """
+    De/encrypts all values of the yaml documents in items in place, in a single pass over their values. When
+    old_items are given, tokens of their values are kept for encrypted values with the same plaintext
+    """
+    old_items = old_items or [None] * len(items)
+    leaves = []
+    for data, old_data in zip(items, old_items):
+        if isinstance(data, dict):
+            _collect_Fernet_leaves(data, leaves, old_data if mode != "decrypt" else None)
+    if mode != "decrypt" and any(old_data is not None for old_data in old_items):
+        leaves = _reuse_old_fernet_tokens(leaves, fernet)
+    new_values = crypt_Fernet_values([container[key] for container, key, _ in leaves], fernet, mode, workers)
+    for (container, key, _), value in zip(leaves, new_values):
+        container[key] = value
+    return items
 
 def extract_value_Fernet(file_path: str, attribute_str: str) -> Any:
     data = crypt_Fernet(file_path, secret_key=None, in_place=False, mode='decrypt')
@@ -56,18 +99,34 @@ def crypt_Fernet(file_path, secret_key, in_place, mode, minimize_diff=None, old_
     if not secret_key:
         secret_key = getenv_with_error("SECRET_KEY")
     data = openYaml(file_path)
-    fernet = Fernet(secret_key)
-    fernet_func = _decrypt_Fernet if mode == "decrypt" else _encrypt_Fernet
-    if isinstance(data, dict):
-        new_data = _apply_Fernet_to_dict(data, fernet, fernet_func)
-    else:
-        new_data = {}
-    if minimize_diff and old_file_path and mode != "decrypt":
-        _remove_unnecessary_changes(new_data, old_file_path, fernet)
+    old_data = _load_old_data(old_file_path) if minimize_diff and mode != "decrypt" else None
+    crypt_Fernet_data([data], get_fernet(secret_key), mode, [old_data])
+    new_data = data if isinstance(data, dict) else {}
     if in_place:
         writeYamlToFile(file_path, new_data)
     return new_data
 
+def crypt_Fernet_files(file_paths: list, secret_key, in_place, mode, minimize_diff=None, old_file_paths=None,
+                       workers=None) -> dict:
+    """
+    Batch counterpart of crypt_Fernet: values of all files are de/encrypted in one pass, optionally in a
+    thread pool. old_file_paths maps file paths to their old versions for minimize_diff
+    """
+    if not secret_key:
+        secret_key = getenv_with_error("SECRET_KEY")
+    items = [openYaml(file_path) for file_path in file_paths]
+    old_items = None
+    if minimize_diff and old_file_paths and mode != "decrypt":
+        old_items = [_load_old_data(old_file_paths.get(file_path)) for file_path in file_paths]
+    crypt_Fernet_data(items, get_fernet(secret_key), mode, old_items, workers)
+    result = {}
+    for file_path, data in zip(file_paths, items):
+        result[file_path] = data if isinstance(data, dict) else {}
+        if in_place:
+            writeYamlToFile(file_path, result[file_path])
+    logger.debug(f"Fernet {mode} of {len(file_paths)} files done in one batch")
+    return result
+
 def is_encrypted_Fernet(file_path):
     content = openYaml(file_path)
     return _is_encrypted_Fernet(content)
@@ -9,10 +9,13 @@
 
 from .constants import *
 
+# seconds a single sops call may take
+SOPS_TIMEOUT = float(os.getenv('ENVGENE_SOPS_TIMEOUT') or 5)
+
 def _run_SOPS(arg_str, return_codes_to_ignore=None):
     return_codes_to_ignore = return_codes_to_ignore if return_codes_to_ignore else []
     sops_command = f'sops {arg_str}'
-    result = subprocess.run(sops_command, shell=True, capture_output=True, text=True, timeout=5)
+    result = subprocess.run(sops_command, shell=True, capture_output=True, text=True, timeout=SOPS_TIMEOUT)
     if "metadata not found" in result.stderr:
         raise ValueError('File was already decrypted')
     if "The file you have provided contains a top-level entry called 'sops'" in result.stderr:
@@ -81,13 +84,13 @@ def crypt_SOPS(file_path, secret_key, in_place, public_key, mode, minimize_diff=
         logger.info(f'File is empty, skipping de/encryption. Path: {file_path}')
         return file_content
 
-    is_encrypted = is_encrypted_SOPS(file_path)
+    is_encrypted = _is_encrypted_SOPS(file_content)
     if is_encrypted and mode == "encrypt":
         logger.warning(f'File is already encrypted. Path: {file_path}')
-        return openYaml(file_path)
+        return file_content
     if not is_encrypted and mode == "decrypt":
         logger.warning(f'File is not encrypted. Path: {file_path}')
-        return openYaml(file_path)
+        return file_content
 
     if minimize_diff and mode != "decrypt":
         result = _get_minimized_diff(file_path, old_file_path, public_key)
@@ -124,6 +127,9 @@ def extract_value_SOPS(file_path, attribute_str):
 
 def is_encrypted_SOPS(file_path):
     content = openYaml(file_path)
+    return _is_encrypted_SOPS(content)
+
+def _is_encrypted_SOPS(content):
     if 'sops' in content.keys():
         return True
     return False
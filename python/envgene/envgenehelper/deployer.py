@@ -4,7 +4,7 @@
 from .yaml_helper import openYaml, get_or_create_nested_yaml_attribute
 from .file_helper import getDirName, check_file_exists
 from .logger import logger
-from .crypt import decrypt_file
+from .crypt import decrypt_file, is_secrets_view_open, read_cred_file
 
 def get_cred_file_path(deployer_dir):
     dashes_cred_path = f"{deployer_dir}/deployer-creds.yml"
@@ -25,7 +25,7 @@ def get_value_and_attributes_from_cred(cred_macros, deployer_dir):
     if (check_is_envgen_cred(cred_macros)):
         credentials_file_path = get_cred_file_path(deployer_dir)
         cred_id, property = get_cred_id_and_property_from_cred_macros(cred_macros)
-        data = openYaml(credentials_file_path)
+        data = read_cred_file(credentials_file_path)
         if cred_id in data:
             cred = data[cred_id]
             attribute_path = f'{cred_id}.data.{property}'
@@ -105,6 +105,8 @@ def get_deployer_config(env_name=None, work_dir=None, instances_dir=None, secret
         cred_path = get_cred_file_path(deployer_dir)
         if is_test:
             cred_yaml = decrypt_file(cred_path, in_place=False, ignore_is_crypt=True, secret_key=secret_key, crypt_backend='Fernet')
+        elif is_secrets_view_open():
+            cred_yaml = read_cred_file(cred_path)
         else:
             cred_yaml = decrypt_file(cred_path, in_place=False)
         cmdb_username = get_or_create_nested_yaml_attribute(cred_yaml, cmdb_username_attribute_path)
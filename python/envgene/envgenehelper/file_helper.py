@@ -3,6 +3,7 @@
 import re
 import shutil
 import tarfile
+import uuid
 import zipfile
 from typing import Callable
 from pathlib import Path
@@ -151,6 +152,22 @@ def writeToFile(filePath, contents):
     return
 
 
+def write_file_atomically(file_path, contents):
+    # writing to temp file in the same dir and renaming it, so readers never see partially written file
+    dir_path = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(dir_path, exist_ok=True)
+    tmp_path = os.path.join(dir_path, f".{os.path.basename(file_path)}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, 'x') as f:
+            f.write(contents)
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        deleteFileIfExists(tmp_path)
+        raise
+
+
 def getAbsPath(path):
     return os.path.abspath(path)
 
@@ -17,6 +17,19 @@ def get_version(app):
     return app.get("version", "").split(":", 1)[1]
 
 
+def get_app_key(app):
+    # apps are matching when their keys are equal
+    return get_app_name_sd(app), app.get("deployPostfix")
+
+
+def index_apps_by_key(apps: list) -> dict:
+    # first app of each key, the one a sequential is_matching scan would find
+    index = {}
+    for i, app in enumerate(apps):
+        index.setdefault(get_app_key(app), i)
+    return index
+
+
 def is_matching(app1, app2):
     return (
             get_app_name_sd(app1) == get_app_name_sd(app2) and
@@ -48,6 +61,25 @@ def check_deploy_graph(app_name: str, data: dict) -> bool:
     return False
 
 
+class DeployGraphApps:
+    """
+    Lower-cased app entries of the SD deployGraph, built once to answer check_deploy_graph for every app of the SD.
+    Names equal to an entry's part before ':' are found in a set, other names are searched as substrings
+    of all entries at once
+    """
+
+    def __init__(self, data: dict):
+        entries = [app.lower() for entry in data.get("deployGraph") or [] for app in entry.get("apps", [])]
+        self.names = {app.split(":")[0] for app in entries}
+        self.text = "\0".join(entries) if entries else None
+
+    def __contains__(self, app_name: str) -> bool:
+        if self.text is None:
+            return False
+        app_name = app_name.lower()
+        return app_name in self.names or app_name in self.text
+
+
 # Returns False if target contains a criteria and its value is not matched with delta's value. Otherwise returns True
 def check_criteria(target, delta, criteria):
     result = True
@@ -59,24 +91,28 @@ def check_criteria(target, delta, criteria):
     return result
 
 
-def add_app(entry, apps: list) -> int:
-    entry_name = get_app_name(entry["version"])
-
+def index_apps_by_name(apps: list) -> dict[str, list[int]]:
+    index = {}
     for i, app in enumerate(apps):
-        app_name = get_app_name(app["version"])
+        index.setdefault(get_app_name(app["version"]), []).append(i)
+    return index
 
-        if isinstance(entry, ruyaml.CommentedMap):
-            if app_name == entry_name and check_criteria(entry, app, ["deployPostfix", "alias"]):
-                logger.info(f"Replaced value: {entry}")
-                apps[i] = entry
-                return 1
 
-        elif app_name == entry_name:
+def add_app(entry, apps: list, index: dict[str, list[int]] | None = None) -> int:
+    # index maps app names to their positions in apps, as built by index_apps_by_name, and is kept up to date
+    if index is None:
+        index = index_apps_by_name(apps)
+    entry_name = get_app_name(entry["version"])
+    positions = index.setdefault(entry_name, [])
+
+    for i in positions:
+        if not isinstance(entry, ruyaml.CommentedMap) or check_criteria(entry, apps[i], ["deployPostfix", "alias"]):
             logger.info(f"Replaced value: {entry}")
             apps[i] = entry
             return 1
 
     logger.info(f"Appended value: {entry}")
+    positions.append(len(apps))
     apps.append(entry)
     return 1
 
@@ -90,28 +126,30 @@ def extended_merge(full_sd, delta_sd):
         error(NO_DEPLOY_GRAPH_ERROR)
     counter_ = 0
     apps_list = full_sd["applications"].copy()
-    length = len(delta_sd["applications"])
+    delta_apps = delta_sd["applications"]
+    length = len(delta_apps)
+    apps_index = index_apps_by_name(apps_list)
+    deploy_graph_apps = DeployGraphApps(delta_sd)
 
     # find applications with suitable deployGraph
-    for j in delta_sd["applications"]:
-        if check_deploy_graph(get_app_name(j["version"]), delta_sd):
-            counter_ += add_app(j, apps_list)
+    for j in delta_apps:
+        if get_app_name(j["version"]) in deploy_graph_apps:
+            counter_ += add_app(j, apps_list, apps_index)
 
-    # merge rest of applications
+    # merge rest of applications, only delta apps of the same name can replace an app
+    delta_index = index_apps_by_name(delta_apps)
     for i in range(len(apps_list)):
-        for j in range(len(delta_sd["applications"])):
+        for j in delta_index.get(get_app_name(apps_list[i]["version"]), []):
             apps_item = apps_list[i]
-            delta_item = delta_sd["applications"][j]
-            same_app_name = get_app_name(apps_item["version"]) == get_app_name(delta_item["version"])
+            delta_item = delta_apps[j]
 
             if isinstance(apps_item, ruyaml.CommentedMap):
-                if same_app_name and check_criteria(apps_item, delta_item, ["deployPostfix", "alias"]):
+                if check_criteria(apps_item, delta_item, ["deployPostfix", "alias"]):
                     apps_list[i] = delta_item
                     counter_ += 1
             else:
-                if same_app_name:
-                    apps_list[i] = delta_item
-                    counter_ += 1
+                apps_list[i] = delta_item
+                counter_ += 1
 
     if counter_ < length:
         error(MERGE_IMPOSSIBLE)
@@ -120,14 +158,16 @@ def extended_merge(full_sd, delta_sd):
     # merge DeployGraph
     counter = 0
     length = len(delta_sd["deployGraph"])
+    delta_chunks = {}
+    for j in delta_sd["deployGraph"]:
+        delta_chunks.setdefault(j["chunkName"], []).append(j)
     for i in full_sd["deployGraph"]:
-        for j in delta_sd["deployGraph"]:
-            if i["chunkName"] == j["chunkName"]:
-                in_first = set(i["apps"])
-                in_second = set(j["apps"])
-                in_second_but_not_in_first = in_second - in_first
-                i["apps"] = i["apps"] + list(in_second_but_not_in_first)
-                counter += 1
+        for j in delta_chunks.get(i["chunkName"], []):
+            in_first = set(i["apps"])
+            in_second = set(j["apps"])
+            in_second_but_not_in_first = in_second - in_first
+            i["apps"] = i["apps"] + list(in_second_but_not_in_first)
+            counter += 1
     if counter < length:
         error(NEW_CHUNK_ERROR)
 
@@ -157,27 +197,25 @@ def basic_merge(full_sd, delta_sd):
     delta_apps = delta_sd.get("applications", [])
     result_apps = []
 
+    delta_index = index_apps_by_key(delta_apps)
+
     # Stage 1: Replace Matching apps with Delta versions
     for f_app in full_apps:
-        replaced = False
-        for d_app in delta_apps:
-            if is_duplicating(f_app, d_app):
-                # Rule 2: Duplicating, keep Full SD version
-                result_apps.append(f_app)
-                replaced = True
-                break
-            elif is_matching(f_app, d_app):
-                # Rule 1: Matching, replace with Delta version
-                result_apps.append(d_app)
-                replaced = True
-                break
-        if not replaced:
+        i = delta_index.get(get_app_key(f_app))
+        if i is None:
             # No match found: keep Full SD version
             result_apps.append(f_app)
+        elif get_version(f_app) == get_version(delta_apps[i]):
+            # Rule 2: Duplicating, keep Full SD version
+            result_apps.append(f_app)
+        else:
+            # Rule 1: Matching, replace with Delta version
+            result_apps.append(delta_apps[i])
 
     # Stage 2: Add New applications from Delta SD
+    full_keys = {get_app_key(f_app) for f_app in full_apps}
     for d_app in delta_apps:
-        if not any(is_matching(f_app, d_app) for f_app in full_apps):
+        if get_app_key(d_app) not in full_keys:
             # Rule 3: New Application, append
             result_apps.append(d_app)
 
@@ -202,23 +240,19 @@ def basic_exclusion_merge(full_sd, delta_sd):
     # Track matched delta apps
     matched_delta_indices = set()
 
+    delta_index = index_apps_by_key(delta_apps)
+
     # Stage 1: Process full SD
     for f_app in full_apps:
-        keep = True
-        for i, d_app in enumerate(delta_apps):
-            if is_duplicating(f_app, d_app):
-                # Rule 3: Remove duplicating
-                keep = False
-                matched_delta_indices.add(i)
-                break
-            elif is_matching(f_app, d_app):
-                # Rule 1: Replace matching
-                result_apps.append(d_app)
-                keep = False
-                matched_delta_indices.add(i)
-                break
-        if keep:
+        i = delta_index.get(get_app_key(f_app))
+        if i is None:
             result_apps.append(f_app)
+            continue
+        matched_delta_indices.add(i)
+        if get_version(f_app) != get_version(delta_apps[i]):
+            # Rule 1: Replace matching
+            result_apps.append(delta_apps[i])
+        # Rule 3: Remove duplicating
 
     # Stage 2: Warn about new apps
     for i, d_app in enumerate(delta_apps):
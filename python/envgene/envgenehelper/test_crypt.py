@@ -6,10 +6,14 @@
 from ruyaml import CommentedMap
 
 from .collections_helper import compare_dicts
+from .crypt_backends import fernet_handler
+from .crypt_backends.fernet_handler import crypt_Fernet_files
 
-from .crypt import decrypt_file, encrypt_file, is_encrypted
-from .file_helper import check_file_exists, writeToFile
-from .yaml_helper import openYaml, set_nested_yaml_attribute, writeYamlToFile
+from . import crypt
+from .crypt import CRYPT_PARALLEL_THRESHOLD, close_secrets_view, crypt_files, decrypt_file, encrypt_file, \
+    is_encrypted, is_secrets_view_open, open_secrets_view, read_cred_file
+from .file_helper import check_file_exists, openFileAsString, writeToFile
+from .yaml_helper import openYaml, readYaml, set_nested_yaml_attribute, writeYamlToFile
 
 TEST_CONTENT = """\
 first_cred:
@@ -178,3 +182,98 @@ def test_minimize_diff(crypt_kwargs):
     # test wrong parameter combination
     with pytest.raises(ValueError):
         encrypt_file(**crypt_kwargs, minimize_diff=True)
+
+def test_crypt_files_in_workers(tmp_path):
+    fernet_kwargs = {'crypt_backend': 'Fernet', 'secret_key': crypt_test_data[1]['secret_key'], 'is_crypt': True}
+    files = []
+    for i in range(CRYPT_PARALLEL_THRESHOLD + 2):
+        files.append(str(tmp_path / f"creds-{i}.yml"))
+        writeToFile(files[-1], TEST_CONTENT)
+    init_yaml = openYaml(files[0])
+
+    timings = crypt_files(encrypt_file, files, workers=2, **fernet_kwargs)
+    assert sorted(timings) == sorted(files)
+    assert all(is_encrypted(f, 'Fernet') for f in files)
+
+    crypt_files(decrypt_file, files, workers=2, **fernet_kwargs)
+    assert all(openYaml(f) == init_yaml for f in files)
+
+def test_crypt_files_batches_fernet_files(tmp_path, monkeypatch):
+    fernet_kwargs = {'crypt_backend': 'Fernet', 'secret_key': crypt_test_data[1]['secret_key'], 'is_crypt': True}
+    batches = []
+    monkeypatch.setattr(crypt, 'crypt_Fernet_files',
+                        lambda files, *args, **kwargs: batches.append(files) or crypt_Fernet_files(files, *args,
+                                                                                                 **kwargs))
+    files = [str(tmp_path / f"creds-{i}.yml") for i in range(3)]
+    for file_path in files:
+        writeToFile(file_path, TEST_CONTENT)
+
+    timings = crypt_files(encrypt_file, files + [str(tmp_path / "missing.yml")], workers=1, allow_default=True,
+                          **fernet_kwargs)
+    assert batches == [files] and len(timings) == 4
+    assert all(is_encrypted(f, 'Fernet') for f in files)
+    crypt_files(decrypt_file, files, workers=1, **fernet_kwargs)
+    assert len(batches) == 2 and all(openYaml(f) == readYaml(TEST_CONTENT) for f in files)
+
+def test_secrets_view_writes_only_changed_files(tmp_path, monkeypatch):
+    secret_key = crypt_test_data[1]['secret_key']
+    monkeypatch.setattr(crypt, 'BASE_DIR', str(tmp_path))
+    monkeypatch.setattr(crypt, 'get_crypt', lambda: True)
+    monkeypatch.setattr(crypt, 'get_crypt_backend', lambda: 'Fernet')
+    monkeypatch.delenv('ENV_NAMES', raising=False)
+    creds_dir = tmp_path / 'environments' / 'cluster' / 'env' / 'Credentials'
+    files = {name: str(creds_dir / f'{name}-creds.yml') for name in ['untouched', 'same', 'changed']}
+    encrypted_texts = {}
+    for name, file_path in files.items():
+        writeToFile(file_path, TEST_CONTENT)
+        encrypt_file(file_path, crypt_backend='Fernet', secret_key=secret_key, ignore_is_crypt=True)
+        encrypted_texts[name] = openFileAsString(file_path)
+    init_yaml = readYaml(TEST_CONTENT)
+    copy_path = str(tmp_path / 'render' / 'credentials.yml')
+    writeToFile(copy_path, encrypted_texts['untouched'])
+
+    view = open_secrets_view(secret_key=secret_key)
+    assert is_secrets_view_open() and sorted(view) == sorted(files.values())
+    assert read_cred_file(copy_path) == init_yaml
+    writeYamlToFile(files['same'], read_cred_file(files['same']))
+    changed = read_cred_file(files['changed'])
+    set_nested_yaml_attribute(changed, 'first_cred.data.secret', 'new-value')
+    writeYamlToFile(files['changed'], changed)
+    new_file = str(creds_dir / 'new-creds.yml')
+    writeToFile(new_file, TEST_CONTENT)
+
+    timings = close_secrets_view()
+    assert sorted(timings) == sorted([files['changed'], new_file])
+    assert not is_secrets_view_open()
+    assert openFileAsString(files['untouched']) == encrypted_texts['untouched']
+    assert openFileAsString(files['same']) == encrypted_texts['same']
+    assert is_encrypted(new_file, 'Fernet')
+    assert decrypt_file(files['changed'], in_place=False, crypt_backend='Fernet', secret_key=secret_key,
+                        ignore_is_crypt=True)['first_cred']['data']['secret'] == 'new-value'
+
+def test_fernet_files_in_one_batch(tmp_path, monkeypatch):
+    secret_key = crypt_test_data[1]['secret_key']
+    monkeypatch.setattr(fernet_handler, 'FERNET_PARALLEL_THRESHOLD', 0)
+    files = [str(tmp_path / f"creds-{i}.yml") for i in range(3)]
+    for file_path in files:
+        writeToFile(file_path, TEST_CONTENT)
+    init_yaml = readYaml(TEST_CONTENT)
+    old_files = {file_path: f"{file_path}.old" for file_path in files}
+
+    encrypted = crypt_Fernet_files(files, secret_key, in_place=True, mode='encrypt', workers=2)
+    assert all(is_encrypted(f, 'Fernet') for f in files)
+    for file_path in files:
+        writeYamlToFile(old_files[file_path], encrypted[file_path])
+        writeToFile(file_path, TEST_CONTENT)
+    changed = readYaml(TEST_CONTENT)
+    set_nested_yaml_attribute(changed, 'first_cred.data.secret', 'new-value')
+    writeYamlToFile(files[0], changed)
+
+    reencrypted = crypt_Fernet_files(files, secret_key, in_place=True, mode='encrypt', minimize_diff=True,
+                                     old_file_paths=old_files, workers=2)
+    assert reencrypted[files[1]] == encrypted[files[1]]
+    diff_paths, removed_paths = compare_dicts(encrypted[files[0]], reencrypted[files[0]])
+    assert diff_paths == [['first_cred', 'data', 'secret']] and not removed_paths
+
+    decrypted = crypt_Fernet_files(files, secret_key, in_place=False, mode='decrypt', workers=2)
+    assert decrypted[files[0]] == changed and decrypted[files[2]] == init_yaml
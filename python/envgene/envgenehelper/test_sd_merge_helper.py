@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from .sd_merge_helper import DeployGraphApps, basic_exclusion_merge, basic_merge, check_deploy_graph, \
+    extended_merge, is_duplicating, is_matching
+from .yaml_helper import yaml
+
+
+def app(name, version, postfix=None):
+    result = {"version": f"{name}:{version}"}
+    if postfix:
+        result["deployPostfix"] = postfix
+    return result
+
+
+def sequential_basic_merge(full_apps, delta_apps):
+    # reference pairwise scan the indexed merge has to agree with
+    result = [next((f_app if is_duplicating(f_app, d_app) else d_app for d_app in delta_apps
+                    if is_matching(f_app, d_app)), f_app) for f_app in full_apps]
+    return result + [d_app for d_app in delta_apps if not any(is_matching(f_app, d_app) for f_app in full_apps)]
+
+
+def test_basic_merge_matches_sequential_scan():
+    rnd = random.Random(7)
+    for _ in range(50):
+        full_apps = [app(f"app-{rnd.randrange(20)}", f"1.{rnd.randrange(3)}", rnd.choice([None, "a", "b"]))
+                     for _ in range(30)]
+        delta_apps = [app(f"app-{rnd.randrange(20)}", f"1.{rnd.randrange(3)}", rnd.choice([None, "a", "b"]))
+                      for _ in range(15)]
+        result = basic_merge({"applications": full_apps}, {"applications": delta_apps})
+        assert result["applications"] == sequential_basic_merge(full_apps, delta_apps)
+
+
+def test_basic_exclusion_merge_uses_first_matching_delta_app():
+    full_apps = [app("a", "1", "x"), app("b", "1"), app("c", "1")]
+    delta_apps = [app("a", "2", "x"), app("a", "3", "x"), app("b", "1"), app("d", "1")]
+    result = basic_exclusion_merge({"applications": full_apps}, {"applications": delta_apps})
+    assert result["applications"] == [app("a", "2", "x"), app("c", "1")]
+
+
+def test_deploy_graph_apps_match_check_deploy_graph():
+    sd = {"deployGraph": [{"chunkName": "db", "apps": ["Postgres:postgresql", "redis"]}, {"chunkName": "empty"}]}
+    deploy_graph_apps = DeployGraphApps(sd)
+    for name in ["postgres", "gres:post", "REDIS", "redis:", "postgresql", "mongo", ""]:
+        assert (name in deploy_graph_apps) == check_deploy_graph(name, sd), name
+    assert "" not in DeployGraphApps({"deployGraph": [{"chunkName": "empty", "apps": []}]})
+
+
+def test_extended_merge_replaces_by_name_and_deploy_postfix():
+    full_sd = yaml.load("""
+applications:
+  - version: "postgres:1"
+    deployPostfix: "postgresql"
+  - version: "postgres:1"
+    deployPostfix: "postgresql-dbaas"
+  - version: "app:1"
+deployGraph:
+  - chunkName: "db"
+    apps: ["postgres:postgresql", "postgres:postgresql-dbaas"]
+""")
+    delta_sd = yaml.load("""
+applications:
+  - version: "postgres:2"
+    deployPostfix: "postgresql-dbaas"
+  - version: "monitoring:1"
+    deployPostfix: "monitoring"
+deployGraph:
+  - chunkName: "db"
+    apps: ["postgres:postgresql-dbaas", "monitoring:monitoring"]
+""")
+    result = extended_merge(full_sd, delta_sd)
+    assert [(a["version"], a.get("deployPostfix")) for a in result["applications"]] == [
+        ("postgres:1", "postgresql"), ("postgres:2", "postgresql-dbaas"), ("app:1", None),
+        ("monitoring:1", "monitoring")]
+    assert list(result["deployGraph"][0]["apps"]) == [
+        "postgres:postgresql", "postgres:postgresql-dbaas", "monitoring:monitoring"]
+
+
+def test_extended_merge_rejects_new_chunk():
+    full_sd = {"applications": [app("a", "1")], "deployGraph": [{"chunkName": "one", "apps": ["a"]}]}
+    delta_sd = {"applications": [app("a", "2")], "deployGraph": [{"chunkName": "two", "apps": ["a"]}]}
+    with pytest.raises(ValueError, match="new chunk"):
+        extended_merge(full_sd, delta_sd)
@@ -0,0 +1,179 @@
+import json
+
+import jsonschema
+import pytest
+
+from .file_helper import writeToFile
+from .file_helper import openFileAsString
+from .yaml_helper import YamlDocumentCache, openYaml, writeYamlToFile, yaml_cache, findAllYamlsInDir, \
+    load_yaml_without_comments, safe_yaml, beautifyYaml, store_value_to_yaml, SchemaValidatorRegistry, \
+    schema_validators, validate_yaml_by_scheme_or_fail, sortYaml, get_schema_sorter, readYaml
+
+TEST_CONTENT = """\
+# header comment
+name: "test"
+parameters:
+  key: value # inline comment
+"""
+
+
+@pytest.fixture
+def yaml_file(tmp_path):
+    file_path = str(tmp_path / "test.yml")
+    writeToFile(file_path, TEST_CONTENT)
+    yaml_cache.clear()
+    yield file_path
+    yaml_cache.clear()
+
+
+def test_cached_document_is_copied(yaml_file):
+    first = openYaml(yaml_file)
+    first["parameters"]["key"] = "changed"
+    second = openYaml(yaml_file)
+    assert second["parameters"]["key"] == "value"
+    assert yaml_cache.hits == 1
+
+
+def test_cache_is_invalidated_by_write(yaml_file):
+    content = openYaml(yaml_file)
+    content["parameters"]["key"] = "changed"
+    writeYamlToFile(yaml_file, content)
+    assert openYaml(yaml_file)["parameters"]["key"] == "changed"
+
+
+def test_cache_detects_external_change(yaml_file):
+    openYaml(yaml_file)
+    writeToFile(yaml_file, TEST_CONTENT.replace("value", "other"))
+    assert openYaml(yaml_file)["parameters"]["key"] == "other"
+
+
+def test_cache_keeps_loaders_apart(yaml_file):
+    openYaml(yaml_file)
+    safe_content = openYaml(yaml_file, safe_load=True)
+    assert type(safe_content) is dict
+
+
+def test_cache_evicts_least_recently_used():
+    cache = YamlDocumentCache(max_bytes=10)
+    cache.put("a: 12345", False, {"a": 12345})
+    cache.put("b: 12345", False, {"b": 12345})
+    assert cache.get("a: 12345", False) is None
+    assert cache.get("b: 12345", False) == {"b": 12345}
+    assert cache.used_bytes <= cache.max_bytes
+
+
+def test_copies_of_a_file_share_cached_document(yaml_file, tmp_path):
+    openYaml(yaml_file, safe_load=True)
+    copy_path = str(tmp_path / "copy" / "test.yml")
+    writeToFile(copy_path, TEST_CONTENT)
+    assert openYaml(copy_path, safe_load=True) == {"name": "test", "parameters": {"key": "value"}}
+    assert yaml_cache.hits == 1
+
+
+fast_loader_test_data = [
+    "a: yes", "a: on", "a: 0777", "a: 0o17", "a: 1:20", "a: 1e3", "a: -.5", "a: 0x1F", "a: .inf",
+    "a: 2024-01-01", "a: 2024-01-01T10:00:00+02:00", "a: ~", "{<<: {b: 1, c: 1}, c: 2}", "- 1\n- True\n- Null",
+]
+
+
+@pytest.mark.parametrize("text", fast_loader_test_data)
+def test_fast_loader_matches_safe_yaml(text):
+    assert load_yaml_without_comments(text) == safe_yaml.load(text)
+
+
+def test_fast_loader_matches_safe_yaml_on_test_data(request):
+    test_data_dir = request.fspath.dirname + "/../../../test_data"
+    for file_path in findAllYamlsInDir(test_data_dir):
+        with open(file_path) as f:
+            text = f.read()
+        try:
+            expected = safe_yaml.load(text)
+        except Exception:
+            with pytest.raises(Exception):
+                load_yaml_without_comments(text)
+            continue
+        assert load_yaml_without_comments(text) == expected, file_path
+
+
+def test_fast_loader_fails_on_duplicate_keys():
+    with pytest.raises(Exception):
+        load_yaml_without_comments("a: 1\na: 2")
+
+
+def test_beautify_adds_header_and_aligns_comments(tmp_path):
+    file_path = str(tmp_path / "test.yml")
+    writeToFile(file_path, "name: test\nparameters:   # params\n  key: value\n")
+    beautifyYaml(file_path, header_text="generated\ndo not edit")
+    assert openFileAsString(file_path) == (
+        "# generated\n# do not edit\n"
+        "name: \"test\"\n"
+        "parameters: # params\n"
+        "  key: \"value\"\n"
+    )
+
+
+def test_beautify_in_memory_matches_file_based(yaml_file, tmp_path):
+    content = openYaml(yaml_file)
+    store_value_to_yaml(content["parameters"], "added", "new", "paramset: test")
+    in_memory_path = str(tmp_path / "in_memory.yml")
+    beautifyYaml(in_memory_path, header_text="generated", yaml_data=content)
+    writeYamlToFile(yaml_file, content)
+    beautifyYaml(yaml_file, header_text="generated")
+    assert openFileAsString(in_memory_path) == openFileAsString(yaml_file)
+
+
+@pytest.fixture
+def schema_file(tmp_path):
+    writeToFile(str(tmp_path / "name.schema.json"), json.dumps({"type": "string"}))
+    schema_path = str(tmp_path / "test.schema.json")
+    writeToFile(schema_path, json.dumps({
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {"name": {"$ref": "name.schema.json"}},
+        "required": ["name"],
+    }))
+    schema_validators.clear()
+    yield schema_path
+    schema_validators.clear()
+
+
+def test_schema_validator_is_compiled_once(schema_file, yaml_file, tmp_path):
+    for _ in range(3):
+        validate_yaml_by_scheme_or_fail(yaml_file, schema_file, schemas_dir=tmp_path)
+    assert (schema_validators.misses, schema_validators.hits) == (1, 2)
+
+
+def test_schema_validator_fails_on_invalid_yaml(schema_file, tmp_path):
+    with pytest.raises(ValueError):
+        validate_yaml_by_scheme_or_fail(input_yaml_content={"name": 1}, schema_file_path=schema_file,
+                                        schemas_dir=tmp_path)
+
+
+def test_schema_validator_by_content():
+    registry = SchemaValidatorRegistry()
+    first = registry.get_validator(schema_content={"type": "object"})
+    second = registry.get_validator(schema_content={"type": "object"})
+    assert first is second
+    assert registry.get_validator(schema_content={"type": "string"}) is not first
+
+
+def test_sort_yaml_by_schema(schema_file):
+    writeToFile(schema_file, json.dumps({
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {"name": {"type": "string"}, "version": {"type": "string"}},
+    }))
+    for _ in range(2):
+        result = sortYaml(readYaml("version: '1'\nextra: 1\nname: test\n"), schema_file, False)
+        assert list(result.keys()) == ["name", "version", "extra"]
+    assert get_schema_sorter(schema_file) is get_schema_sorter(schema_file)
+
+
+def test_sort_yaml_reports_validation_error(schema_file):
+    writeToFile(schema_file, json.dumps({
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "required": ["name"],
+    }))
+    with pytest.raises(jsonschema.ValidationError, match="'name' is a required property"):
+        sortYaml(readYaml("version: '1'\n"), schema_file, False)
@@ -1,15 +1,21 @@
 import copy
+import hashlib
 import json
 import pathlib
+from collections import OrderedDict as LRUDict
 from io import StringIO
+from os import getenv
 from typing import OrderedDict
 
 import jschon
 import jschon_tools
 import jsonschema
 import ruyaml
+import yaml as pyyaml
 from ruyaml import CommentedMap, CommentedSeq
+from ruyaml.resolver import implicit_resolvers
 from ruyaml.scalarstring import DoubleQuotedScalarString, LiteralScalarString
+from ruyaml.util import create_timestamp, timestamp_regexp
 
 from .file_helper import *
 from .json_helper import openJson
@@ -36,6 +42,115 @@ def get_empty_yaml():
     return ruyaml.CommentedMap()
 
 
+class FastSafeLoader(getattr(pyyaml, 'CSafeLoader', pyyaml.SafeLoader)):
+    """
+    PyYAML loader backed by libyaml (when available) that resolves and constructs scalars by the
+    YAML 1.2 rules of ruyaml, so it returns the same data as safe_yaml.load(), only faster.
+    Used for comment-free reads of files that are not written back.
+    """
+    yaml_implicit_resolvers = {}
+
+    def construct_mapping(self, node, deep=False):
+        keys = set()
+        for key_node, _ in node.value:
+            if key_node.tag == 'tag:yaml.org,2002:merge':
+                continue
+            key = self.construct_object(key_node, deep=deep)
+            try:
+                is_duplicate = key in keys
+                keys.add(key)
+            except TypeError:
+                continue
+            if is_duplicate:
+                raise pyyaml.constructor.ConstructorError('while constructing a mapping', node.start_mark,
+                                                          f'found duplicate key "{key}"', key_node.start_mark)
+        return super().construct_mapping(node, deep=deep)
+
+    def construct_yaml_int(self, node):
+        value = self.construct_scalar(node).replace('_', '')
+        sign = -1 if value[0] == '-' else 1
+        if value[0] in '+-':
+            value = value[1:]
+        for prefix, base in (('0b', 2), ('0o', 8), ('0x', 16)):
+            if value.startswith(prefix):
+                return sign * int(value[2:], base)
+        return sign * int(value)
+
+    def construct_yaml_timestamp(self, node):
+        return create_timestamp(**timestamp_regexp.match(self.construct_scalar(node)).groupdict())
+
+
+for _versions, _tag, _regexp, _first in implicit_resolvers:
+    if (1, 2) in _versions:
+        FastSafeLoader.add_implicit_resolver(_tag, _regexp, _first)
+FastSafeLoader.add_constructor('tag:yaml.org,2002:int', FastSafeLoader.construct_yaml_int)
+FastSafeLoader.add_constructor('tag:yaml.org,2002:timestamp', FastSafeLoader.construct_yaml_timestamp)
+
+
+def load_yaml_without_comments(text):
+    if isinstance(text, Path):
+        text = text.read_text()
+    # YAML directives may switch the document to another spec version, leave those to ruyaml
+    if isinstance(text, str) and text.lstrip().startswith('%'):
+        return safe_yaml.load(text)
+    return pyyaml.load(text, Loader=FastSafeLoader)
+
+
+class YamlDocumentCache:
+    """
+    Process-wide cache of parsed yaml documents.
+
+    Entries are keyed by a digest of the file content and loader type, so a file changed by any writer is
+    parsed again, and copies of a file share the document parsed from any of them. Environments built in
+    forked workers read their copies of shared paramsets from documents parsed by the parent process.
+    Callers always get a deep copy and may mutate it freely. Least recently used entries are evicted once the total size of the cached
+    source texts exceeds max_bytes, max_bytes=0 disables caching.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = LRUDict()
+
+    @staticmethod
+    def _key(text, safe_load):
+        return hashlib.sha1(text.encode()).digest(), bool(safe_load)
+
+    def get(self, text, safe_load):
+        key = self._key(text, safe_load)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return copy.deepcopy(entry[1])
+
+    def put(self, text, safe_load, data):
+        size = len(text)
+        if size > self.max_bytes:
+            return
+        key = self._key(text, safe_load)
+        self._drop(key)
+        self._entries[key] = (size, copy.deepcopy(data))
+        self.used_bytes += size
+        while self.used_bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def clear(self):
+        self._entries.clear()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.used_bytes -= entry[0]
+
+
 def openYaml(filePath, safe_load=False, default_yaml: Callable = get_empty_yaml, allow_default=False):
     if allow_default and not check_file_exists(filePath):
         logger.info(f'{filePath} not found. Returning default value')
@@ -43,7 +158,11 @@ def openYaml(filePath, safe_load=False, default_yaml: Callable = get_empty_yaml,
 
     logger.debug(f"Open yaml file: {filePath}")
     with open(filePath, 'r') as f:
-        resultYaml = readYaml(f.read(), safe_load, context=f"File: {filePath}")
+        text = f.read()
+    resultYaml = yaml_cache.get(text, safe_load)
+    if resultYaml is None:
+        resultYaml = readYaml(text, safe_load, context=f"File: {filePath}")
+        yaml_cache.put(text, safe_load, resultYaml)
     return resultYaml
 
 
@@ -51,7 +170,7 @@ def readYaml(text, safe_load=False, context=None) -> CommentedMap:
     if text is None:
         resultYaml = None
     elif safe_load:
-        resultYaml = safe_yaml.load(text)
+        resultYaml = load_yaml_without_comments(text)
     else:
         resultYaml = yaml.load(text)
 
@@ -103,13 +222,31 @@ def dumpYamlToStr(content):
     return buffer.getvalue()
 
 
+def dump_yaml_for_file(contents) -> str:
+    # the same text writeYamlToFile writes, to be written later with write_yaml_str_to_file
+    remove_empty_list_comments(contents)
+    return dumpYamlToStr(contents)
+
+
+def write_yaml_str_to_file(file_path, text: str):
+    logger.info(f"Writing yaml to file: {file_path}")
+    writeToFile(str(file_path), text)
+
+
 def addHeaderToYaml(file_path: str, header_text: str):
     if (header_text):
         logger.debug(f'Adding header {header_text} to yaml: {file_path}')
         file_contents = openFileAsString(file_path)
-        if not file_contents or file_contents[0] != "#":
-            comment_text = "# " + header_text.replace("\n", "\n# ")
-            writeToFile(file_path, comment_text + "\n" + file_contents)
+        result = add_header_to_yaml_str(file_contents, header_text)
+        if result != file_contents:
+            writeToFile(file_path, result)
+
+
+def add_header_to_yaml_str(yaml_str: str, header_text: str) -> str:
+    if header_text and (not yaml_str or yaml_str[0] != "#"):
+        comment_text = "# " + header_text.replace("\n", "\n# ")
+        return comment_text + "\n" + yaml_str
+    return yaml_str
 
 
 def alignYamlFileComments(file_path):
@@ -141,19 +278,31 @@ def alignYamlComments(yamlContent, extra_indent=0):
 
 
 def sortYaml(yaml_data, schema_path, remove_additional_props):
-    with open(schema_path, 'r') as f:
-        schema_data = json.load(f)
     logger.debug(f'Checking yaml with schema: {schema_path}')
-    jsonschema.validate(yaml_data, schema_data)
-    sort_data = jschon_tools.process_json_doc(
-        schema_data=schema_data,
-        doc_data=yaml_data,
-        sort=True,
-        remove_additional_props=remove_additional_props
-    )
+    try:
+        sort_data = get_schema_sorter(schema_path).process_json_doc(
+            doc_data=yaml_data,
+            sort=True,
+            remove_additional_props=remove_additional_props
+        )
+    except ValueError:
+        # jschon only reports that document is invalid, jsonschema is used to get error details
+        error = jsonschema.exceptions.best_match(schema_validators.get_validator(schema_path).iter_errors(yaml_data))
+        if error is not None:
+            raise error
+        raise
     return sort_data
 
 
+def get_schema_sorter(schema_path) -> jschon_tools.SchemaSorter:
+    key = (os.path.abspath(schema_path), os.stat(schema_path).st_mtime_ns)
+    sorter = schema_sorters.get(key)
+    if sorter is None:
+        sorter = jschon_tools.SchemaSorter(openJson(schema_path))
+        schema_sorters[key] = sorter
+    return sorter
+
+
 def get_nested_yaml_attribute_or_fail(yaml_content, attribute_str):
     keys = attribute_str.split('.')
     sub_content = yaml_content
@@ -277,21 +426,41 @@ def merge_dict_key_with_comment(targetKey, targetYaml, sourceKey, sourceYaml, co
 
 
 def beautifyYaml(file_path, schema_path="", header_text="", allign_comments=False, wrap_all_strings=False,
-                 remove_additional_props=False):
+                 remove_additional_props=False, yaml_data=None):
+    """
+    Sorts, quotes and formats yaml and writes it to file_path with one atomic write.
+    When yaml_data is given, it is used instead of reading file_path, so callers that have just built
+    the content don't need to write it to file first.
+    """
     logger.info(f'Beautifying yaml: {file_path} with schema: {schema_path}')
-    yamlData = openYaml(file_path)
+    if yaml_data is None:
+        yaml_data = openYaml(file_path)
+    else:
+        # dumping and loading again places comments the same way as writing and reading the file did
+        remove_empty_list_comments(yaml_data)
+        yaml_data = readYaml(dumpYamlToStr(yaml_data), context=f"File: {file_path}")
+    result = beautify_yaml_str(yaml_data, schema_path, header_text, allign_comments, wrap_all_strings,
+                               remove_additional_props)
+    write_file_atomically(file_path, result)
+
+
+def beautify_yaml_str(yaml_data, schema_path="", header_text="", allign_comments=False, wrap_all_strings=False,
+                      remove_additional_props=False) -> str:
     if schema_path:
-        yamlData = sortYaml(yamlData, schema_path, remove_additional_props)
+        yaml_data = sortYaml(yaml_data, schema_path, remove_additional_props)
     if wrap_all_strings:
-        make_quotes_for_all_strings(yamlData)
+        make_quotes_for_all_strings(yaml_data)
     else:
-        make_quotes_for_strings(yamlData)
-
-    writeYamlToFile(file_path, yamlData)
-    addHeaderToYaml(file_path, header_text)
-    align_spaces_before_comments(file_path)
+        make_quotes_for_strings(yaml_data)
+    remove_empty_list_comments(yaml_data)
+    result = add_header_to_yaml_str(dumpYamlToStr(yaml_data), header_text)
+    result = align_spaces_before_comments_in_str(result)
     if allign_comments:
-        alignYamlFileComments(file_path)
+        aligned_data = readYaml(result)
+        alignYamlComments(aligned_data, 0)
+        remove_empty_list_comments(aligned_data)
+        result = dumpYamlToStr(aligned_data)
+    return result
 
 
 def findYamls(dir, pattern, notPattern="", additionalRegexpPattern="", additionalRegexpNotPattern=""):
@@ -340,18 +509,11 @@ def make_quotes_for_strings(yaml_data):
 
 
 def align_spaces_before_comments(filePath):
-    result = ""
-    f = open(filePath, 'r')
-    fileLines = f.readlines()
-    for line in fileLines:
-        if re.match(r'^(.*):( +)#(.*)$', line):
-            pattern = r'^(.*):( +)#(.*)$'
-            alignedLine = re.sub(pattern, r'\1: #\3', line)
-        else:
-            alignedLine = line
-        result += alignedLine
+    writeToFile(filePath, align_spaces_before_comments_in_str(openFileAsString(filePath)))
 
-    writeToFile(filePath, result)
+
+def align_spaces_before_comments_in_str(yaml_str):
+    return re.sub(r'^(.*):( +)#(.*)$', r'\1: #\3', yaml_str, flags=re.MULTILINE)
 
 
 def copy_yaml_and_remove_empty_dicts(source_yaml):
@@ -379,18 +541,58 @@ def yaml_from_string(yaml_str):
     return result
 
 
-def validate_yaml_by_scheme_or_fail(yaml_file_path: str = None, schema_file_path: str = None,
-                                    input_yaml_content: dict = None, input_schema_content: dict = None,
-                                    schemas_dir=None):
-    yaml_content = openYaml(yaml_file_path) if yaml_file_path else input_yaml_content
-    schema_content = openJson(schema_file_path) if schema_file_path else input_schema_content
+class SchemaValidatorRegistry:
+    """
+    Process-wide registry of compiled jsonschema validators.
+
+    Each schema is loaded, checked against its meta-schema and compiled once, with $ref resolution
+    against schemas_dir bound to the validator. Schema files are keyed by absolute path and mtime,
+    schemas given as content are keyed by digest of their json representation.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._validators = {}
 
+    def get_validator(self, schema_file_path=None, schema_content=None, schemas_dir=None):
+        if schema_file_path:
+            schema_key = (os.path.abspath(schema_file_path), os.stat(schema_file_path).st_mtime_ns)
+        else:
+            schema_json = json.dumps(schema_content, sort_keys=True, default=str)
+            schema_key = (hashlib.sha1(schema_json.encode()).hexdigest(),)
+        key = schema_key + (str(Path(schemas_dir).absolute()) if schemas_dir else None,)
+        validator = self._validators.get(key)
+        if validator is not None:
+            self.hits += 1
+            return validator
+        self.misses += 1
+        schema = openJson(schema_file_path) if schema_file_path else schema_content
+        validator = create_schema_validator(schema, schemas_dir)
+        self._validators[key] = validator
+        return validator
+
+    def clear(self):
+        self._validators.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def create_schema_validator(schema, schemas_dir=None):
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
     if schemas_dir:
         base_uri = Path(schemas_dir).absolute().as_uri() + "/"
-        resolver = RefResolver(base_uri=base_uri, referrer=schema_content)
-        errors = validate_yaml_data_by_scheme(yaml_content, schema_content, resolver=resolver)
-    else:
-        errors = validate_yaml_data_by_scheme(yaml_content, schema_content)
+        return cls(schema, resolver=RefResolver(base_uri=base_uri, referrer=schema))
+    return cls(schema)
+
+
+def validate_yaml_by_scheme_or_fail(yaml_file_path: str = None, schema_file_path: str = None,
+                                    input_yaml_content: dict = None, input_schema_content: dict = None,
+                                    schemas_dir=None):
+    yaml_content = openYaml(yaml_file_path, safe_load=True) if yaml_file_path else input_yaml_content
+    validator = schema_validators.get_validator(schema_file_path, input_schema_content, schemas_dir)
+    errors = sorted(validator.iter_errors(yaml_content), key=lambda e: e.path)
     if len(errors) > 0:
         if yaml_file_path:
             rel_path = getRelPath(yaml_file_path)
@@ -445,3 +647,6 @@ def find_all_yaml_files_by_stem(path: str):
 jschon.create_catalog('2020-12')
 yaml = create_yaml_processor()
 safe_yaml = create_yaml_processor(is_safe=True)
+yaml_cache = YamlDocumentCache(int(getenv("ENVGENE_YAML_CACHE_MAX_BYTES", 64 * 1024 * 1024)))
+schema_validators = SchemaValidatorRegistry()
+schema_sorters = {}
@@ -1,5 +1,7 @@
 from ._main import process_json_doc
+from ._main import SchemaSorter
 
 __all__ = [
     'process_json_doc',
+    'SchemaSorter',
 ]
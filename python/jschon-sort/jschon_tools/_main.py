@@ -3,6 +3,7 @@
 from typing import Dict
 from typing import List
 from typing import Mapping
+from typing import Optional
 from typing import Sequence
 from typing import Tuple
 
@@ -42,9 +43,12 @@ def _recurse(node: jschon.JSON, node_sort_key: Tuple[int, ...]) -> None:
 
 
 def _get_sort_keys_for_json_doc(
-    *, root_result: jschon.jsonschema.Result
+    *,
+    root_result: jschon.jsonschema.Result,
+    schema_sort_keys_cache: Optional[Dict[jschon.URI, Mapping[jschon.JSONPointer, Tuple[int, ...]]]] = None,
 ) -> Mapping[jschon.JSONPointer, Tuple[int, ...]]:
-    schema_sort_keys_cache: Dict[jschon.URI, Mapping[jschon.JSONPointer, Tuple[int, ...]]] = {}
+    if schema_sort_keys_cache is None:
+        schema_sort_keys_cache = {}
 
     def _get_sort_keys_for_schema(schema: jschon.JSONSchema) -> Mapping[jschon.JSONPointer, Tuple[int, ...]]:
         canonical_uri = schema.canonical_uri
@@ -69,20 +73,53 @@ def _traverse_result(result: jschon.jsonschema.Result) -> None:
     return doc_sort_keys
 
 
-def _get_root_result(doc_json: jschon.JSON, schema_data: Mapping[str, JSONCompatible]) -> jschon.jsonschema.Result:
+def _create_root_schema(schema_data: Mapping[str, JSONCompatible]) -> jschon.JSONSchema:
     try:
-        root_schema = jschon.JSONSchema(schema_data)
+        return jschon.JSONSchema(schema_data)
     except jschon.CatalogError:
         # jschon only supports newer jsonschema drafts
         schema_data = dict(schema_data)
         schema_data['$schema'] = "https://json-schema.org/draft/2020-12/schema"
-        root_schema = jschon.JSONSchema(schema_data)
+        return jschon.JSONSchema(schema_data)
+
+
+def _get_root_result(doc_json: jschon.JSON, root_schema: jschon.JSONSchema) -> jschon.jsonschema.Result:
     res = root_schema.evaluate(doc_json)
     if not res.valid:
         raise ValueError('Document failed schema validation')
     return res
 
 
+class SchemaSorter:
+    """
+    Compiled JSON Schema together with the sort keys of its nodes, reusable for processing many documents.
+    """
+
+    def __init__(self, schema_data: Mapping[str, JSONCompatible]) -> None:
+        self.schema = _create_root_schema(schema_data)
+        self._schema_sort_keys_cache: Dict[jschon.URI, Mapping[jschon.JSONPointer, Tuple[int, ...]]] = {}
+
+    def process_json_doc(
+        self,
+        *,
+        doc_data: JSONCompatible,
+        sort: bool = False,
+        remove_additional_props: bool = False,
+    ) -> JSONCompatible:
+        doc_json = jschon.JSON(doc_data)
+        root_result = _get_root_result(doc_json, self.schema)
+        doc_sort_keys = _get_sort_keys_for_json_doc(
+            root_result=root_result, schema_sort_keys_cache=self._schema_sort_keys_cache
+        )
+        return _process_json_doc(
+            doc_data=doc_data,
+            doc_json=doc_json,
+            doc_sort_keys=doc_sort_keys,
+            sort=sort,
+            remove_additional_props=remove_additional_props,
+        )
+
+
 def process_json_doc(
     *,
     doc_data: JSONCompatible,
@@ -90,9 +127,21 @@ def process_json_doc(
     sort: bool = False,
     remove_additional_props: bool = False,
 ) -> JSONCompatible:
-    doc_json = jschon.JSON(doc_data)
-    root_result = _get_root_result(doc_json, schema_data=schema_data)
-    doc_sort_keys = _get_sort_keys_for_json_doc(root_result=root_result)
+    return SchemaSorter(schema_data).process_json_doc(
+        doc_data=doc_data,
+        sort=sort,
+        remove_additional_props=remove_additional_props,
+    )
+
+
+def _process_json_doc(
+    *,
+    doc_data: JSONCompatible,
+    doc_json: jschon.JSON,
+    doc_sort_keys: Mapping[jschon.JSONPointer, Tuple[int, ...]],
+    sort: bool,
+    remove_additional_props: bool,
+) -> JSONCompatible:
 
     def _traverse_node(node: JSONCompatible, json_node: jschon.JSON) -> JSONCompatible:
         """
@@ -12,6 +12,7 @@
 from pathlib import Path
 
 # const
+APPLICATION_SCHEMA = "schemas/application.schema.json"
 GENERATED_HEADER = "The contents of this file is generated from template artifact: %s.\nContents will be overwritten by next generation.\nPlease modify this contents only for development purposes or as workaround."
 
 
@@ -67,11 +68,73 @@ def openParamset(path, template_context=None):
         env = Environment(loader=FileSystemLoader(os.path.dirname(path)))
         template = env.get_template(os.path.basename(path))
         rendered = template.render(**(template_context or {}))
-        return yaml.safe_load(rendered)
+        return readYaml(rendered, safe_load=True, context=f"File: {path}")
     paramsetYaml = openYaml(path, safe_load=True)
     return paramsetYaml
 
 
+class ParamsetIndex(dict):
+    """
+    Paramsets map (paramset name -> list of paramset file entries) built once per environment render.
+
+    Keeps every paramset file parsed at most once: plain yaml/json paramsets and .j2 paramsets that do not use the
+    template context are parsed once, context dependent .j2 paramsets are rendered once per distinct template
+    context. Template contexts are resolved once per template directory. Callers get deep copies of parsed
+    paramsets, so they are free to modify them.
+    """
+
+    def __init__(self, paramset_map):
+        super().__init__(paramset_map)
+        self._paramsets = {}
+        self._jinja_envs = {}
+        self._context_independent = {}
+        self._template_contexts = {}
+        self._distinct_contexts = []
+
+    def get_template_context(self, template_path, env_instances_dir=None):
+        template_dir = os.path.dirname(template_path)
+        if template_dir not in self._template_contexts:
+            env_definition = findEnvDefinitionFromTemplatePath(template_path, env_instances_dir)
+            template_context = createParamsetTemplateContext(env_definition)
+            # templates of one environment share the same context, keep only one instance of it
+            template_context = next((c for c in self._distinct_contexts if c == template_context), template_context)
+            if not any(c is template_context for c in self._distinct_contexts):
+                self._distinct_contexts.append(template_context)
+            self._template_contexts[template_dir] = template_context
+        return self._template_contexts[template_dir]
+
+    def open_paramset(self, path, template_context=None):
+        if not path.endswith(".j2") or self._is_context_independent(path):
+            key = (path, None)
+        else:
+            key = (path, id(template_context) if template_context else None)
+        if key not in self._paramsets:
+            if path.endswith(".j2"):
+                template = self._get_jinja_env(path).get_template(os.path.basename(path))
+                rendered = template.render(**(template_context or {}))
+                self._paramsets[key] = readYaml(rendered, safe_load=True, context=f"File: {path}")
+            else:
+                self._paramsets[key] = openParamset(path)
+        return copy.deepcopy(self._paramsets[key])
+
+    def _get_jinja_env(self, path):
+        from jinja2 import Environment, FileSystemLoader
+        dir_path = os.path.dirname(path)
+        if dir_path not in self._jinja_envs:
+            self._jinja_envs[dir_path] = Environment(loader=FileSystemLoader(dir_path))
+        return self._jinja_envs[dir_path]
+
+    def _is_context_independent(self, path):
+        if path not in self._context_independent:
+            from jinja2 import meta
+            env = self._get_jinja_env(path)
+            source = env.loader.get_source(env, os.path.basename(path))[0]
+            ast = env.parse(source)
+            self._context_independent[path] = not meta.find_undeclared_variables(ast) and \
+                not list(meta.find_referenced_templates(ast))
+        return self._context_independent[path]
+
+
 def findParamsetsInDir(dirPath):
     fileList = findAllYamlsInDir(dirPath)
     fileListJson = findAllJsonsInDir(dirPath)
@@ -179,6 +242,46 @@ def findEnvDefinitionFromTemplatePath(templatePath, env_instances_dir=None):
     raise ReferenceError(f"Environment definition not found for template {templatePath}")
 
 
+def createParamsetTemplateContext(env_definition):
+    # Get environment name from inventory, with fallback to derived name from path
+    env_name = env_definition["inventory"].get("environmentName")
+
+    # Get cloud name and cluster information for macro support
+    cloud_name = env_definition["inventory"].get("cloudName", "")
+    cluster_name = env_definition.get("_derived_cluster_name", "")
+
+    # Create cloudNameWithCluster for macro support
+    cloud_name_with_cluster = f"{cloud_name}-{cluster_name}" if cloud_name and cluster_name else cloud_name
+
+    # Create environment context with comprehensive macro support
+    current_env = {
+        "name": env_name,
+        "environmentName": env_name,  # Alternative access
+        "cloud": cloud_name,
+        "cloudNameWithCluster": cloud_name_with_cluster,
+        "solution_structure": env_definition.get("solutionStructure", {}),
+        "additionalTemplateVariables": env_definition.get("envTemplate", {}).get(
+            "additionalTemplateVariables", {}),
+        "cluster": {
+            "name": cluster_name,
+            # Add cluster-specific properties that might be used in templates
+            "cloud_api_url": env_definition.get("envTemplate", {}).get("additionalTemplateVariables",
+                                                                       {}).get("cloud_api_url", ""),
+            "cloud_api_port": env_definition.get("envTemplate", {}).get("additionalTemplateVariables",
+                                                                        {}).get("cloud_api_port", ""),
+            "cloud_public_url": env_definition.get("envTemplate", {}).get("additionalTemplateVariables",
+                                                                          {}).get("cloud_public_url", ""),
+            "cloud_api_protocol": env_definition.get("envTemplate", {}).get("additionalTemplateVariables",
+                                                                            {}).get("cloud_api_protocol",
+                                                                                    "https")
+        }
+    }
+    return {
+        "env_definition": env_definition,
+        "current_env": current_env
+    }
+
+
 def sort_paramsets_with_same_name(entries: list[dict]) -> list[dict]:
     # Strict order processing paramsets template -> cluster -> instance
     # Lower sort keys are processed first, later values override earlier ones
@@ -194,7 +297,8 @@ def sort_key(e):
 
 
 def convertParameterSetsToParameters(templatePath, paramsTemplate, paramsetsTag, parametersTag, paramset_map,
-                                     env_specific_params_map, header_text="", env_instances_dir=None):
+                                     env_specific_params_map, header_text="", env_instances_dir=None,
+                                     app_definitions=None):
     params = copy.deepcopy(paramsTemplate[parametersTag])
     for pset in paramsTemplate[paramsetsTag]:
         # Check if paramset exists in paramset_map before accessing it
@@ -210,49 +314,12 @@ def convertParameterSetsToParameters(templatePath, paramsTemplate, paramsetsTag,
             isEnvSpecificParamset = entry["envSpecific"]
             # Get template context from environment definition
             try:
-                env_definition = findEnvDefinitionFromTemplatePath(templatePath, env_instances_dir)
-                # Get environment name from inventory, with fallback to derived name from path
-                env_name = env_definition["inventory"].get("environmentName")
-
-                # Get cloud name and cluster information for macro support
-                cloud_name = env_definition["inventory"].get("cloudName", "")
-                cluster_name = env_definition.get("_derived_cluster_name", "")
-
-                # Create cloudNameWithCluster for macro support
-                cloud_name_with_cluster = f"{cloud_name}-{cluster_name}" if cloud_name and cluster_name else cloud_name
-
-                # Create environment context with comprehensive macro support
-                current_env = {
-                    "name": env_name,
-                    "environmentName": env_name,  # Alternative access
-                    "cloud": cloud_name,
-                    "cloudNameWithCluster": cloud_name_with_cluster,
-                    "solution_structure": env_definition.get("solutionStructure", {}),
-                    "additionalTemplateVariables": env_definition.get("envTemplate", {}).get(
-                        "additionalTemplateVariables", {}),
-                    "cluster": {
-                        "name": cluster_name,
-                        # Add cluster-specific properties that might be used in templates
-                        "cloud_api_url": env_definition.get("envTemplate", {}).get("additionalTemplateVariables",
-                                                                                   {}).get("cloud_api_url", ""),
-                        "cloud_api_port": env_definition.get("envTemplate", {}).get("additionalTemplateVariables",
-                                                                                    {}).get("cloud_api_port", ""),
-                        "cloud_public_url": env_definition.get("envTemplate", {}).get("additionalTemplateVariables",
-                                                                                      {}).get("cloud_public_url", ""),
-                        "cloud_api_protocol": env_definition.get("envTemplate", {}).get("additionalTemplateVariables",
-                                                                                        {}).get("cloud_api_protocol",
-                                                                                                "https")
-                    }
-                }
-                template_context = {
-                    "env_definition": env_definition,
-                    "current_env": current_env
-                }
-                paramSetValues = openParamset(paramSetFile, template_context)
+                template_context = paramset_map.get_template_context(templatePath, env_instances_dir)
+                paramSetValues = paramset_map.open_paramset(paramSetFile, template_context)
             except Exception as e:
                 logger.warning(f"Failed to render template for paramset {pset}: {str(e)}")
                 # Fall back to direct YAML loading if template rendering fails
-                paramSetValues = openParamset(paramSetFile)
+                paramSetValues = paramset_map.open_paramset(paramSetFile)
             #
             paramSetName = paramSetValues["name"]
             paramSetVersion = paramSetValues["version"] if "version" in paramSetValues else "n/a"
@@ -277,29 +344,43 @@ def convertParameterSetsToParameters(templatePath, paramsTemplate, paramsetsTag,
             # prepare application parameters
             convertParameterSetsToApplication(templatePath, paramsetDefinitionComment, paramSetAppParams, pset,
                                               parametersTag, isEnvSpecificParamset, env_specific_params_map,
-                                              header_text)
+                                              header_text, app_definitions)
     params = sortParameters(params)
     return params
 
 
 def convertParameterSetsToApplication(templatePath, paramsetDefinitionComment, applicationsParamSets, paramsetName,
-                                      parametersTag, isEnvSpecificParamset, env_specific_params_map, header_text=""):
-    application_schema = "schemas/application.schema.json"
+                                      parametersTag, isEnvSpecificParamset, env_specific_params_map, header_text="",
+                                      app_definitions=None):
+    # without app_definitions accumulated by the caller, application files are written right away
+    flush = app_definitions is None
+    if flush:
+        app_definitions = {}
     for appParams in applicationsParamSets:
         appName = appParams["appName"] if "appName" in appParams else appParams["name"]
         applicationParametersFile = os.path.dirname(templatePath) + "/Applications/" + appName + ".yml"
-        appDefinition = getApplicationParametersYaml(appName, applicationParametersFile)
+        if applicationParametersFile not in app_definitions:
+            app_definitions[applicationParametersFile] = getApplicationParametersYaml(appName,
+                                                                                      applicationParametersFile)
+        appDefinition = app_definitions[applicationParametersFile]
         for j in appParams["parameters"]:
             # get value with potential merge of dicts
             val = get_merged_param_value(j, appDefinition[parametersTag], appParams["parameters"])
             store_value_to_yaml(appDefinition[parametersTag], j, val, paramsetDefinitionComment)
             if isEnvSpecificParamset:
                 storeToEnvSpecificParametersMap(env_specific_params_map, appName, parametersTag, j, val, paramsetName)
-        writeYamlToFile(applicationParametersFile, appDefinition)
-        beautifyYaml(applicationParametersFile, application_schema, header_text, wrap_all_strings=False)
+    if flush:
+        flushApplications(app_definitions, header_text)
     return
 
 
+def flushApplications(app_definitions, header_text=""):
+    for applicationParametersFile, appDefinition in app_definitions.items():
+        beautifyYaml(applicationParametersFile, APPLICATION_SCHEMA, header_text, wrap_all_strings=False,
+                     yaml_data=appDefinition)
+    app_definitions.clear()
+
+
 def initParametersStructure(map, key, is_app=False):
     if key not in map:
         map[key] = {}
@@ -383,19 +464,23 @@ def processTemplate(templatePath, templateName, env_instances_dir, schema_path,
                     resource_profiles_map=None, header_text="", process_env_specific=True):
     logger.info(f"Processing template: {templateName} in {templatePath}")
     templateContent = openYaml(templatePath)
+    # application parameters of all paramsets are merged in memory and each application file is written once
+    app_definitions = {}
     if process_env_specific:
         updateEnvSpecificParamsets(env_instances_dir, templateName, templateContent, paramset_map)
     # process deployParameters
     templateContent["deployParameters"] = convertParameterSetsToParameters(templatePath, templateContent,
                                                                            "deployParameterSets", "deployParameters",
                                                                            paramset_map, env_specific_params_map,
-                                                                           header_text, env_instances_dir)
+                                                                           header_text, env_instances_dir,
+                                                                           app_definitions)
     templateContent["deployParameterSets"] = []
     # process e2eParameters
     templateContent["e2eParameters"] = convertParameterSetsToParameters(templatePath, templateContent,
                                                                         "e2eParameterSets", "e2eParameters",
                                                                         paramset_map, env_specific_params_map,
-                                                                        header_text, env_instances_dir)
+                                                                        header_text, env_instances_dir,
+                                                                        app_definitions)
     templateContent["e2eParameterSets"] = []
     # process technicalConfigurationParameters
     templateContent["technicalConfigurationParameters"] = convertParameterSetsToParameters(templatePath,
@@ -405,15 +490,16 @@ def processTemplate(templatePath, templateName, env_instances_dir, schema_path,
                                                                                            paramset_map,
                                                                                            env_specific_params_map,
                                                                                            header_text,
-                                                                                           env_instances_dir)
+                                                                                           env_instances_dir,
+                                                                                           app_definitions)
     templateContent["technicalConfigurationParameterSets"] = []
     # preparing map for needed resource profiles
     if "profile" in templateContent and templateContent["profile"] and "name" in templateContent["profile"] and \
             templateContent["profile"]["name"]:
         rpName = templateContent["profile"]["name"]
         resource_profiles_map[templateName] = rpName
-    writeYamlToFile(templatePath, templateContent)
-    beautifyYaml(templatePath, schema_path, header_text)
+    beautifyYaml(templatePath, schema_path, header_text, yaml_data=templateContent)
+    flushApplications(app_definitions, header_text)
     return
 
 
@@ -463,8 +549,8 @@ def getTemplateNameFromNamespacePath(namespacePath):
 
 
 def build_env(env_name, env_instances_dir, parameters_dir, env_template_dir, resource_profiles_dir,
-              env_specific_resource_profile_map, all_instances_dir, render_context):
-    paramset_map = createParamsetsMap(parameters_dir)
+              env_specific_resource_profile_map, all_instances_dir, render_context, build_manifest=None):
+    paramset_map = ParamsetIndex(createParamsetsMap(parameters_dir))
     env_dir = env_template_dir + "/" + env_name
     logger.info(f"Env name: {env_name}")
     logger.info(f"Env dir: {env_dir}")
@@ -522,6 +608,12 @@ def build_env(env_name, env_instances_dir, parameters_dir, env_template_dir, res
         process_env_specific=True)
 
     # process namespaces
+    if build_manifest:
+        build_manifest.set_common_inputs(parameters_dir, env_dir, [
+            getEnvDefinitionPath(env_dir),
+            find_cloud_passport_definition(env_instances_dir, all_instances_dir),
+            namespace_schema,
+            APPLICATION_SCHEMA])
     template_namespace_names = []
     # iterate through namespace definitions and create namespace parameters
     for templatePath in namespaceTemplates:
@@ -529,6 +621,14 @@ def build_env(env_name, env_instances_dir, parameters_dir, env_template_dir, res
         templateName = getTemplateNameFromNamespacePath(templatePath)
         template_namespace_names.append(templateName)
         initParametersStructure(env_specific_parameters_map["namespaces"], templateName)
+        if build_manifest:
+            fingerprint = build_manifest.get_namespace_fingerprint(templatePath, templateName, paramset_map)
+            if build_manifest.restore_namespace(templatePath, templateName, fingerprint,
+                                                env_specific_parameters_map["namespaces"],
+                                                needed_resource_profiles_map):
+                # env specific paramsets are marked in paramset_map for all following templates
+                updateEnvSpecificParamsets(env_instances_dir, templateName, openYaml(templatePath), paramset_map)
+                continue
         processTemplate(
             templatePath,
             templateName,
@@ -538,6 +638,10 @@ def build_env(env_name, env_instances_dir, parameters_dir, env_template_dir, res
             env_specific_parameters_map["namespaces"][templateName],
             resource_profiles_map=needed_resource_profiles_map,
             header_text=generated_header_text)
+        if build_manifest:
+            build_manifest.record_namespace(templatePath, fingerprint,
+                                            env_specific_parameters_map["namespaces"][templateName],
+                                            needed_resource_profiles_map.get(templateName))
 
     logger.info(f"EnvSpecific parameters are: \n{dump_as_yaml_format(env_specific_parameters_map)}")
     checkEnvSpecificParametersBySchema(env_dir, env_specific_parameters_map, template_namespace_names)
@@ -0,0 +1,133 @@
+import hashlib
+import shutil
+
+from envgenehelper import *
+
+# manifests are kept outside of the generated environments, which are committed,
+# the dir has to be preserved between builds (e.g. by a CI cache) for incremental builds
+BUILD_MANIFEST_DIR = os.getenv("ENV_BUILD_MANIFEST_DIR", "")
+# bump when generation logic changes, so that namespaces generated by the previous version are rebuilt
+BUILD_MANIFEST_VERSION = 1
+PARAMSET_TAGS = {
+    "deployParameterSets": "envSpecificParamsets",
+    "e2eParameterSets": "envSpecificE2EParamsets",
+    "technicalConfigurationParameterSets": "envSpecificTechnicalParamsets",
+}
+
+
+def get_build_manifest_path(cluster_name, env_name):
+    manifest_dir = BUILD_MANIFEST_DIR or f"{getenv_with_error('CI_PROJECT_DIR')}/tmp/build_manifests"
+    return os.path.join(manifest_dir, cluster_name, f"{env_name}.yml")
+
+
+def hash_file(file_path, digest=None):
+    digest = digest or hashlib.sha256()
+    if not file_path or not os.path.isfile(file_path):
+        digest.update(b"\0absent\0")
+        return digest
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest
+
+
+def hash_dir(dir_path, digest=None):
+    digest = digest or hashlib.sha256()
+    for root, dirs, files in os.walk(dir_path):
+        dirs.sort()
+        for file_name in sorted(files):
+            file_path = os.path.join(root, file_name)
+            digest.update(os.path.relpath(file_path, dir_path).encode() + b"\0")
+            hash_file(file_path, digest)
+    return digest
+
+
+class BuildManifest:
+    """
+    Input fingerprints of namespaces generated by the previous build of an environment.
+
+    The manifest is stored in ENV_BUILD_MANIFEST_DIR, see get_build_manifest_path. A namespace whose inputs (rendered template dir,
+    referenced paramsets, env definition, cloud passport and schemas) have the same fingerprint as in the previous
+    build, and whose previous output was not changed since, is taken from the previous build instead of being
+    generated again.
+    """
+
+    def __init__(self, manifest_path, resulting_env_dir, previous_build_dir):
+        self.previous_build_dir = previous_build_dir
+        self.manifest_path = manifest_path
+        self.previous_namespaces = {}
+        self.namespaces = {}
+        self.parameters_dir = None
+        self.env_dir = None
+        self.common_digest = None
+        # previous output is removed before rendering, so it is saved aside first
+        delete_dir(previous_build_dir)
+        previous_namespaces_dir = os.path.join(resulting_env_dir, "Namespaces")
+        if not check_file_exists(self.manifest_path) or not check_dir_exists(previous_namespaces_dir):
+            logger.info(f"No previous build manifest {self.manifest_path} or output in {resulting_env_dir} found, "
+                        f"all namespaces will be generated")
+            return
+        previous = openYaml(self.manifest_path)
+        if previous.get("version") != BUILD_MANIFEST_VERSION:
+            logger.info(f"Build manifest {self.manifest_path} has another version, all namespaces will be generated")
+            return
+        self.previous_namespaces = previous.get("namespaces", {})
+        shutil.copytree(previous_namespaces_dir, os.path.join(previous_build_dir, "Namespaces"))
+
+    def set_common_inputs(self, parameters_dir, env_dir, input_files):
+        self.parameters_dir = parameters_dir
+        self.env_dir = env_dir
+        self.common_digest = hashlib.sha256(str(BUILD_MANIFEST_VERSION).encode())
+        for file_path in input_files:
+            hash_file(file_path, self.common_digest)
+
+    def get_namespace_fingerprint(self, template_path, template_name, paramset_map):
+        template_content = openYaml(template_path, safe_load=True)
+        env_template = getEnvDefinition(self.env_dir).get("envTemplate", {})
+        digest = self.common_digest.copy()
+        hash_dir(os.path.dirname(template_path), digest)
+        for paramsets_tag, env_specific_tag in PARAMSET_TAGS.items():
+            paramset_names = list(template_content.get(paramsets_tag) or [])
+            paramset_names += (env_template.get(env_specific_tag) or {}).get(template_name) or []
+            for name in paramset_names:
+                digest.update(f"\0{paramsets_tag}:{name}\0".encode())
+                for entry in paramset_map.get(name, []):
+                    digest.update(os.path.relpath(entry["filePath"], self.parameters_dir).encode() + b"\0")
+                    hash_file(entry["filePath"], digest)
+        return digest.hexdigest()
+
+    def restore_namespace(self, template_path, template_name, fingerprint, env_specific_params_map,
+                          resource_profiles_map):
+        namespace_dir = os.path.dirname(template_path)
+        key = os.path.relpath(namespace_dir, self.env_dir)
+        previous = self.previous_namespaces.get(key)
+        if not previous or previous["fingerprint"] != fingerprint:
+            return False
+        previous_namespace_dir = os.path.join(self.previous_build_dir, key)
+        if not check_dir_exists(previous_namespace_dir) or \
+                hash_dir(previous_namespace_dir).hexdigest() != previous["output"]:
+            logger.info(f"Previously generated {key} was changed after generation, it will be generated again")
+            return False
+        logger.info(f"Inputs of {key} did not change since previous build, reusing generated content")
+        delete_dir(namespace_dir)
+        shutil.copytree(previous_namespace_dir, namespace_dir)
+        env_specific_params_map[template_name] = previous["envSpecificParameters"]
+        if previous.get("resourceProfile"):
+            resource_profiles_map[template_name] = previous["resourceProfile"]
+        self.namespaces[key] = previous
+        return True
+
+    def record_namespace(self, template_path, fingerprint, env_specific_params, resource_profile=None):
+        namespace_dir = os.path.dirname(template_path)
+        entry = {
+            "fingerprint": fingerprint,
+            "output": hash_dir(namespace_dir).hexdigest(),
+            "envSpecificParameters": env_specific_params,
+        }
+        if resource_profile:
+            entry["resourceProfile"] = resource_profile
+        self.namespaces[os.path.relpath(namespace_dir, self.env_dir)] = entry
+
+    def save(self):
+        logger.info(f"Saving build manifest to {self.manifest_path}")
+        writeYamlToFile(self.manifest_path, {"version": BUILD_MANIFEST_VERSION, "namespaces": self.namespaces})
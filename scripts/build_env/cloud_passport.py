@@ -82,8 +82,7 @@ def process_cloud_definition(cloudPassportYaml, env_dir, comment) :
     logger.debug(f"Rest of params from cloud passport are: \n{dump_as_yaml_format(cloudPassportYaml)}")
     mergeDeployParametersFromPassport(cloudPassportYaml, cloudYaml, comment)
     # storing cloud yaml
-    writeYamlToFile(cloudYamlPath, cloudYaml)
-    beautifyYaml(cloudYamlPath, cloud_schema)
+    beautifyYaml(cloudYamlPath, cloud_schema, yaml_data=cloudYaml)
 
 def add_cloud_passport_creds(cloud_passport_name, cloud_passport_file_path, env_dir, comment):
     logger.info(f"Searching credentials for cloud passport {cloud_passport_file_path}")
@@ -93,25 +92,24 @@ def add_cloud_passport_creds(cloud_passport_name, cloud_passport_file_path, env_
     # then searching in the same folder with name pattern "{cloud_passport_name}-creds.yml"
     passportSameFolderPath = f'{getDirName(cloud_passport_file_path)}/{cloud_passport_name}-creds.yml'
     if os.path.exists(passportSubfolderPath):
-        passportCredsYaml = openYaml(passportSubfolderPath)
+        passportCredsYaml = read_cred_file(passportSubfolderPath)
         logger.info(f"Adding cloud passport credentials from {passportSubfolderPath}")
     elif os.path.exists(passportSameFolderPath):
-        passportCredsYaml = openYaml(passportSameFolderPath)
-        beautifyYaml(passportSameFolderPath, credsSchema)
+        passportCredsYaml = read_cred_file(passportSameFolderPath)
+        beautifyYaml(passportSameFolderPath, credsSchema, yaml_data=passportCredsYaml)
         logger.info(f"Adding cloud passport credentials from {passportSameFolderPath}")
     else:
         logger.error(f"No cloud pasport credentials files found in either {passportSubfolderPath} or {passportSameFolderPath}.")
         raise ReferenceError(f"No cloud pasport credentials files found. See logs above")
     envCredentialsPath = f"{env_dir}/Credentials/credentials.yml"
     if os.path.exists(envCredentialsPath) :
-        envCredsYaml = openYaml(envCredentialsPath)
+        envCredsYaml = read_cred_file(envCredentialsPath)
     else:
         envCredsYaml = yaml.load("{}")
     for key, value in passportCredsYaml.items() :
         store_value_to_yaml(envCredsYaml, key, value, comment)
     # storing credentials yaml
-    writeYamlToFile(envCredentialsPath, envCredsYaml)
-    beautifyYaml(envCredentialsPath, credsSchema)
+    beautifyYaml(envCredentialsPath, credsSchema, yaml_data=envCredsYaml)
 
 def update_env_definition_with_cloud_name(render_env_dir, source_env_dir, all_instances_dir):
     inventoryYaml = getEnvDefinition(render_env_dir)
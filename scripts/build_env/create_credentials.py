@@ -117,7 +117,7 @@ def getCredDefinitionYaml(yamlPath):
     result = yaml.load("{}")
     os.makedirs(os.path.dirname(yamlPath), exist_ok=True)
     if os.path.exists(yamlPath):
-        result = openYaml(yamlPath)
+        result = read_cred_file(yamlPath)
     return result
 
 def writeCredToYaml(credItem, credsYaml) :
@@ -174,13 +174,13 @@ def findSharedCredentials(cred_name, env_dir, instances_dir):
 
 def mergeSharedCreds(credYamlPath, envDir, instancesDir) :
     inventoryYaml = getEnvDefinition(envDir)
-    credsYaml = openYaml(credYamlPath)
+    credsYaml = read_cred_file(credYamlPath)
     if ("sharedMasterCredentialFiles" in inventoryYaml["envTemplate"]) :
         sharedDictFileNames = inventoryYaml["envTemplate"]["sharedMasterCredentialFiles"]
         logger.info(f"Inventory shared master creds list: \n{dump_as_yaml_format(sharedDictFileNames)}")
         for credFileName in inventoryYaml["envTemplate"]["sharedMasterCredentialFiles"] :
             credFilePath = findSharedCredentials(credFileName, envDir, instancesDir)
-            credYaml = openYaml(credFilePath)
+            credYaml = read_cred_file(credFilePath)
             count = 0
             for key in credYaml :
                 store_value_to_yaml(credsYaml, key, credYaml[key], f"shared credentials: {credFileName}")
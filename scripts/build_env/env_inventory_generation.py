@@ -214,8 +214,7 @@ def handle_env_def(env_dir: Path, env_def: dict | None):
         if env_template_version:
             logger.info(f"Overriding envTemplate.artifact with ENV_TEMPLATE_VERSION={env_template_version}")
             content["envTemplate"]["artifact"] = env_template_version
-        writeYamlToFile(env_def_path, content)
-        beautifyYaml(env_def_path)
+        beautifyYaml(env_def_path, yaml_data=content)
         logger.info("env_definition.yml successfully created/updated")
 
 
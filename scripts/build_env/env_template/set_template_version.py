@@ -1,7 +1,7 @@
 from os import getenv
 from pathlib import Path
 
-from envgenehelper import beautifyYaml, writeYamlToFile, logger, getenv_with_error, getEnvDefinitionPath
+from envgenehelper import beautifyYaml, logger, getenv_with_error, getEnvDefinitionPath
 from envgenehelper import getEnvDefinition
 
 from envgenehelper.models import TemplateVersionUpdateMode
@@ -34,8 +34,7 @@ def update_version(env_definition_dir, version_to_add, update_mode: TemplateVers
         else:
             logger.error(f"Bad env_definition structure in file {env_definition_path}.")
             raise ReferenceError(f"Can't update version in {env_definition_path}. See logs above.")
-    writeYamlToFile(env_definition_path, data)
-    beautifyYaml(env_definition_path)
+    beautifyYaml(env_definition_path, yaml_data=data)
 
 
 if __name__ == "__main__":
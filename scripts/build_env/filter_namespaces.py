@@ -28,12 +28,14 @@ def filter_namespaces(namespaces: list[str], filter: str, bgd_object: dict) -> l
         filtered_namespaces = [ns for ns in namespaces if ns in resolved_filter]
     return filtered_namespaces
 
-def apply_ns_build_filter():
+def apply_ns_build_filter(initial_namespaces_dir=None):
     filter = getenv_and_log('NS_BUILD_FILTER', default='')
     logger.info(f"Filtering namespaces with NS_BUILD_FILTER: {filter}")
-    base_dir = getenv_with_error("CI_PROJECT_DIR")
+    if not initial_namespaces_dir:
+        base_dir = getenv_with_error("CI_PROJECT_DIR")
+        initial_namespaces_dir = f'{base_dir}/build_env/tmp/initial_namespaces_content'
 
-    source_namespaces = get_namespaces(Path(f'{base_dir}/build_env/tmp/initial_namespaces_content'))
+    source_namespaces = get_namespaces(Path(initial_namespaces_dir))
     namespaces = get_namespaces()
     namespace_names = [ns.name for ns in namespaces]
     logger.info(f'Namespaces found:\n {namespace_list_to_str(namespaces)}')
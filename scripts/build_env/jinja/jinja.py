@@ -1,7 +1,16 @@
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from os import getenv
 from urllib.parse import urlsplit
 
 from envgenehelper import dumpYamlToStr
-from jinja2 import Environment, FileSystemLoader, ChainableUndefined, BaseLoader
+from jinja2 import Environment, FileSystemLoader, ChainableUndefined, BaseLoader, FileSystemBytecodeCache, Template, \
+    TemplateNotFound
+
+JINJA_CACHE_SIZE = int(getenv("ENVGENE_JINJA_CACHE_SIZE", 2000))
+# compiled templates are also stored there, so that next runs do not compile them again
+JINJA_BYTECODE_CACHE_DIR = getenv("ENVGENE_JINJA_BYTECODE_CACHE_DIR", "")
 
 
 def create_jinja_env(templates_dir: str = "") -> Environment:
@@ -23,6 +32,60 @@ def create_jinja_env(templates_dir: str = "") -> Environment:
     return env
 
 
+class SourceHashLoader(BaseLoader):
+    """
+    Loads templates registered from strings by the hash of their content. Only the max_size most recently
+    registered sources are kept, as many as compiled templates in the environment cache
+    """
+
+    def __init__(self, max_size: int = JINJA_CACHE_SIZE):
+        self.max_size = max_size
+        self.sources = OrderedDict()
+
+    def add_source(self, source: str) -> str:
+        name = hashlib.sha256(source.encode()).hexdigest()
+        if name in self.sources:
+            self.sources.move_to_end(name)
+        else:
+            self.sources[name] = source
+            if len(self.sources) > self.max_size:
+                self.sources.popitem(last=False)
+        return name
+
+    def get_source(self, environment, template):
+        if template not in self.sources:
+            raise TemplateNotFound(template)
+        return self.sources[template], None, lambda: True
+
+
+@lru_cache(maxsize=None)
+def get_cached_jinja_env(templates_dir: str = "", plain: bool = False) -> Environment:
+    """
+    Environment shared by all renders in the process. Each template is compiled once and kept in the environment
+    cache. String templates which are rendered repeatedly go through SourceHashLoader, see get_template_from_string,
+    one-off strings are compiled with env.from_string.
+    plain=True gives the default jinja settings, the same as used by jinja2.Template(source).
+    """
+    loader = FileSystemLoader(templates_dir) if templates_dir else SourceHashLoader()
+    bytecode_cache = FileSystemBytecodeCache(JINJA_BYTECODE_CACHE_DIR) if JINJA_BYTECODE_CACHE_DIR else None
+    if plain:
+        return Environment(loader=loader, cache_size=JINJA_CACHE_SIZE, bytecode_cache=bytecode_cache)
+    env = Environment(
+        loader=loader,
+        undefined=ChainableUndefined,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        cache_size=JINJA_CACHE_SIZE,
+        bytecode_cache=bytecode_cache,
+    )
+    JinjaFilters.register(env)
+    return env
+
+
+def get_template_from_string(env: Environment, source: str) -> Template:
+    return env.get_template(env.loader.add_source(source))
+
+
 def urlsplit_filter(value, part=None):
     if not isinstance(value, str): return ""
     try:
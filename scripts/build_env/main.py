@@ -1,7 +1,11 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+
 from envgenehelper import *
 from envgenehelper.deployer import *
 
 from build_env import build_env, process_additional_template_parameters
+from build_manifest import BuildManifest, get_build_manifest_path
 from cloud_passport import update_env_definition_with_cloud_name
 from create_credentials import create_credentials
 from render_config_env import EnvGenerator
@@ -15,6 +19,7 @@
 CLOUD_SCHEMA = "schemas/cloud.schema.json"
 NAMESPACE_SCHEMA = "schemas/namespace.schema.json"
 ENV_SPECIFIC_RESOURCE_PROFILE_SCHEMA = "schemas/resource-profile.schema.json"
+ENV_BUILDS_SCRATCH_DIR_NAME = "env_builds"
 
 
 def prepare_folders_for_rendering(env_name, cluster_name, source_env_dir, templates_dir, render_dir,
@@ -84,28 +89,42 @@ def handle_template_override(render_dir):
         yaml_to_override = openYaml(template_path)
         src = openYaml(file)
         merge_yaml_into_target(yaml_to_override, '', src)
-        writeYamlToFile(template_path, yaml_to_override)
         template_path_stem = Path(template_path).stem
         schema_path = ""
         if template_path_stem == 'cloud':
             schema_path = CLOUD_SCHEMA
         if template_path_stem == 'namespace':
             schema_path = NAMESPACE_SCHEMA
-        beautifyYaml(template_path, schema_path)
+        beautifyYaml(template_path, schema_path, yaml_data=yaml_to_override)
         deleteFile(file)
 
 
-def build_environment(env_name, cluster_name, templates_dir, source_env_dir, all_instances_dir, output_dir, work_dir):
+def get_initial_namespaces_dir(work_dir, scratch_dir=None):
+    if scratch_dir:
+        return os.path.join(scratch_dir, 'initial_namespaces_content')
+    return os.path.join(work_dir, 'build_env', 'tmp', 'initial_namespaces_content')
+
+
+def build_environment(env_name, cluster_name, templates_dir, source_env_dir, all_instances_dir, output_dir, work_dir,
+                      scratch_dir=None):
     # defining folders that will be used during generation
-    base_dir = getenv_with_error('CI_PROJECT_DIR')
-    render_dir = f"{base_dir}/tmp/render"
-    render_parameters_dir = f"{base_dir}/tmp/parameters_templates"
-    render_profiles_dir = f"{base_dir}/tmp/resource_profiles"
+    # scratch_dir isolates them per environment, so several environments can be built at once
+    tmp_dir = scratch_dir or f"{getenv_with_error('CI_PROJECT_DIR')}/tmp"
+    render_dir = f"{tmp_dir}/render"
+    render_parameters_dir = f"{tmp_dir}/parameters_templates"
+    render_profiles_dir = f"{tmp_dir}/resource_profiles"
 
     namespaces_path = get_namespaces_path()
     if check_dir_exists(str(namespaces_path.absolute())):
         logger.info("Namespaces found, saving them into tmp location")
-        shutil.copytree(get_namespaces_path(), os.path.join(work_dir,'build_env','tmp','initial_namespaces_content','Namespaces'), dirs_exist_ok=True)
+        initial_namespaces_dir = get_initial_namespaces_dir(work_dir, scratch_dir)
+        shutil.copytree(get_namespaces_path(), os.path.join(initial_namespaces_dir, 'Namespaces'), dirs_exist_ok=True)
+
+    # ENV_BUILD_INCREMENTAL reuses namespaces whose inputs did not change since the previous build
+    build_manifest = None
+    if os.getenv("ENV_BUILD_INCREMENTAL") == 'true':
+        build_manifest = BuildManifest(get_build_manifest_path(cluster_name, env_name),
+                                       Path(output_dir) / cluster_name / env_name, f"{tmp_dir}/previous_build")
 
     # preparing folders for generation
     render_env_dir = prepare_folders_for_rendering(env_name, cluster_name, source_env_dir, templates_dir, render_dir,
@@ -174,9 +193,11 @@ def build_environment(env_name, cluster_name, templates_dir, source_env_dir, all
     env_specific_resource_profile_map = get_env_specific_resource_profiles(source_env_dir, all_instances_dir,
                                                                            ENV_SPECIFIC_RESOURCE_PROFILE_SCHEMA)
     build_env(env_name, source_env_dir, render_parameters_dir, render_dir, render_profiles_dir,
-              env_specific_resource_profile_map, all_instances_dir, render_context)
+              env_specific_resource_profile_map, all_instances_dir, render_context, build_manifest)
     resulting_dir = post_process_env_after_rendering(env_name, render_env_dir, source_env_dir, all_instances_dir,
                                                      output_dir)
+    if build_manifest:
+        build_manifest.save()
 
     return resulting_dir
 
@@ -186,7 +207,7 @@ def get_duplicate_names(param_files):
     return set([x for x in file_names if file_names.count(x) > 1])
 
 
-def validate_parameters(templates_dir, all_instances_dir, cluster_name=None, env_name=None):
+def validate_shared_parameters(templates_dir, all_instances_dir):
     errors = []
     logger.info(f'Validate {templates_dir}/parameters dir')
     param_files = findAllYamlsInDir(f'{templates_dir}/parameters')
@@ -202,6 +223,13 @@ def validate_parameters(templates_dir, all_instances_dir, cluster_name=None, env
     param_files = findAllYamlsInDir(f'{all_instances_dir}/parameters')
     # all_param_files = param_files
     errors = errors + validate_parameter_files(param_files)
+    return errors
+
+
+def validate_parameters(templates_dir, all_instances_dir, cluster_name=None, env_name=None, validate_shared=True):
+    errors = []
+    if validate_shared:
+        errors = errors + validate_shared_parameters(templates_dir, all_instances_dir)
 
     # Only validate the specific cluster if provided
     if cluster_name:
@@ -263,7 +291,8 @@ def validate_parameter_files(param_files):
     return errors
 
 
-def render_environment(env_name, cluster_name, templates_dir, all_instances_dir, output_dir, work_dir):
+def render_environment(env_name, cluster_name, templates_dir, all_instances_dir, output_dir, work_dir,
+                       scratch_dir=None, validate_shared=True):
     logger.info(f'env: {env_name}')
     logger.info(f'cluster_name: {cluster_name}')
     logger.info(f'templates_dir: {templates_dir}')
@@ -274,25 +303,86 @@ def render_environment(env_name, cluster_name, templates_dir, all_instances_dir,
     check_environment_is_valid_or_fail(env_name, cluster_name, all_instances_dir,
                                        validate_env_definition_by_schema=True)
     # searching for env directory in instances
-    validate_parameters(templates_dir, all_instances_dir, cluster_name, env_name)
+    validate_parameters(templates_dir, all_instances_dir, cluster_name, env_name, validate_shared)
     env_dir = get_env_instances_dir(env_name, cluster_name, all_instances_dir)
     logger.info(f"Environment {env_name} directory is {env_dir}")
 
     resulting_env_dir = build_environment(env_name, cluster_name, templates_dir, env_dir, all_instances_dir, 
-                                          output_dir, work_dir)
+                                          output_dir, work_dir, scratch_dir)
     create_credentials(resulting_env_dir, env_dir, all_instances_dir)
-    apply_ns_build_filter()
+    apply_ns_build_filter(get_initial_namespaces_dir(work_dir, scratch_dir) if scratch_dir else None)
+
+
+def _render_environment_in_worker(full_env_name, templates_dir, all_instances_dir, output_dir, work_dir, scratch_root):
+    # each worker is a separate process, so per-environment variables do not leak between builds
+    os.environ['FULL_ENV_NAME'] = full_env_name
+    cluster_name, env_name = full_env_name.split("/")
+    render_environment(env_name, cluster_name, templates_dir, all_instances_dir, output_dir, work_dir,
+                       scratch_dir=f"{scratch_root}/{full_env_name}", validate_shared=False)
+    return full_env_name
+
+
+def render_environments(full_env_names, templates_dir, all_instances_dir, output_dir, work_dir, max_workers=None,
+                        scratch_root=None):
+    """Builds several <cluster>/<env> environments concurrently, each in its own process and scratch dir.
+
+    Shared parameters are validated and parsed once in the parent process. Workers copy them into their scratch
+    dirs as before, with the fork start method they inherit the yaml document cache, which is keyed by content,
+    so their copies are read from documents parsed by the parent. Templates and instances dirs are only read by
+    the workers.
+    """
+    full_env_names = [name.strip() for name in full_env_names]
+    scratch_root = scratch_root or f"{getenv_with_error('CI_PROJECT_DIR')}/tmp/{ENV_BUILDS_SCRATCH_DIR_NAME}"
+    errors = validate_shared_parameters(templates_dir, all_instances_dir)
+    if len(errors) > 0:
+        raise ReferenceError("\n" + "\n".join(errors))
+
+    mp_context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    failed = {}
+    logger.info(f"Building {len(full_env_names)} environments with {max_workers or os.cpu_count()} workers")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+        futures = {
+            executor.submit(_render_environment_in_worker, full_env_name, templates_dir, all_instances_dir,
+                            output_dir, work_dir, scratch_root): full_env_name
+            for full_env_name in full_env_names
+        }
+        for future in as_completed(futures):
+            full_env_name = futures[future]
+            try:
+                future.result()
+                logger.info(f"Environment {full_env_name} was built successfully")
+            except Exception as e:
+                logger.error(f"Failed to build environment {full_env_name}: {e}")
+                failed[full_env_name] = e
+    if failed:
+        raise RuntimeError(f"Failed to build environments: {', '.join(sorted(failed))}")
 
 
 if __name__ == "__main__":
     base_dir = getenv_with_error('CI_PROJECT_DIR')
-    cluster = getenv_with_error("CLUSTER_NAME")
-    environment = getenv_with_error("ENVIRONMENT_NAME")
     g_templates_dir = f"{base_dir}/tmp/templates"
     g_all_instances_dir = f"{base_dir}/environments"
     g_output_dir = f"{base_dir}/environments"
     g_work_dir = get_parent_dir_for_dir(g_all_instances_dir)
-    
-    decrypt_all_cred_files_for_env()
-    render_environment(environment, cluster, g_templates_dir, g_all_instances_dir, g_output_dir, g_work_dir)
-    encrypt_all_cred_files_for_env()
+    # ENV_BUILD_WORKERS > 0 builds every environment from ENV_NAMES in one run, that many at a time
+    env_build_workers = int(getenv_and_log('ENV_BUILD_WORKERS', default='0'))
+    # ENVGENE_SECRETS_VIEW=true keeps cred files encrypted and decrypts them in memory, only for readers using
+    # read_cred_file, by default they are decrypted on disk for the build
+    use_secrets_view = getenv_and_log('ENVGENE_SECRETS_VIEW', default='false').lower() == 'true'
+
+    if use_secrets_view:
+        open_secrets_view()
+    else:
+        decrypt_all_cred_files_for_env()
+    if env_build_workers > 0:
+        env_names = split_multi_value_param(getenv_with_error("ENV_NAMES"))
+        render_environments(env_names, g_templates_dir, g_all_instances_dir, g_output_dir, g_work_dir,
+                            env_build_workers)
+    else:
+        cluster = getenv_with_error("CLUSTER_NAME")
+        environment = getenv_with_error("ENVIRONMENT_NAME")
+        render_environment(environment, cluster, g_templates_dir, g_all_instances_dir, g_output_dir, g_work_dir)
+    if use_secrets_view:
+        close_secrets_view()
+    else:
+        encrypt_all_cred_files_for_env()
@@ -1,4 +1,3 @@
-import asyncio
 import json
 import os
 from enum import Enum
@@ -243,7 +242,7 @@ def extract_sds_from_json(env, base_sd_path: Path, sd_data, effective_merge_mode
     if effective_merge_mode == MergeType.REPLACE:
         logger.info("Inside replace")
         if helper.check_file_exists(sd_path):
-            full_sd_yaml = helper.openYaml(sd_path)
+            full_sd_yaml = helper.openYaml(sd_path, safe_load=True)
             logger.info(f"full_sd.yaml before replacement: {json.dumps(full_sd_yaml, indent=2)}")
         else:
             logger.info("No existing SD found at destination. Proceeding to write new SD.")
@@ -278,7 +277,7 @@ def download_sds_with_version(env, base_sd_path, sd_version, effective_merge_mod
         exit(1)
 
     app_def_getter_plugins = PluginEngine(plugins_dir='/module/scripts/handle_sd_plugins/app_def_getter')
-    sd_data_list = []
+    appvers = []
     for entry in sd_entries:  # appvers
         if ":" not in entry:
             logger.error(f"Invalid SD_VERSION format: '{entry}'. Expected 'name:version'")
@@ -286,27 +285,31 @@ def download_sds_with_version(env, base_sd_path, sd_version, effective_merge_mod
 
         source_name, version = entry.split(":", 1)
         logger.info(f"Starting download of SD: {source_name}-{version}")
+        appvers.append((source_name, version))
 
-        sd_data = download_sd_by_appver(source_name, version, app_def_getter_plugins)
-
-        sd_data_list.append(sd_data)
+    sd_data_list = download_sds_by_appvers(appvers, app_def_getter_plugins)
 
     sd_data_json = json.dumps(sd_data_list)
     extract_sds_from_json(env, base_sd_path, sd_data_json, effective_merge_mode)
 
 
-def download_sd_by_appver(app_name: str, version: str, plugins: PluginEngine) -> dict[str, object]:
-    if 'SNAPSHOT' in version:
-        raise ValueError("SNAPSHOT is not supported version of Solution Descriptor artifacts")
-    # TODO: check if job would fail without plugins
-    app_def = get_appdef_for_app(f"{app_name}:{version}", app_name, plugins)
+def download_sds_by_appvers(appvers: list[tuple[str, str]], plugins: PluginEngine) -> list[dict[str, object]]:
+    """Resolves and downloads solution descriptors of all applications concurrently, in the order of appvers"""
+    apps_versions = []
+    for app_name, version in appvers:
+        if 'SNAPSHOT' in version:
+            raise ValueError("SNAPSHOT is not supported version of Solution Descriptor artifacts")
+        # TODO: check if job would fail without plugins
+        apps_versions.append((get_appdef_for_app(f"{app_name}:{version}", app_name, plugins), version))
 
-    artifact_info = asyncio.run(artifact.check_artifact_async(app_def, artifact.FileExtension.JSON, version))
-    if not artifact_info:
-        raise ValueError(
-            f'Solution descriptor content was not received for {app_name}:{version}')
-    sd_url, _ = artifact_info
-    return artifact.download_json_content(sd_url)
+    artifacts_info = artifact.download_many(apps_versions, artifact.FileExtension.JSON)
+    sd_data_list = []
+    for (app_name, version), artifact_info in zip(appvers, artifacts_info):
+        if not artifact_info:
+            raise ValueError(
+                f'Solution descriptor content was not received for {app_name}:{version}')
+        sd_data_list.append(helper.openJson(artifact_info.local_path))
+    return sd_data_list
 
 
 def get_appdef_for_app(appver: str, app_name: str, plugins: PluginEngine) -> artifact_models.Application:
@@ -315,9 +318,9 @@ def get_appdef_for_app(appver: str, app_name: str, plugins: PluginEngine) -> art
         if result is not None:
             return result
     app_def_path = identify_yaml_extension(f"{APP_DEFS_PATH}/{app_name}")
-    app_dict = helper.openYaml(app_def_path)
+    app_dict = helper.openYaml(app_def_path, safe_load=True)
     reg_def_path = identify_yaml_extension(f"{REG_DEFS_PATH}/{app_dict['registryName']}")
-    app_dict['registry'] = artifact_models.Registry.model_validate(helper.openYaml(reg_def_path))
+    app_dict['registry'] = artifact_models.Registry.model_validate(helper.openYaml(reg_def_path, safe_load=True))
     app_def = artifact_models.Application.model_validate(app_dict)
     return app_def
 
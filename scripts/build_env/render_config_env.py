@@ -1,19 +1,25 @@
+import multiprocessing
 from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
 from datetime import datetime
+from time import perf_counter
+from types import MappingProxyType
 from typing import Optional
 
 from deepmerge import always_merger
 from envgenehelper import *
 from envgenehelper.business_helper import get_bgd_object, get_namespaces
 from envgenehelper.validation import ensure_valid_fields, ensure_required_keys
-from jinja2 import Template, TemplateError
-from pydantic import BaseModel, Field
+from jinja2 import TemplateError
+from pydantic import BaseModel, Field, PrivateAttr
 
-from jinja.jinja import create_jinja_env
+from jinja.jinja import get_cached_jinja_env, get_template_from_string
 from jinja.replace_ansible_stuff import replace_ansible_stuff, escaping_quotation
 
 SCHEMAS_DIR = Path(__file__).resolve().parents[2] / "schemas"
+# number of processes rendering independent templates of one environment, 1 renders them one by one
+RENDER_WORKERS = int(os.getenv("ENVGENE_RENDER_WORKERS", 1))
 
 yml = create_yaml_processor()
 
@@ -48,10 +54,35 @@ class Context(BaseModel):
 
     start_time: datetime | None = Field(default=None, exclude=True)
 
+    # as_dict snapshots by include_none, patched per key when fields are assigned
+    _snapshots: dict = PrivateAttr(default_factory=dict)
+    _stats: dict = PrivateAttr(default_factory=lambda: {"as_dict": 0, "dumps": 0, "dump_time": 0.0,
+                                                          "patches": 0, "patch_time": 0.0})
+
     class Config:
         extra = "allow"
         validate_assignment = True
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self.changed(name)
+
+    def changed(self, *keys):
+        """Refreshes snapshot keys, must be called after fields are modified in place."""
+        if not self._snapshots:
+            return
+        start = perf_counter()
+        for include_none, snapshot in self._snapshots.items():
+            dump = self.model_dump(include=set(keys), exclude_none=not include_none)
+            for key in keys:
+                if key in dump:
+                    snapshot[key] = dump[key]
+                else:
+                    snapshot.pop(key, None)
+        self._stats["patches"] += 1
+        self._stats["patch_time"] += perf_counter() - start
+
     def update(self, data: dict | None = None, **kwargs):
         if data:
             for key, value in data.items():
@@ -68,20 +99,45 @@ def use(self):
             yield self
         finally:
             logger.debug(f"Final state: {self.dict(exclude_none=True)}")
+            stats = self._stats
+            logger.info(f"Context as_dict was called {stats['as_dict']} times, "
+                        f"{stats['dumps']} full dumps took {stats['dump_time']:.3f}s, "
+                        f"{stats['patches']} key patches took {stats['patch_time']:.3f}s")
+
+    def as_dict(self, include_none: bool = False) -> MappingProxyType:
+        """Read-only view of the context, the underlying snapshot is dumped once and then patched on changes."""
+        self._stats["as_dict"] += 1
+        if include_none not in self._snapshots:
+            start = perf_counter()
+            self._snapshots[include_none] = self.model_dump(exclude_none=not include_none)
+            self._stats["dumps"] += 1
+            self._stats["dump_time"] += perf_counter() - start
+        return MappingProxyType(self._snapshots[include_none])
+
+
+# generator whose frozen state is inherited by forked render workers
+_forked_generator = None
 
-    def as_dict(self, include_none: bool = False) -> dict:
-        return self.model_dump(exclude_none=not include_none)
+
+def _run_forked_render(task):
+    method_name, args = task
+    return getattr(_forked_generator, method_name)(*args)
 
 
 def render_obj_by_context(template: dict, context: Context) -> dict:
     template_str = replace_ansible_stuff(template_str=dumpYamlToStr(template))
-    rendered_str = create_jinja_env().from_string(template_str).render(context.as_dict())
+    # yaml dumps of objects are rendered once, so they are not registered in the cached environment
+    rendered_str = get_cached_jinja_env().from_string(template_str).render(context.as_dict())
     return yml.load(rendered_str)
 
 
 class EnvGenerator:
-    def __init__(self):
+    def __init__(self, render_workers: int | None = None):
         self.ctx = Context()
+        self.render_workers = render_workers or RENDER_WORKERS
+        # shared between generators, so every template is compiled once per process
+        self.jinja_env = get_cached_jinja_env()
+        self.path_jinja_env = get_cached_jinja_env(plain=True)
         logger.debug("EnvGenerator initialized with context: %s",
                      self.ctx.dict(exclude_none=True, exclude={"env_vars"}))
 
@@ -99,7 +155,7 @@ def set_cloud_passport(self):
 
     def generate_config(self):
         templates_dir = Path(__file__).parent / "templates"
-        template = create_jinja_env(str(templates_dir)).get_template("env_config.yml.j2")
+        template = get_cached_jinja_env(str(templates_dir)).get_template("env_config.yml.j2")
         config = readYaml(text=template.render(self.ctx.as_dict()), safe_load=True)
         logger.info(f"config = {config}")
         self.ctx.config = config
@@ -118,6 +174,7 @@ def setup_base_context(self, extra_env: dict):
         all_vars = dict(os.environ)
         self.ctx.update(extra_env)
         self.ctx.env_vars.update(all_vars)
+        self.ctx.changed("env_vars")
 
         self.set_inventory()
         self.set_cloud_passport()
@@ -202,7 +259,7 @@ def generate_solution_structure(self):
             namespaces = self.ctx.current_env_template.get("namespaces", [])
             postfix_template_map = {}
             for ns in namespaces:
-                namespace_template_path = Template(ns["template_path"]).render(self.ctx.as_dict())
+                namespace_template_path = self.render_path(ns["template_path"])
                 postfix = self.generate_ns_postfix(ns, namespace_template_path)
                 postfix_template_map[postfix] = namespace_template_path
 
@@ -228,25 +285,71 @@ def generate_solution_structure(self):
                 always_merger.merge(solution_structure, small_dict)
 
             always_merger.merge(self.ctx.current_env, {"solution_structure": solution_structure})
+            self.ctx.changed("current_env")
         logger.info(f"Rendered solution_structure: {solution_structure}")
 
+    def render_string(self, template: str, context: dict | None = None) -> str:
+        template = get_template_from_string(self.jinja_env, template)
+        return template.render(self.ctx.as_dict() if context is None else context)
+
+    def render_path(self, path_template, context: dict | None = None) -> str:
+        template = get_template_from_string(self.path_jinja_env, str(path_template))
+        return template.render(self.ctx.as_dict() if context is None else context)
+
     def render_from_file_to_file(self, src_template_path: str, target_file_path: str):
         template = openFileAsString(src_template_path)
         template = replace_ansible_stuff(template_str=template, template_path=src_template_path)
-        rendered = create_jinja_env().from_string(template).render(self.ctx.as_dict())
+        rendered = self.render_string(template)
         logger.debug(f"Rendered entity: \n{rendered}")
         writeYamlToFile(target_file_path, readYaml(escaping_quotation(rendered)))
 
+    def render_file_to_yaml_str(self, src_template_path, extra_context: dict | None = None,
+                                catch_template_errors: bool = False):
+        """
+        Renders a template file to the yaml text render_from_file_to_file would write, runs in render workers.
+        Returns (yaml text, error message), error message is set only for TemplateError with catch_template_errors.
+        """
+        template = openFileAsString(src_template_path)
+        template = replace_ansible_stuff(template_str=template, template_path=src_template_path)
+        context = {**self.ctx.as_dict(), **extra_context} if extra_context else None
+        try:
+            rendered = self.render_string(template, context)
+        except TemplateError as e:
+            if not catch_template_errors:
+                raise
+            return None, str(e)
+        return dump_yaml_for_file(readYaml(escaping_quotation(rendered))), None
+
+    def map_renders(self, method_name: str, tasks: list[tuple]) -> list:
+        """
+        Calls render method for every tuple of arguments and returns results in the order of tasks.
+        With render_workers > 1 methods are called in forked processes, that inherit the frozen context, so results
+        are the same as for serial run. Callers log and write results, so logs and errors keep the serial order.
+        """
+        method = getattr(self, method_name)
+        workers = min(self.render_workers, len(tasks))
+        if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+            return [method(*args) for args in tasks]
+        global _forked_generator
+        # snapshot is built before fork, so that workers do not dump the context each
+        self.ctx.as_dict()
+        _forked_generator = self
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as executor:
+                return list(executor.map(_run_forked_render, [(method_name, args) for args in tasks]))
+        finally:
+            _forked_generator = None
+
     def render_from_file_to_obj(self, src_template_path) -> dict:
         template = openFileAsString(src_template_path)
         template = replace_ansible_stuff(template_str=template, template_path=src_template_path)
-        rendered = create_jinja_env().from_string(template).render(self.ctx.as_dict())
+        rendered = self.render_string(template)
         logger.debug(f"Rendered entity: \n{rendered}")
         return readYaml(escaping_quotation(rendered))
 
     def render_from_obj_to_file(self, template, target_file_path):
         template = replace_ansible_stuff(template_str=dumpYamlToStr(template))
-        rendered = create_jinja_env().from_string(template).render(self.ctx.as_dict())
+        rendered = self.render_string(template)
         logger.debug(f"Rendered entity: \n{rendered}")
         writeYamlToFile(target_file_path, readYaml(escaping_quotation(rendered)))
 
@@ -254,7 +357,7 @@ def generate_tenant_file(self):
         logger.info(f"Generate Tenant yaml for {self.ctx.tenant}")
         tenant_file = f'{self.ctx.current_env_dir}/tenant.yml'
         tenant_tmpl_path = self.ctx.current_env_template["tenant"]
-        self.render_from_file_to_file(Template(tenant_tmpl_path).render(self.ctx.as_dict()), tenant_file)
+        self.render_from_file_to_file(self.render_path(tenant_tmpl_path), tenant_file)
 
     def generate_override_template(self, template_override, template_path: Path, name):
         if template_override:
@@ -271,13 +374,13 @@ def generate_cloud_file(self):
         if is_template_override:
             logger.info(f"Generate Cloud yaml for cloud {cloud} using cloud.template_path value")
             cloud_tmpl_path = cloud_template["template_path"]
-            self.render_from_file_to_file(Template(cloud_tmpl_path).render(context), cloud_file)
+            self.render_from_file_to_file(self.render_path(cloud_tmpl_path, context), cloud_file)
 
             template_override = cloud_template.get("template_override")
             self.generate_override_template(template_override, Path(f'{current_env_dir}/cloud.yml_override'), cloud)
         else:
             logger.info(f"Generate Cloud yaml for cloud {cloud}")
-            self.render_from_file_to_file(Template(cloud_template).render(context), cloud_file)
+            self.render_from_file_to_file(self.render_path(cloud_template, context), cloud_file)
 
     def generate_bgd_file(self):
         logger.info(f"Generate bg domain yaml for {self.ctx.bgd}")
@@ -286,12 +389,12 @@ def generate_bgd_file(self):
         if not template:
             logger.info("'bg_domain' key not found in template descriptor, skipping bg domain rendering")
             return
-        self.render_from_file_to_file(Template(template).render(self.ctx.as_dict()), target_path)
+        self.render_from_file_to_file(self.render_path(template), target_path)
 
     def fetch_template_override_name(self, ns) -> str:
         override_namespace_content = ns.get("template_override")
         if override_namespace_content:
-            rendered = create_jinja_env().from_string(str(override_namespace_content)).render(self.ctx.as_dict())
+            rendered = self.render_string(str(override_namespace_content))
             if rendered:
                 template_name = readYaml(rendered)
                 return template_name.get("name")
@@ -300,15 +403,18 @@ def fetch_template_override_name(self, ns) -> str:
     def generate_namespace_file(self):
         context = self.ctx.as_dict()
         namespaces = self.ctx.current_env_template["namespaces"]
-        for ns in namespaces:
-            ns_template_path = Template(ns["template_path"]).render(context)
-            override_template_ns_name = self.fetch_template_override_name(ns)
+        ns_template_paths = [self.render_path(ns["template_path"], context) for ns in namespaces]
+        rendered_namespaces = self.map_renders("render_file_to_yaml_str", [(path,) for path in ns_template_paths])
+        for ns, ns_template_path, (namespace_yaml, _) in zip(namespaces, ns_template_paths, rendered_namespaces):
+            # name of rendered namespace is used for postfix, so template is not rendered again for it
+            override_template_ns_name = self.fetch_template_override_name(ns) or readYaml(namespace_yaml).get("name")
             deploy_postfx = self.generate_ns_postfix(ns, ns_template_path, override_template_ns_name)
             logger.info(f"Generate Namespace yaml for {deploy_postfx}")
             current_env_dir = self.ctx.current_env_dir
             ns_dir = f'{current_env_dir}/Namespaces/{deploy_postfx}'
             namespace_file = f'{ns_dir}/namespace.yml'
-            self.render_from_file_to_file(ns_template_path, namespace_file)
+            logger.debug(f"Rendered entity: \n{namespace_yaml}")
+            write_yaml_str_to_file(namespace_file, namespace_yaml)
 
             self.generate_override_template(ns.get("template_override"), Path(f'{ns_dir}/namespace.yml_override'),
                                             deploy_postfx)
@@ -342,7 +448,7 @@ def generate_composite_structure(self):
             current_env_dir = self.ctx.current_env_dir
             cs_file = Path(current_env_dir) / "composite_structure.yml"
             cs_file.parent.mkdir(parents=True, exist_ok=True)
-            self.render_from_file_to_file(Template(composite_structure).render(self.ctx.as_dict()), str(cs_file))
+            self.render_from_file_to_file(self.render_path(composite_structure), str(cs_file))
 
     def get_rendered_target_path(self, template_path: Path) -> Path:
         path_str = str(template_path)
@@ -352,17 +458,27 @@ def get_rendered_target_path(self, template_path: Path) -> Path:
     def generate_paramset_templates(self):
         render_dir = Path(self.ctx.render_parameters_dir).resolve()
         paramset_templates = self.find_templates(render_dir, ["*.yml.j2", "*.yaml.j2"])
+        tasks = []
         for template_path in paramset_templates:
+            try:
+                tasks.append((self.render_path(template_path), None, True))
+            except TemplateError as e:
+                tasks.append(e)
+        rendered_paramsets = iter(self.map_renders("render_file_to_yaml_str",
+                                                   [task for task in tasks if not isinstance(task, TemplateError)]))
+        for template_path, task in zip(paramset_templates, tasks):
             template_name = self.get_template_name(template_path)
             target_path = self.get_rendered_target_path(template_path)
-            try:
-                logger.info(f"Try to render paramset {template_name}")
-                self.render_from_file_to_file(Template(str(template_path)).render(self.ctx.as_dict()), target_path)
+            logger.info(f"Try to render paramset {template_name}")
+            paramset_yaml, error = (None, str(task)) if isinstance(task, TemplateError) else next(rendered_paramsets)
+            if error is None:
+                logger.debug(f"Rendered entity: \n{paramset_yaml}")
+                write_yaml_str_to_file(target_path, paramset_yaml)
                 logger.info(f"Successfully generated paramset: {template_name}")
                 if template_path.exists():
                     template_path.unlink()
-            except TemplateError as e:
-                logger.warning(f"Skipped paramset {template_name}. Error details: {e}")
+            else:
+                logger.warning(f"Skipped paramset {template_name}. Error details: {error}")
                 if target_path.exists():
                     target_path.unlink()
 
@@ -381,6 +497,7 @@ def find_templates(self, path: str, patterns) -> list[Path]:
         return templates
 
     def render_app_defs(self):
+        tasks = []
         for def_tmpl_path in self.ctx.appdef_templates:
             app_def_str = openFileAsString(def_tmpl_path)
             matches = re.findall(
@@ -392,15 +509,25 @@ def render_app_defs(self):
             ensure_valid_fields(appdef_meta, ["artifactId", "groupId", "name"])
             group_id = appdef_meta["groupId"]
             artifact_id = appdef_meta["artifactId"]
-            self.ctx.update({
+            app_context = {
                 "app_lookup_key": f"{group_id}:{artifact_id}",
                 "groupId": group_id,
                 "artifactId": artifact_id,
-            })
+            }
+            self.ctx.update(app_context)
             app_def_trg_path = f"{self.ctx.current_env_dir}/AppDefs/{appdef_meta.get("name")}.yml"
-            self.render_from_file_to_file(def_tmpl_path, app_def_trg_path)
+            tasks.append((def_tmpl_path, app_def_trg_path, app_context))
+        self.write_rendered_files(tasks)
+
+    def write_rendered_files(self, tasks: list[tuple]):
+        """Renders (template path, target path, extra context) tasks and writes them in the order of tasks."""
+        rendered = self.map_renders("render_file_to_yaml_str", [(src, extra) for src, _, extra in tasks])
+        for (_, target_path, _), (rendered_yaml, _) in zip(tasks, rendered):
+            logger.debug(f"Rendered entity: \n{rendered_yaml}")
+            write_yaml_str_to_file(target_path, rendered_yaml)
 
     def render_reg_defs(self):
+        tasks = []
         for def_tmpl_path in self.ctx.regdef_templates:
             reg_def_str = openFileAsString(def_tmpl_path)
             matches = re.findall(
@@ -411,7 +538,8 @@ def render_reg_defs(self):
             regdef_meta = dict(matches)
             ensure_valid_fields(regdef_meta, ["name"])
             reg_def_trg_path = f"{self.ctx.current_env_dir}/RegDefs/{regdef_meta['name']}.yml"
-            self.render_from_file_to_file(def_tmpl_path, reg_def_trg_path)
+            tasks.append((def_tmpl_path, reg_def_trg_path, None))
+        self.write_rendered_files(tasks)
 
     def set_appreg_def_overrides(self):
         output_dir = Path(self.ctx.output_dir)
@@ -441,7 +569,7 @@ def set_appreg_def_overrides(self):
         if len(global_config_paths) > 0:
             global_path = global_config_paths[0]
             try:
-                cfg = openYaml(global_path)
+                cfg = openYaml(global_path, safe_load=True)
                 global_appdefs = cfg.get("appdefs", {}).get("overrides", {})
                 global_regdefs = cfg.get("regdefs", {}).get("overrides", {})
                 logger.info(f"Loaded global config from {global_path}")
@@ -451,7 +579,7 @@ def set_appreg_def_overrides(self):
         if len(cluster_config_paths) > 0:
             cluster_path = cluster_config_paths[0]
             try:
-                cfg = openYaml(cluster_path)
+                cfg = openYaml(cluster_path, safe_load=True)
                 cluster_appdefs = cfg.get("appdefs", {}).get("overrides", {})
                 cluster_regdefs = cfg.get("regdefs", {}).get("overrides", {})
                 logger.info(f"Loaded cluster config from {cluster_path}")
@@ -460,15 +588,15 @@ def set_appreg_def_overrides(self):
 
         self.ctx.appdefs["overrides"] = always_merger.merge(global_appdefs, cluster_appdefs)
         self.ctx.regdefs["overrides"] = always_merger.merge(global_regdefs, cluster_regdefs)
+        self.ctx.changed("appdefs", "regdefs")
 
     def generate_profiles(self, profile_names: Iterable[str]):
         logger.info(f"Start rendering profiles from list: {profile_names}")
         render_profiles_dir = self.ctx.render_profiles_dir
         profile_templates = self.find_templates(render_profiles_dir, ["*.yaml.j2", "*.yml.j2"])
-        for template_path in profile_templates:
-            template_name = self.get_template_name(template_path)
-            if template_name in profile_names:
-                self.render_from_file_to_file(template_path, self.get_rendered_target_path(template_path))
+        self.write_rendered_files([(template_path, self.get_rendered_target_path(template_path), None)
+                                   for template_path in profile_templates
+                                   if self.get_template_name(template_path) in profile_names])
 
     def validate_appregdefs(self):
         render_dir = self.ctx.current_env_dir
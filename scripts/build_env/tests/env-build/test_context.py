@@ -0,0 +1,30 @@
+import pytest
+
+from render_config_env import Context
+
+
+def test_context_snapshot_is_patched_on_change():
+    ctx = Context(env="env-01")
+    snapshot = ctx.as_dict()
+    assert snapshot["env"] == "env-01"
+    with pytest.raises(TypeError):
+        snapshot["env"] = "changed"
+
+    ctx.update({"cluster_name": "cluster-01", "extra_key": "value"})
+    ctx.env_vars["VAR"] = "value"
+    ctx.changed("env_vars")
+    ctx.start_time = None
+
+    assert dict(ctx.as_dict()) == ctx.model_dump(exclude_none=True)
+    assert ctx.as_dict()["extra_key"] == "value"
+    assert ctx.as_dict()["env_vars"] == {"VAR": "value"}
+    assert ctx._stats["dumps"] == 1
+
+
+def test_context_snapshot_drops_none_values():
+    ctx = Context(templates_dir="/tmp")
+    assert "templates_dir" in ctx.as_dict()
+    assert ctx.as_dict(include_none=True)["templates_dir"] is not None
+    ctx.templates_dir = None
+    assert "templates_dir" not in ctx.as_dict()
+    assert ctx.as_dict(include_none=True)["templates_dir"] is None
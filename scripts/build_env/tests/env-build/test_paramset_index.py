@@ -0,0 +1,72 @@
+from envgenehelper import writeToFile, openYaml
+
+import build_env
+from build_env import ParamsetIndex, createParamsetsMap
+from tests.base_test import BaseTest
+
+
+def create_paramsets(tmp_path):
+    parameters_dir = tmp_path / "parameters"
+    writeToFile(str(parameters_dir / "plain.yml"), "name: plain\nparameters:\n  key: value\n")
+    writeToFile(str(parameters_dir / "static.j2"), "name: static\nparameters:\n  key: {{ 'static' }}\n")
+    writeToFile(str(parameters_dir / "dynamic.j2"),
+                "name: dynamic\nparameters:\n  key: {{ current_env.environmentName }}\n")
+    env_dir = tmp_path / "render" / "env-01"
+    writeToFile(str(env_dir / "Inventory" / "env_definition.yml"),
+                "inventory:\n  environmentName: env-01\nenvTemplate: {}\n")
+    for namespace in ["ns-1", "ns-2"]:
+        writeToFile(str(env_dir / "Namespaces" / namespace / "namespace.yml"), f"name: {namespace}\n")
+    return ParamsetIndex(createParamsetsMap(str(parameters_dir))), env_dir
+
+
+def test_paramset_index_renders_paramsets(tmp_path):
+    index, env_dir = create_paramsets(tmp_path)
+    context = index.get_template_context(str(env_dir / "Namespaces" / "ns-1" / "namespace.yml"))
+    assert index.open_paramset(index["plain"][0]["filePath"], context)["parameters"] == {"key": "value"}
+    assert index.open_paramset(index["static"][0]["filePath"], context)["parameters"] == {"key": "static"}
+    assert index.open_paramset(index["dynamic"][0]["filePath"], context)["parameters"] == {"key": "env-01"}
+
+
+def test_paramset_index_reads_paramsets_once(tmp_path, monkeypatch):
+    index, env_dir = create_paramsets(tmp_path)
+    opened = []
+    open_paramset = build_env.openParamset
+    monkeypatch.setattr(build_env, "openParamset", lambda path: opened.append(path) or open_paramset(path))
+    contexts = []
+    for namespace in ["ns-1", "ns-2"]:
+        context = index.get_template_context(str(env_dir / "Namespaces" / namespace / "namespace.yml"))
+        contexts.append(context)
+        for name in ["plain", "static", "dynamic"]:
+            paramset = index.open_paramset(index[name][0]["filePath"], context)
+            paramset["parameters"]["key"] = "changed"
+    assert contexts[0] is contexts[1]
+    assert opened == [index["plain"][0]["filePath"]]
+    assert len(index._paramsets) == 3
+    assert index.open_paramset(index["plain"][0]["filePath"])["parameters"]["key"] == "value"
+
+
+def test_application_file_is_written_once_per_template(tmp_path, monkeypatch):
+    monkeypatch.chdir(BaseTest.base_dir)
+    _, env_dir = create_paramsets(tmp_path)
+    writeToFile(str(tmp_path / "parameters" / "apps.yml"),
+                "name: apps\napplications:\n  - appName: app\n    parameters:\n      first: value\n")
+    writeToFile(str(tmp_path / "parameters" / "more-apps.yml"),
+                "name: more-apps\napplications:\n  - appName: app\n    parameters:\n      second: value\n")
+    index = ParamsetIndex(createParamsetsMap(str(tmp_path / "parameters")))
+    template_path = str(env_dir / "Namespaces" / "ns-1" / "namespace.yml")
+    writeToFile(template_path, "name: ns-1\ndeployParameters: {}\ne2eParameters: {}\n"
+                               "technicalConfigurationParameters: {}\ndeployParameterSets: [apps, more-apps]\n"
+                               "e2eParameterSets: []\ntechnicalConfigurationParameterSets: [apps]\n")
+    written = []
+    beautify = build_env.beautifyYaml
+    monkeypatch.setattr(build_env, "beautifyYaml",
+                        lambda file_path, *args, **kwargs: written.append(file_path) or beautify(file_path, *args,
+                                                                                                  **kwargs))
+    build_env.processTemplate(template_path, "ns-1", None, "", index, {},
+                              process_env_specific=False)
+
+    app_path = str(env_dir / "Namespaces" / "ns-1" / "Applications" / "app.yml")
+    assert written.count(app_path) == 1
+    app = openYaml(app_path)
+    assert list(app["deployParameters"]) == ["first", "second"]
+    assert list(app["technicalConfigurationParameters"]) == ["first"]
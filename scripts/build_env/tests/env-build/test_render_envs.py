@@ -3,7 +3,10 @@
 import pytest
 from envgenehelper import *
 
-from main import render_environment, cleanup_resulting_dir
+import build_env
+import build_manifest
+import render_config_env
+from main import render_environment, render_environments, cleanup_resulting_dir
 from envgenehelper.test_helpers import TestHelpers
 
 from tests.base_test import BaseTest
@@ -42,3 +45,83 @@ def test_render_envs(self, cluster_name, env_name, version):
         files_to_compare = get_all_files_in_dir(source_dir)
         logger.info(dump_as_yaml_format(files_to_compare))
         TestHelpers.assert_dirs_content(source_dir, generated_dir, True, False)
+
+    @pytest.mark.parametrize("cluster_name, env_name, version", test_data[:2] + test_data[7:8])
+    def test_render_envs_with_render_workers(self, cluster_name, env_name, version, tmp_path, monkeypatch):
+        g_templates_dir = str((self.test_data_dir / "test_templates").resolve())
+        g_inventory_dir = str((self.test_data_dir / "test_environments").resolve())
+        g_output_dir = str(tmp_path / "test_environments")
+
+        os.environ['CI_COMMIT_REF_NAME'] = "branch_name"
+        monkeypatch.setenv('FULL_ENV_NAME', f"{cluster_name}/{env_name}")
+        monkeypatch.setattr(render_config_env, "RENDER_WORKERS", 3)
+        pools = []
+        process_pool_executor = render_config_env.ProcessPoolExecutor
+        monkeypatch.setattr(render_config_env, "ProcessPoolExecutor",
+                            lambda *args, **kwargs: pools.append(kwargs) or process_pool_executor(*args, **kwargs))
+
+        render_environment(env_name, cluster_name, g_templates_dir, g_inventory_dir, g_output_dir, self.test_data_dir,
+                           scratch_dir=str(tmp_path / "scratch"))
+        TestHelpers.assert_dirs_content(f"{g_inventory_dir}/{cluster_name}/{env_name}",
+                                        f"{g_output_dir}/{cluster_name}/{env_name}", True, False)
+        assert pools
+
+    def test_render_envs_in_parallel(self, tmp_path):
+        g_templates_dir = str((self.test_data_dir / "test_templates").resolve())
+        g_inventory_dir = str((self.test_data_dir / "test_environments").resolve())
+        g_output_dir = str(tmp_path / "test_environments")
+        full_env_names = [f"{cluster_name}/{env_name}" for cluster_name, env_name, _ in test_data[:4]]
+
+        os.environ['CI_COMMIT_REF_NAME'] = "branch_name"
+
+        render_environments(full_env_names, g_templates_dir, g_inventory_dir, g_output_dir, self.test_data_dir,
+                            max_workers=2, scratch_root=str(tmp_path / "scratch"))
+        for full_env_name in full_env_names:
+            TestHelpers.assert_dirs_content(f"{g_inventory_dir}/{full_env_name}", f"{g_output_dir}/{full_env_name}",
+                                            True, False)
+
+    def test_render_env_incrementally(self, tmp_path, monkeypatch):
+        cluster_name, env_name, _ = test_data[0]
+        g_templates_dir = str(tmp_path / "test_templates")
+        g_inventory_dir = str((self.test_data_dir / "test_environments").resolve())
+        g_output_dir = str(tmp_path / "test_environments")
+        shutil.copytree(self.test_data_dir / "test_templates", g_templates_dir)
+
+        os.environ['CI_COMMIT_REF_NAME'] = "branch_name"
+        monkeypatch.setenv('FULL_ENV_NAME', f"{cluster_name}/{env_name}")
+        monkeypatch.setenv('ENV_BUILD_INCREMENTAL', "true")
+        monkeypatch.setattr(build_manifest, "BUILD_MANIFEST_DIR", str(tmp_path / "manifests"))
+        generated_dir = f"{g_output_dir}/{cluster_name}/{env_name}"
+        processed_templates = []
+        process_template = build_env.processTemplate
+        monkeypatch.setattr(build_env, "processTemplate",
+                            lambda *args, **kwargs: processed_templates.append(args[1]) or process_template(*args, **kwargs))
+
+        def render():
+            processed_templates.clear()
+            render_environment(env_name, cluster_name, g_templates_dir, g_inventory_dir, g_output_dir,
+                               self.test_data_dir, scratch_dir=str(tmp_path / "scratch"))
+
+        def namespace_outputs():
+            namespaces_dir = f"{generated_dir}/Namespaces"
+            return {name: build_manifest.hash_dir(f"{namespaces_dir}/{name}").hexdigest()
+                    for name in os.listdir(namespaces_dir)}
+
+        render()
+        render()
+        TestHelpers.assert_dirs_content(f"{g_inventory_dir}/{cluster_name}/{env_name}", generated_dir, True, False)
+        assert processed_templates == ["cloud", "cloud"]
+        assert check_file_exists(str(tmp_path / "manifests" / cluster_name / f"{env_name}.yml"))
+        assert not os.path.exists(f"{generated_dir}/.build_manifest.yml")
+        previous_outputs = namespace_outputs()
+
+        with open(f"{g_templates_dir}/parameters/billing.yaml", "a") as f:
+            f.write("  - appName: crm\n    parameters:\n      PARAM_7: value-7\n")
+        render()
+        assert processed_templates == ["cloud", "cloud", "billing"]
+        outputs = namespace_outputs()
+        changed = [name for name in outputs if outputs[name] != previous_outputs[name]]
+        # only the namespace referencing the changed paramset is generated, others are copied from previous build
+        assert len(changed) == 1 and len(outputs) > 1 and outputs.keys() == previous_outputs.keys()
+        assert changed == ["billing"]
+        assert any("PARAM_7" in f.read_text() for f in Path(f"{generated_dir}/Namespaces/billing").rglob("*.yml"))
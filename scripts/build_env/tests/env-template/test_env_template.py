@@ -1,9 +1,11 @@
+import hashlib
 from os import environ
 from pathlib import Path
 
 import pytest
 import responses
 from aioresponses import aioresponses
+from artifact_searcher.maven_metadata import metadata_cache
 from env_template.process_env_template import process_env_template
 from envgenehelper.test_helpers import TestHelpers
 
@@ -117,13 +119,15 @@ def mock_dd_response():
 
 
 def mock_zip(url):
+    body = TestHelpers.create_fake_zip()
     responses.add(
         responses.GET,
         url,
-        body=TestHelpers.create_fake_zip(),
+        body=body,
         content_type="application/zip",
         status=200,
     )
+    responses.add(responses.GET, f"{url}.sha1", body=hashlib.sha1(body).hexdigest(), status=200)
     responses.add(
         responses.HEAD,
         url,
@@ -148,6 +152,11 @@ def init_env(self):
         environ.pop("CLUSTER_NAME", None)
         environ.pop("ENVIRONMENT_NAME", None)
 
+    @pytest.fixture(autouse=True)
+    def clear_metadata_cache(self):
+        # each test mocks its own maven-metadata.xml responses
+        metadata_cache.clear()
+
     @responses.activate
     def test_new_logic_with_dd(self, mock_aio_response):
         set_env("env-01")
@@ -159,9 +168,10 @@ def test_new_logic_with_dd(self, mock_aio_response):
 
         process_env_template()
 
-        assert len(responses.calls) == 3
+        assert len(responses.calls) == 4
         assert responses.calls[0].request.url == DD_URL
         assert responses.calls[1].request.url == STAGING_ZIP_URL
+        assert responses.calls[3].request.url == f"{STAGING_ZIP_URL}.sha1"
 
     @responses.activate
     def test_new_logic_with_zip(self, mock_aio_response):
@@ -175,7 +185,7 @@ def test_new_logic_with_zip(self, mock_aio_response):
 
         process_env_template()
 
-        assert len(responses.calls) == 1
+        assert len(responses.calls) == 2
         assert responses.calls[0].request.url == ZIP_URL
 
     @responses.activate
@@ -189,7 +199,7 @@ def test_old_logic_with_dd(self):
 
         process_env_template()
 
-        assert len(responses.calls) == 5
+        assert len(responses.calls) == 6
         assert responses.calls[2].request.url == DD_URL
         assert responses.calls[4].request.url == TMPL_ZIP_URL
 
@@ -207,5 +217,5 @@ def test_old_logic_with_zip(self):
 
         process_env_template()
 
-        assert len(responses.calls) == 4
+        assert len(responses.calls) == 5
         assert responses.calls[3].request.url == tmpl_zip_url
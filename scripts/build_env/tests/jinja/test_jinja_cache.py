@@ -0,0 +1,33 @@
+import pytest
+from jinja2 import Environment, Template, UndefinedError
+
+from jinja.jinja import SourceHashLoader, get_cached_jinja_env, get_template_from_string
+
+
+def test_string_template_is_compiled_once():
+    env = get_cached_jinja_env()
+    assert env is get_cached_jinja_env()
+    first = get_template_from_string(env, "name: {{ a.b.c }}-{{ x | default('d') }}")
+    second = get_template_from_string(env, "name: {{ a.b.c }}-{{ x | default('d') }}")
+    assert first is second
+    assert first.render({}) == "name: -d"
+
+
+def test_plain_env_renders_like_template():
+    source = "{{ templates_dir }}/env_templates/{{ name }}.yml\n"
+    context = {"templates_dir": "/tmp/templates", "name": "simple"}
+    assert get_template_from_string(get_cached_jinja_env(plain=True), source).render(context) == \
+           Template(source).render(context)
+    with pytest.raises(UndefinedError):
+        get_template_from_string(get_cached_jinja_env(plain=True), "{{ a.b.c }}").render({})
+
+
+def test_source_loader_keeps_only_recent_sources():
+    loader = SourceHashLoader(max_size=2)
+    first = loader.add_source("{{ a }}")
+    loader.add_source("{{ b }}")
+    loader.add_source("{{ a }}")
+    loader.add_source("{{ c }}")
+    assert len(loader.sources) == 2 and first in loader.sources
+    env = Environment(loader=loader, cache_size=2)
+    assert env.get_template(first).render(a=1) == "1"
@@ -38,7 +38,7 @@
 
 
 @pytest.mark.parametrize("test_case_name", TEST_CASES_POSITIVE)
-@patch("process_sd.download_sd_by_appver")
+@patch("process_sd.download_sds_by_appvers")
 def test_sd_positive(mock_download_sd, test_case_name):
     env = Environment(str(Path(OUTPUT_DIR, test_case_name)), "cluster-01", "env-01")
     do_prerequisites(SD, TEST_SD_DIR, OUTPUT_DIR, test_case_name, env, test_suits_map)
@@ -50,7 +50,7 @@ def test_sd_positive(mock_download_sd, test_case_name):
 
     file_path = Path(TEST_SD_DIR, test_case_name, f"mock_sd.json")
     sd_data = openJson(file_path)
-    mock_download_sd.return_value = sd_data
+    mock_download_sd.side_effect = lambda appvers, plugins: [sd_data] * len(appvers)
         
     handle_sd(env, sd_source_type, sd_version, sd_data, sd_delta, sd_merge_mode)
     actual_dir = os.path.join(env.env_path, "Inventory", "solution-descriptor")
@@ -60,7 +60,7 @@ def test_sd_positive(mock_download_sd, test_case_name):
     
     
 @pytest.mark.parametrize("test_case_name,expected_exception", [(k, v) for k, v in TEST_CASES_NEGATIVE.items()])
-@patch("process_sd.download_sd_by_appver")
+@patch("process_sd.download_sds_by_appvers")
 def test_sd_negative(mock_download_sd, test_case_name, expected_exception):
     env = Environment(str(Path(OUTPUT_DIR, test_case_name)), "cluster-01", "env-01")
     do_prerequisites(SD, TEST_SD_DIR, OUTPUT_DIR, test_case_name, env, test_suits_map)
@@ -72,7 +72,7 @@ def test_sd_negative(mock_download_sd, test_case_name, expected_exception):
 
     file_path = Path(TEST_SD_DIR, test_case_name, f"mock_sd.json")
     sd_data = openJson(file_path)
-    mock_download_sd.return_value = sd_data
+    mock_download_sd.side_effect = lambda appvers, plugins: [sd_data] * len(appvers)
     
     with pytest.raises(expected_exception):
         handle_sd(env, sd_source_type, sd_version, sd_data, sd_delta, sd_merge_mode)